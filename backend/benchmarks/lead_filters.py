@@ -0,0 +1,105 @@
+"""
+Seed a synthetic lead table and print query plans for the enrichment-result filters.
+
+Run from backend/ against a scratch database:
+    DATABASE_URL=postgresql://.../clay_bench python -m benchmarks.lead_filters --leads 5000000
+"""
+
+import argparse
+import time
+
+from db.database import Base, SessionLocal, engine
+from db.models import EnrichmentResult, Lead
+from sqlalchemy import func, select, text
+from sqlalchemy.dialects import postgresql
+
+SEED_LEADS = """
+INSERT INTO leads (first_name, last_name, company, title, website, email, enrichment_status, created_at, updated_at)
+SELECT 'First' || g, 'Last' || g, 'Company ' || (g % 200000), 'Title ' || (g % 50),
+       'https://company' || (g % 200000) || '.com', 'user' || g || '@company' || (g % 200000) || '.com',
+       'COMPLETED', now(), now()
+FROM generate_series(:start, :stop) AS g
+"""
+
+SEED_RESULTS = """
+INSERT INTO enrichment_results (lead_id, email_status, industry, company_size, seniority, data, updated_at)
+SELECT id,
+       (ARRAY['valid', 'invalid', 'accept_all', 'unknown'])[1 + floor(random() * 4)::int],
+       (ARRAY['saas', 'fintech', 'healthcare', 'retail', 'logistics', 'media', 'education', 'energy',
+              'insurance', 'real estate', 'manufacturing', 'legal', 'gaming', 'security', 'travel',
+              'food', 'automotive', 'telecom', 'biotech', 'government'])[1 + floor(random() * 20)::int],
+       (ARRAY['1-10', '11-50', '51-200', '201-500', '501-1000', '1001-5000', '5001+'])[1 + floor(random() * 7)::int],
+       (ARRAY['entry', 'senior', 'manager', 'director', 'vp', 'c_suite', 'owner'])[1 + floor(random() * 7)::int],
+       jsonb_build_object('apollo', jsonb_build_object('person', jsonb_build_object(
+           'city', (ARRAY['Berlin', 'London', 'New York', 'Paris', 'Austin'])[1 + floor(random() * 5)::int],
+           'departments', jsonb_build_array(
+               (ARRAY['engineering', 'sales', 'marketing', 'finance'])[1 + floor(random() * 4)::int])))),
+       now()
+FROM leads WHERE id > :after
+"""
+
+QUERIES = {
+    "email_status + industry": [EnrichmentResult.email_status == "valid", EnrichmentResult.industry == "saas"],
+    "company_size + seniority": [EnrichmentResult.company_size == "51-200", EnrichmentResult.seniority == "director"],
+    # Same SQL as EnrichmentResult.data.contains(...), spelled out so it can be rendered with literal values
+    "jsonb containment": [text("""enrichment_results.data @> '{"apollo": {"person": {"city": "Berlin"}}}'""")],
+    "industry + jsonb containment": [
+        EnrichmentResult.industry == "fintech",
+        text("""enrichment_results.data @> '{"apollo": {"person": {"departments": ["sales"]}}}'"""),
+    ],
+    "rare industry": [EnrichmentResult.industry == "no such industry"],
+}
+
+
+def seed(total: int, chunk: int):
+    """Insert synthetic leads and enrichment results in chunks"""
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Lead))
+        if existing >= total:
+            print(f"Reusing {existing} existing leads")
+            return
+
+        for start in range(existing + 1, total + 1, chunk):
+            stop = min(start + chunk - 1, total)
+            started = time.perf_counter()
+            after = db.scalar(select(func.coalesce(func.max(Lead.id), 0)))
+            db.execute(text(SEED_LEADS), {"start": start, "stop": stop})
+            db.execute(text(SEED_RESULTS), {"after": after})
+            db.commit()
+            print(f"Seeded leads {start}-{stop} in {time.perf_counter() - started:.1f}s")
+
+        db.execute(text("ANALYZE leads"))
+        db.execute(text("ANALYZE enrichment_results"))
+        db.commit()
+
+
+def explain(limit: int):
+    """Print EXPLAIN ANALYZE output for the filters exposed by GET /api/leads/"""
+    with SessionLocal() as db:
+        for name, conditions in QUERIES.items():
+            query = (
+                select(Lead.id)
+                .join(EnrichmentResult, EnrichmentResult.lead_id == Lead.id)
+                .where(*conditions)
+                .order_by(Lead.id)
+                .limit(limit)
+            )
+            sql = str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+            plan = db.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")).scalars().all()
+            print(f"\n== {name}\n" + "\n".join(plan))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=5_000_000)
+    parser.add_argument("--chunk", type=int, default=250_000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    seed(args.leads, args.chunk)
+    explain(args.limit)
+
+
+if __name__ == "__main__":
+    main()
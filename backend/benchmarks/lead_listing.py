@@ -0,0 +1,104 @@
+"""
+Compare lead listing serialization paths at several page sizes.
+
+Run from backend/ against a scratch database:
+    DATABASE_URL=postgresql://.../clay_bench python -m benchmarks.lead_listing --leads 20000
+
+Paths:
+    orm + model    ORM objects validated through LeadResponse and dumped by Pydantic (the old response_model path)
+    core + orjson  Core tuples rendered with orjson in one piece (GET /api/leads/ up to LEAD_STREAM_THRESHOLD)
+    core + stream  Core tuples over a server-side cursor, streamed as a JSON array (larger pages)
+"""
+
+import argparse
+import statistics
+import time
+
+from db.database import Base, SessionLocal, engine
+from db.models import Lead
+import orjson
+from pydantic import TypeAdapter
+from routes.leads import LEAD_RESPONSE_COLUMNS, LeadResponse, _lead_rows, _stream_lead_chunks
+from routes.responses import ORJSON_OPTIONS, stream_json_array
+from sqlalchemy import func, select, text
+
+# enriched_data shaped like a lead that went through email, apollo and ai enrichment
+SEED_LEADS = """
+INSERT INTO leads (first_name, last_name, company, title, website, email, phone, enrichment_status,
+                   enriched_data, created_at, updated_at)
+SELECT 'First' || g, 'Last' || g, 'Company ' || (g % 5000), 'Title ' || (g % 50),
+       'https://company' || (g % 5000) || '.com', 'user' || g || '@company' || (g % 5000) || '.com',
+       '+1 555 ' || lpad((g % 10000)::text, 4, '0'), 'COMPLETED',
+       json_build_object(
+           'email', json_build_object('valid', true, 'email', 'user' || g || '@company.com', 'score', 92),
+           'apollo', json_build_object('person', json_build_object(
+               'title', 'Title ' || (g % 50), 'seniority', 'director', 'city', 'Berlin',
+               'departments', json_build_array('engineering', 'sales'),
+               'employment_history', json_build_array(
+                   json_build_object('organization', 'Previous ' || g, 'title', 'Engineer', 'start', '2019-01-01'),
+                   json_build_object('organization', 'Earlier ' || g, 'title', 'Intern', 'start', '2017-06-01')))),
+           'ai', json_build_object('summary', repeat('Experienced leader in B2B software. ', 8),
+                                   'talking_points', json_build_array('growth', 'hiring', 'funding'))),
+       now(), now()
+FROM generate_series(:start, :stop) AS g
+"""
+
+PATHS = ("orm + model", "core + orjson", "core + stream")
+
+
+def seed(total: int):
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Lead))
+        if existing >= total:
+            print(f"Reusing {existing} existing leads")
+            return
+        db.execute(text(SEED_LEADS), {"start": existing + 1, "stop": total})
+        db.execute(text("ANALYZE leads"))
+        db.commit()
+        print(f"Seeded {total - existing} leads")
+
+
+def page_query(size: int):
+    return select(*LEAD_RESPONSE_COLUMNS).order_by(Lead.id).limit(size)
+
+
+def render(path: str, size: int, adapter: TypeAdapter) -> int:
+    """Fetch and serialize one page, returning the body size"""
+    if path == "core + stream":
+        return sum(len(part) for part in stream_json_array(_stream_lead_chunks(page_query(size))))
+
+    with SessionLocal() as db:
+        if path == "orm + model":
+            leads = db.query(Lead).order_by(Lead.id).limit(size).all()
+            return len(adapter.dump_json(adapter.validate_python(leads)))
+
+        result = db.execute(page_query(size))
+        return len(orjson.dumps(_lead_rows(result.keys(), result.all()), option=ORJSON_OPTIONS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=20_000)
+    parser.add_argument("--sizes", default="100,1000,5000,10000")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    seed(args.leads)
+    adapter = TypeAdapter(list[LeadResponse])
+
+    print(f"{'page':>6}  {'path':<14} {'median ms':>10} {'rows/s':>10} {'body KB':>9}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        for path in PATHS:
+            render(path, size, adapter)  # warm up
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                body = render(path, size, adapter)
+                timings.append(time.perf_counter() - started)
+            median = statistics.median(timings)
+            print(f"{size:>6}  {path:<14} {median * 1000:>10.1f} {size / median:>10.0f} {body / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
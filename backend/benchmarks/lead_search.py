@@ -0,0 +1,157 @@
+"""
+Seed a synthetic lead table and time ranked lead searches against an unindexed ILIKE scan.
+
+Run from backend/ against a scratch database migrated to head (pg_trgm installed):
+    DATABASE_URL=postgresql://.../clay_bench python -m benchmarks.lead_search --leads 2000000
+
+Paths, for the first page of 20 results:
+    ilike           every term ILIKE '%term%' against name, company, title or email (a naive server-side filter)
+    prefix          GET /api/leads/search?fuzzy=false: the tsvector prefix match, ranked
+    prefix + typos  GET /api/leads/search: prefix match or trigram word similarity, ranked
+Pass --explain to print the plan of each search.
+"""
+
+import argparse
+import statistics
+import time
+
+from db.database import SessionLocal
+from db.models import Lead
+from routes.leads import LEAD_RESPONSE_COLUMNS
+from services.lead_search import search_leads_query, search_terms, set_similarity_threshold
+from sqlalchemy import and_, func, or_, select, text
+
+FIRST_NAMES = (
+    "maria james john robert michael william david richard joseph thomas charles christopher daniel matthew "
+    "anthony mark donald steven paul andrew joshua kenneth kevin brian george timothy ronald edward jason "
+    "jeffrey ryan jacob gary nicholas eric jonathan stephen larry justin scott brandon benjamin samuel "
+    "gregory alexander patrick frank raymond jack dennis jerry tyler aaron jose adam nathan henry zachary "
+    "mary patricia jennifer linda elizabeth barbara susan jessica sarah karen lisa nancy betty sandra "
+    "margaret ashley kimberly emily donna michelle carol amanda melissa deborah stephanie dorothy rebecca "
+    "sharon laura cynthia amy kathleen angela shirley brenda emma anna nicole helen samantha katherine "
+    "christine debra rachel carolyn janet maria olivia heather catherine diane julie victoria lauren"
+).split()
+LAST_NAMES = (
+    "smith johnson williams brown jones garcia miller davis rodriguez martinez hernandez lopez gonzalez "
+    "wilson anderson thomas taylor moore jackson martin lee perez thompson white harris sanchez clark "
+    "ramirez lewis robinson walker young allen king wright scott torres nguyen hill flores green adams "
+    "nelson baker hall rivera campbell mitchell carter roberts gomez phillips evans turner diaz parker "
+    "cruz edwards collins reyes stewart morris morales murphy cook rogers gutierrez ortiz morgan cooper "
+    "peterson bailey reed kelly howard ramos kim cox ward richardson watson brooks chavez wood james "
+    "bennett gray mendoza ruiz hughes price alvarez castillo sanders patel myers long ross foster jimenez"
+).split()
+COMPANY_WORDS = (
+    "north wind acme globex initech umbrella stark wayne cyber dyne soylent hooli vandelay pied piper "
+    "massive dynamic aperture black mesa tyrell wonka oscorp gringotts monarch sterling cooper vortex "
+    "blue sky apex summit pinnacle quantum nimbus falcon orbit lumen nova vertex atlas helix zenith"
+).split()
+TITLES = [
+    "VP Sales",
+    "Head of Marketing",
+    "Chief Technology Officer",
+    "Account Executive",
+    "Software Engineer",
+    "Product Manager",
+    "Sales Development Representative",
+    "Founder",
+    "Director of Operations",
+    "Data Scientist",
+]
+
+SEED_LEADS = """
+INSERT INTO leads (first_name, last_name, company, title, email, enrichment_status, created_at, updated_at)
+SELECT initcap(f), initcap(l), initcap(c1) || ' ' || initcap(c2), t,
+       f || '.' || l || g || '@' || c1 || c2 || '.com', 'PENDING', now(), now()
+FROM generate_series(:start, :stop) AS g,
+     LATERAL (SELECT (:first_names)[1 + (hashint4(g) & 1023) % cardinality(:first_names)] AS f,
+                     (:last_names)[1 + (hashint4(g + 7) & 1023) % cardinality(:last_names)] AS l,
+                     (:company_words)[1 + (hashint4(g % 50000) & 1023) % cardinality(:company_words)] AS c1,
+                     (:company_words)[1 + (hashint4(g % 50000 + 3) & 1023) % cardinality(:company_words)] AS c2,
+                     (:titles)[1 + (hashint4(g + 11) & 1023) % cardinality(:titles)] AS t) AS picked
+"""
+
+SEARCHES = {
+    "full name": "maria garcia",
+    "name prefixes": "jen wil",
+    "company": "globex",
+    "email": "john.smith12@",
+    "title + name": "founder patel",
+    "broad (one title word)": "engineer",
+    "single letter": "m",
+    "typos": "jenifer wilsno",
+}
+PATHS = ("ilike", "prefix", "prefix + typos")
+
+
+def seed(total: int, chunk: int):
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Lead))
+        if existing >= total:
+            print(f"Reusing {existing} existing leads")
+            return
+
+        params = {
+            "first_names": FIRST_NAMES,
+            "last_names": LAST_NAMES,
+            "company_words": COMPANY_WORDS,
+            "titles": TITLES,
+        }
+        for start in range(existing + 1, total + 1, chunk):
+            stop = min(start + chunk - 1, total)
+            started = time.perf_counter()
+            db.execute(text(SEED_LEADS), {"start": start, "stop": stop, **params})
+            db.commit()
+            print(f"Seeded leads {start}-{stop} in {time.perf_counter() - started:.1f}s")
+        db.execute(text("ANALYZE leads"))
+        db.commit()
+
+
+def build(path: str, query: str, limit: int):
+    terms = search_terms(query)
+    if path == "ilike":
+        haystack = [Lead.first_name, Lead.last_name, Lead.company, Lead.title, Lead.email]
+        conditions = [or_(*(column.ilike(f"%{term}%") for column in haystack)) for term in terms]
+        return select(*LEAD_RESPONSE_COLUMNS).where(and_(*conditions)).order_by(Lead.id).limit(limit)
+    return search_leads_query(terms, LEAD_RESPONSE_COLUMNS, fuzzy=path == "prefix + typos").limit(limit)
+
+
+def run(repeat: int, limit: int, explain: bool):
+    print(f"\n{'search':<24} {'query':<16} " + " ".join(f"{path + ' ms':>17}" for path in PATHS) + "  top result")
+    with SessionLocal() as db:
+        set_similarity_threshold(db)
+        for name, query in SEARCHES.items():
+            timings = {}
+            top = None
+            for path in PATHS:
+                statement = build(path, query, limit)
+                samples = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    rows = db.execute(statement).all()
+                    samples.append(time.perf_counter() - started)
+                timings[path] = statistics.median(samples) * 1000
+                if path == "prefix + typos" and rows:
+                    top = f"{rows[0].first_name} {rows[0].last_name}, {rows[0].title} at {rows[0].company}"
+                if explain and path != "ilike":
+                    # to_tsquery's REGCONFIG argument has no literal renderer, so EXPLAIN with bound parameters
+                    compiled = statement.compile(dialect=db.get_bind().dialect)
+                    plan = db.connection().exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}", compiled.params)
+                    print(f"\n== {name}: {path}\n" + "\n".join(plan.scalars().all()))
+            print(f"{name:<24} {query:<16} " + " ".join(f"{timings[path]:>17.2f}" for path in PATHS) + f"  {top}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=2_000_000)
+    parser.add_argument("--chunk", type=int, default=250_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--explain", action="store_true")
+    args = parser.parse_args()
+
+    seed(args.leads, args.chunk)
+    run(args.repeat, args.limit, args.explain)
+
+
+if __name__ == "__main__":
+    main()
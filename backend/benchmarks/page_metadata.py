@@ -0,0 +1,176 @@
+"""
+Compare the single-pass page metadata extractor with the previous BeautifulSoup extraction over a saved HTML corpus.
+
+Run from backend/:
+    python -m benchmarks.page_metadata --fetch urls.txt --corpus /tmp/html_corpus   # save pages once
+    python -m benchmarks.page_metadata --corpus /tmp/html_corpus
+    python -m benchmarks.page_metadata --corpus /tmp/html_corpus --generate 200      # synthetic pages, no network
+
+Paths:
+    bs4 (previous)  BeautifulSoup tree, then find title/meta, a loop over every anchor and every social domain
+                    and a regex over get_text() (what scrape_company_website did before)
+    single pass     services.page_metadata.extract_page_metadata: one html.parser stream, also collecting
+                    OpenGraph, JSON-LD, phones and technologies
+"""
+
+import argparse
+from pathlib import Path
+import random
+import re
+import statistics
+import time
+
+from services.page_metadata import extract_page_metadata
+
+PATHS = ("bs4 (previous)", "single pass")
+
+
+def previous_extract(html: str, url: str) -> dict:
+    """The extraction scrape_company_website used before the single-pass extractor"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    title = soup.find("title")
+    description = soup.find("meta", attrs={"name": "description"})
+
+    social_links = {}
+    social_domains = {
+        "linkedin.com": "linkedin",
+        "twitter.com": "twitter",
+        "x.com": "twitter",
+        "facebook.com": "facebook",
+        "instagram.com": "instagram",
+        "youtube.com": "youtube",
+    }
+    for link in soup.find_all("a", href=True):
+        href = link["href"]
+        for domain, platform in social_domains.items():
+            if domain in href:
+                social_links[platform] = href
+                break
+
+    emails = re.findall(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b", soup.get_text())
+    emails = [e for e in emails if not any(x in e.lower() for x in ["example.com", "test.com", "placeholder"])][:10]
+    return {
+        "url": url,
+        "title": title.text.strip() if title else None,
+        "description": description["content"] if description and description.get("content") else None,
+        "social_links": social_links,
+        "emails": list(set(emails)),
+    }
+
+
+def fetch(urls_file: Path, corpus: Path):
+    import httpx
+
+    corpus.mkdir(parents=True, exist_ok=True)
+    urls = [line.strip() for line in urls_file.read_text().splitlines() if line.strip()]
+    with httpx.Client(follow_redirects=True, timeout=20.0) as client:
+        for index, url in enumerate(urls):
+            try:
+                response = client.get(url, headers={"User-Agent": "Mozilla/5.0"})
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(f"skip {url}: {e}")
+                continue
+            (corpus / f"{index:05d}.html").write_text(f"<!-- {url} -->\n{response.text}")
+    print(f"Saved {len(list(corpus.glob('*.html')))} pages to {corpus}")
+
+
+SYNTHETIC_TECH = [
+    '<script async src="https://www.googletagmanager.com/gtag/js?id=G-XXXX"></script>',
+    '<script src="https://js.hs-scripts.com/123.js"></script>',
+    '<script src="https://static.hotjar.com/c/hotjar-1.js"></script>',
+    '<script src="/wp-includes/js/jquery/jquery.min.js"></script>',
+    '<script src="/_next/static/chunks/main.js"></script>',
+    '<link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5/dist/css/bootstrap.min.css">',
+    '<script src="https://widget.intercom.io/widget/abc"></script>',
+]
+
+
+def synthetic_page(index: int) -> str:
+    """A marketing homepage shaped like real ones: big nav, inline scripts, JSON-LD, social footer"""
+    rng = random.Random(index)
+    company = f"Company {index}"
+    nav = "".join(f'<li><a href="/section-{i}">Section {i}</a></li>' for i in range(rng.randint(60, 200)))
+    cards = "".join(
+        f'<div class="card"><h3>Feature {i}</h3><p>{"Lorem ipsum dolor sit amet consectetur. " * 6}</p>'
+        f'<svg><title>icon {i}</title><path d="M0 0h24v24H0z"/></svg></div>'
+        for i in range(rng.randint(20, 60))
+    )
+    scripts = "".join(rng.sample(SYNTHETIC_TECH, rng.randint(2, 5)))
+    inline = "<script>" + "window.dataLayer=window.dataLayer||[];" * rng.randint(50, 400) + "</script>"
+    json_ld = (
+        '<script type="application/ld+json">{"@context":"https://schema.org","@graph":[{"@type":"WebSite"},'
+        f'{{"@type":"Organization","name":"{company}","url":"https://company{index}.com",'
+        f'"logo":{{"@type":"ImageObject","url":"https://company{index}.com/logo.png"}},'
+        f'"sameAs":["https://www.linkedin.com/company/c{index}","https://github.com/c{index}"],'
+        '"address":{"@type":"PostalAddress","addressLocality":"Berlin","addressCountry":"DE"}}]}</script>'
+    )
+    return (
+        f"<!DOCTYPE html><html><head><title>{company} - Software</title>"
+        f'<meta name="description" content="{company} builds software.">'
+        f'<meta property="og:title" content="{company}"><meta property="og:image" content="https://company{index}.com/og.png">'
+        f'<meta name="generator" content="WordPress 6.4">{scripts}{json_ld}</head>'
+        f"<body><nav><ul>{nav}</ul></nav><main>{cards}</main>{inline}"
+        f'<footer><a href="mailto:hello@company{index}.com">Email us</a> <a href="tel:+49 30 1234567{index % 10}">Call</a>'
+        f" Write to sales@company{index}.com or call +1 (555) 010-{index % 10000:04d}."
+        f'<a href="https://twitter.com/company{index}">Twitter</a>'
+        f'<a href="https://www.facebook.com/sharer/sharer.php?u=x">Share</a>'
+        f'<a href="https://www.facebook.com/company{index}">Facebook</a></footer></body></html>'
+    )
+
+
+def generate(corpus: Path, count: int):
+    corpus.mkdir(parents=True, exist_ok=True)
+    for index in range(count):
+        (corpus / f"synthetic-{index:05d}.html").write_text(synthetic_page(index))
+    print(f"Generated {count} synthetic pages in {corpus}")
+
+
+def extract(path: str, html: str, url: str) -> dict:
+    return previous_extract(html, url) if path == "bs4 (previous)" else extract_page_metadata(html, url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", type=Path, required=True, help="directory of saved .html pages")
+    parser.add_argument("--fetch", type=Path, help="file with one URL per line to save into the corpus first")
+    parser.add_argument("--generate", type=int, help="write this many synthetic pages into the corpus first")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.fetch:
+        fetch(args.fetch, args.corpus)
+    if args.generate:
+        generate(args.corpus, args.generate)
+
+    pages = [path.read_text(errors="replace") for path in sorted(args.corpus.glob("*.html"))]
+    if not pages:
+        parser.error(f"no .html pages in {args.corpus}")
+    megabytes = sum(len(page) for page in pages) / 1e6
+    print(f"{len(pages)} pages, {megabytes:.1f} MB")
+
+    print(f"{'path':<16} {'ms/page':>8} {'pages/s':>8} {'MB/s':>6}  found (socials, emails, phones, org, technologies)")
+    for path in PATHS:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = [extract(path, page, "https://example.org/") for page in pages]
+            timings.append(time.perf_counter() - started)
+        elapsed = statistics.median(timings)
+        found = (
+            sum(len(r["social_links"]) for r in results),
+            sum(len(r["emails"]) for r in results),
+            sum(len(r.get("phones", [])) for r in results),
+            sum(1 for r in results if r.get("organization")),
+            sum(len(r.get("technologies", [])) for r in results),
+        )
+        print(
+            f"{path:<16} {elapsed / len(pages) * 1000:>8.2f} {len(pages) / elapsed:>8.0f} "
+            f"{megabytes / elapsed:>6.1f}  {found}"
+        )
+
+
+if __name__ == "__main__":
+    main()
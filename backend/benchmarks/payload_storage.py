@@ -0,0 +1,202 @@
+"""
+Measure what storing Apollo responses as compacted results plus one compressed payload saves.
+
+Run from backend/ against a scratch database and Redis:
+    DATABASE_URL=postgresql://.../clay_bench python -m benchmarks.payload_storage --leads 5000 --runs 2
+
+Each lead is enriched --runs times with the same people/match response. Layouts, in temporary tables:
+    inline      the full response in the task result, Lead.enriched_data and enrichment_results.data, plus
+                the enrich_lead return value in the Celery result backend (what _save_result did before)
+    payload     the projection in those three places, the response once in provider_payloads, and no
+                Celery result (task_ignore_result)
+Row fetch time reads the status endpoint's columns (every task result of a lead) for random leads.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import statistics
+import time
+import uuid
+import zlib
+
+from db.database import SessionLocal
+from db.redis_client import get_redis
+from services.payloads import PAYLOAD_COMPRESSION_LEVEL, PAYLOAD_PROJECTIONS
+from sqlalchemy import text
+
+LAYOUTS = ("inline", "payload")
+TABLES = ("tasks", "leads", "results", "payloads")
+REDIS_PREFIX = "bench-payload:"
+
+
+def apollo_response(index: int) -> dict:
+    """A people/match response shaped and sized like a real one (~9 KB of JSON)"""
+    rng = random.Random(index)
+    organization = {
+        "id": uuid.UUID(int=rng.getrandbits(128)).hex[:24],
+        "name": f"Company {index % 5000}",
+        "website_url": f"http://www.company{index % 5000}.com",
+        "primary_domain": f"company{index % 5000}.com",
+        "linkedin_url": f"http://www.linkedin.com/company/company{index % 5000}",
+        "industry": rng.choice(["computer software", "financial services", "marketing & advertising"]),
+        "estimated_num_employees": rng.randint(5, 20000),
+        "keywords": [f"keyword {rng.randint(0, 9999)}" for _ in range(60)],
+        "technologies": [
+            {"uid": f"tech_{i}", "name": f"Technology {rng.randint(0, 999)}", "category": "Analytics"}
+            for i in range(40)
+        ],
+        "current_technologies": [{"uid": f"tech_{i}", "name": f"Technology {i}"} for i in range(20)],
+        "funding_events": [
+            {"date": f"20{rng.randint(10, 24)}-0{rng.randint(1, 9)}-01", "type": "Series A", "amount": "10M"}
+            for _ in range(3)
+        ],
+        "short_description": "We build software for teams that sell. " * 12,
+        "seo_description": "Sales software, CRM and pipeline analytics. " * 4,
+        "raw_address": f"{index} Main Street, Berlin, Germany",
+        "city": "Berlin",
+        "country": "Germany",
+        "annual_revenue_printed": "12M",
+        "publicly_traded_symbol": None,
+        "logo_url": f"https://zenprospect-production.s3.amazonaws.com/uploads/pictures/{index}/picture",
+    }
+    return {
+        "person": {
+            "id": uuid.UUID(int=rng.getrandbits(128)).hex[:24],
+            "first_name": f"First{index}",
+            "last_name": f"Last{index}",
+            "name": f"First{index} Last{index}",
+            "title": rng.choice(["VP Sales", "Head of Marketing", "CTO", "Account Executive"]),
+            "headline": "Helping B2B teams grow revenue | Speaker | Advisor",
+            "email": f"first{index}@company{index % 5000}.com",
+            "email_status": "verified",
+            "linkedin_url": f"http://www.linkedin.com/in/first{index}",
+            "photo_url": f"https://media.licdn.com/dms/image/{index}/profile-displayphoto-shrink_200_200/0",
+            "seniority": rng.choice(["vp", "director", "c_suite", "senior"]),
+            "departments": ["sales", "master_sales"],
+            "subdepartments": ["sales_operations", "business_development"],
+            "functions": ["sales", "business_development"],
+            "city": "Berlin",
+            "state": "Berlin",
+            "country": "Germany",
+            "employment_history": [
+                {
+                    "organization_name": f"Employer {rng.randint(0, 9999)}",
+                    "title": rng.choice(["Manager", "Director", "Engineer", "Consultant"]),
+                    "start_date": f"20{rng.randint(5, 20):02d}-01-01",
+                    "end_date": None if i == 0 else f"20{rng.randint(10, 23)}-01-01",
+                    "current": i == 0,
+                    "description": "Led a team across EMEA and grew the pipeline. " * 3,
+                    "id": uuid.UUID(int=rng.getrandbits(128)).hex[:24],
+                }
+                for i in range(rng.randint(3, 8))
+            ],
+            "phone_numbers": [{"raw_number": f"+49 30 {index:07d}", "type": "work_hq"}],
+            "intent_strength": None,
+            "show_intent": True,
+            "organization": organization,
+        }
+    }
+
+
+def create_tables(db):
+    for layout in LAYOUTS:
+        db.execute(text(f"CREATE TEMP TABLE {layout}_tasks (id serial PRIMARY KEY, lead_id int, result json)"))
+        db.execute(text(f"CREATE INDEX ON {layout}_tasks (lead_id)"))
+        db.execute(text(f"CREATE TEMP TABLE {layout}_leads (id int PRIMARY KEY, enriched_data json)"))
+        db.execute(text(f"CREATE TEMP TABLE {layout}_results (lead_id int PRIMARY KEY, data jsonb)"))
+        db.execute(text(f"CREATE TEMP TABLE {layout}_payloads (hash varchar(64) PRIMARY KEY, body bytea)"))
+        db.execute(text(f"ALTER TABLE {layout}_payloads ALTER COLUMN body SET STORAGE EXTERNAL"))
+
+
+def write(db, layout: str, leads: int, runs: int):
+    """Store every lead's enrichment in a layout"""
+    project = PAYLOAD_PROJECTIONS["apollo"]
+    client = get_redis()
+
+    for lead_id in range(1, leads + 1):
+        response = apollo_response(lead_id)
+        stored = response
+        if layout == "payload":
+            raw = json.dumps(response, sort_keys=True, separators=(",", ":")).encode()
+            digest = hashlib.sha256(raw).hexdigest()
+            db.execute(
+                text(f"INSERT INTO {layout}_payloads VALUES (:hash, :body) ON CONFLICT DO NOTHING"),
+                {"hash": digest, "body": zlib.compress(raw, PAYLOAD_COMPRESSION_LEVEL)},
+            )
+            stored = {**project(response), "payload": digest}
+
+        encoded = json.dumps(stored)
+        for _ in range(runs):
+            db.execute(
+                text(f"INSERT INTO {layout}_tasks (lead_id, result) VALUES (:id, :data)"),
+                {"id": lead_id, "data": encoded},
+            )
+            if layout == "inline":
+                meta = json.dumps({"status": "SUCCESS", "result": response, "task_id": str(uuid.uuid4())})
+                client.set(f"{REDIS_PREFIX}{uuid.uuid4()}", meta, ex=3600)
+        data = json.dumps({"apollo": stored})
+        db.execute(text(f"INSERT INTO {layout}_leads VALUES (:id, :data)"), {"id": lead_id, "data": data})
+        db.execute(text(f"INSERT INTO {layout}_results VALUES (:id, :data)"), {"id": lead_id, "data": data})
+
+    db.execute(text(f"ANALYZE {layout}_tasks, {layout}_leads, {layout}_results, {layout}_payloads"))
+
+
+def redis_usage() -> int:
+    client = get_redis()
+    return sum(client.memory_usage(key) or 0 for key in client.scan_iter(f"{REDIS_PREFIX}*", count=1000))
+
+
+def fetch_time(db, layout: str, leads: int, lookups: int) -> float:
+    """Median ms to fetch and decode every task result of one lead"""
+    rng = random.Random(1)
+    timings = []
+    for _ in range(lookups):
+        started = time.perf_counter()
+        rows = db.execute(text(f"SELECT result FROM {layout}_tasks WHERE lead_id = :id"), {"id": rng.randint(1, leads)})
+        for (result,) in rows:
+            assert result
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--leads", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=2, help="enrichments of each lead (same response each time)")
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    sample = json.dumps(apollo_response(1))
+    print(f"{args.leads} leads x {args.runs} runs, response {len(sample) / 1024:.1f} KB")
+
+    with SessionLocal() as db:
+        create_tables(db)
+        rows = []
+        for layout in LAYOUTS:
+            started = time.perf_counter()
+            write(db, layout, args.leads, args.runs)
+            redis_bytes = redis_usage() if layout == "inline" else 0
+            written = time.perf_counter() - started
+            sizes = [
+                db.execute(text(f"SELECT pg_total_relation_size('{layout}_{table}')")).scalar() for table in TABLES
+            ]
+            rows.append((layout, sizes, redis_bytes, fetch_time(db, layout, args.leads, args.lookups), written))
+        client = get_redis()
+        for key in client.scan_iter(f"{REDIS_PREFIX}*", count=1000):
+            client.delete(key)
+
+    print(
+        f"{'layout':<8} {'tasks MB':>9} {'leads MB':>9} {'results MB':>10} {'payloads MB':>11} {'total MB':>9} "
+        f"{'redis MB':>9} {'fetch ms':>9} {'write s':>8}"
+    )
+    for layout, sizes, redis_bytes, fetch_ms, written in rows:
+        print(
+            f"{layout:<8} {sizes[0] / 1e6:>9.1f} {sizes[1] / 1e6:>9.1f} {sizes[2] / 1e6:>10.1f} {sizes[3] / 1e6:>11.1f} "
+            f"{sum(sizes) / 1e6:>9.1f} {redis_bytes / 1e6:>9.1f} {fetch_ms:>9.3f} {written:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
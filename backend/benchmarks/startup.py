@@ -0,0 +1,66 @@
+"""
+Measure cold-start import time and memory of the API (or any module) in fresh interpreters.
+
+Run from backend/:
+    python -m benchmarks.startup --runs 5
+    python -m benchmarks.startup --module workers.tasks
+
+Each run imports the module in a new process and reports wall time, peak RSS and which
+heavy optional SDKs ended up loaded. Use python -X importtime -c "import main" to see
+where the remaining time goes.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# SDKs only some workers need; the API should not load any of them
+HEAVY_MODULES = ("openai", "aiohttp", "bs4", "email_validator", "workers.tasks")
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "max_rss_mb": rss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "modules": len(sys.modules),
+    "heavy": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """Import the module once in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    measure(args.module)  # warm the bytecode cache so every run compares the same thing
+    runs = [measure(args.module) for _ in range(args.runs)]
+
+    print(f"import {args.module}: {args.runs} runs")
+    print(f"  import time  median {statistics.median(r['import_ms'] for r in runs):.0f} ms")
+    print(f"               min    {min(r['import_ms'] for r in runs):.0f} ms")
+    print(f"  peak RSS     median {statistics.median(r['max_rss_mb'] for r in runs):.1f} MB")
+    print(f"  modules      {runs[-1]['modules']}")
+    print(f"  heavy SDKs   {', '.join(runs[-1]['heavy']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Compare enrichment throughput per GB of RAM between the prefork Celery worker and the asyncio worker.
+
+Run from backend/ with Redis up, against a scratch database:
+    DATABASE_URL=postgresql://.../clay_bench python -m benchmarks.worker_throughput --tasks 2000 --latency 0.2
+
+Each mode seeds its own leads, queues one "email" enrichment per lead and starts a worker on enrich_email in
+a subprocess. The provider call is replaced by a sleep of --latency seconds so the numbers measure the
+workers, not a third-party API. Memory is the proportional set size (PSS) of the worker's whole process
+tree, so pages shared between forked children are not counted once per child.
+"""
+
+import argparse
+import asyncio
+import os
+from pathlib import Path
+import subprocess
+import sys
+import time
+from uuid import uuid4
+
+from db.database import SessionLocal
+from db.models import EnrichmentStatus, EnrichmentTask, Lead
+from sqlalchemy import delete, func, insert, select
+
+BENCH_COMPANY = "Worker Throughput Bench"
+
+
+def patch_provider(latency: float):
+    """Stand in for the email validation API with a fixed-latency response"""
+    from services.email_validation import EmailValidationService
+
+    async def validate_email_full(self, email: str) -> dict:
+        await asyncio.sleep(latency)
+        return {"email": email, "valid": True, "score": 90}
+
+    EmailValidationService.validate_email_full = validate_email_full
+
+
+def serve(mode: str, concurrency: int, latency: float):
+    """Worker subprocess entry point"""
+    patch_provider(latency)
+    if mode == "prefork":
+        from workers.celery_app import celery_app
+
+        celery_app.worker_main(
+            [
+                "worker",
+                "-P",
+                "prefork",
+                "-c",
+                str(concurrency),
+                "-Q",
+                "enrich_email",
+                "-l",
+                "warning",
+                "--without-gossip",
+                "--without-mingle",
+                "--without-heartbeat",
+            ]
+        )
+    else:
+        from db import database
+        from workers.async_worker import AsyncWorker
+
+        database.init_engine("async_worker")
+        asyncio.run(AsyncWorker(["enrich_email"], concurrency).run())
+
+
+def seed(count: int) -> list[tuple[int, int, str]]:
+    """Create leads with an email and a pending email task each, returning (lead_id, task_id, message_id)"""
+    with SessionLocal() as db:
+        lead_ids = db.scalars(
+            insert(Lead).returning(Lead.id),
+            [
+                {"first_name": "Bench", "last_name": str(i), "company": BENCH_COMPANY, "email": f"bench{i}@example.com"}
+                for i in range(count)
+            ],
+        ).all()
+        rows = [
+            {
+                "lead_id": lead_id,
+                "task_type": "email",
+                "status": EnrichmentStatus.PENDING,
+                "celery_task_id": str(uuid4()),
+            }
+            for lead_id in lead_ids
+        ]
+        task_ids = db.scalars(insert(EnrichmentTask).returning(EnrichmentTask.id), rows).all()
+        db.commit()
+    return [(row["lead_id"], task_id, row["celery_task_id"]) for row, task_id in zip(rows, task_ids)]
+
+
+def cleanup():
+    with SessionLocal() as db:
+        bench_leads = select(Lead.id).where(Lead.company == BENCH_COMPANY)
+        db.execute(delete(EnrichmentTask).where(EnrichmentTask.lead_id.in_(bench_leads)))
+        db.execute(delete(Lead).where(Lead.company == BENCH_COMPANY))
+        db.commit()
+
+
+def tree_pss_mb(pid: int) -> float:
+    """Proportional set size of a process and all its descendants"""
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        proc = Path(f"/proc/{current}")
+        try:
+            for line in (proc / "smaps_rollup").read_text().splitlines():
+                if line.startswith("Pss:"):
+                    total_kb += int(line.split()[1])
+            for task in (proc / "task").iterdir():
+                pending.extend(int(child) for child in (task / "children").read_text().split())
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue
+    return total_kb / 1024
+
+
+def run(mode: str, count: int, concurrency: int, latency: float, timeout: float) -> dict:
+    from workers.celery_app import dispatch_enrichment
+
+    cleanup()
+    tasks = seed(count)
+    task_ids = [task_id for _, task_id, _ in tasks]
+
+    worker = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.worker_throughput",
+            "--serve",
+            mode,
+            "--concurrency",
+            str(concurrency),
+            "--latency",
+            str(latency),
+        ],
+        env={**os.environ, "DB_ROLE": "worker" if mode == "prefork" else "async_worker"},
+    )
+    try:
+        time.sleep(3)  # let the worker connect and its pool fork before the clock starts
+        idle_mb = tree_pss_mb(worker.pid)
+        started = time.perf_counter()
+        for lead_id, task_id, message_id in tasks:
+            dispatch_enrichment(lead_id, "email", task_id, celery_task_id=message_id)
+
+        peak_mb, done = idle_mb, 0
+        while done < count and time.perf_counter() - started < timeout:
+            time.sleep(0.25)
+            peak_mb = max(peak_mb, tree_pss_mb(worker.pid))
+            with SessionLocal() as db:
+                done = db.scalar(
+                    select(func.count())
+                    .select_from(EnrichmentTask)
+                    .where(EnrichmentTask.id.in_(task_ids), EnrichmentTask.status == EnrichmentStatus.COMPLETED)
+                )
+        elapsed = time.perf_counter() - started
+    finally:
+        worker.terminate()
+        worker.wait(timeout=60)
+        cleanup()
+
+    rate = done / elapsed
+    return {
+        "done": done,
+        "seconds": elapsed,
+        "rate": rate,
+        "idle_mb": idle_mb,
+        "peak_mb": peak_mb,
+        "per_gb": rate / (peak_mb / 1024),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated provider latency in seconds")
+    parser.add_argument("--prefork", type=int, default=8, help="prefork worker processes")
+    parser.add_argument("--async-concurrency", type=int, default=200, help="concurrent tasks in the async worker")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--serve", choices=("prefork", "async"), help=argparse.SUPPRESS)
+    parser.add_argument("--concurrency", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.concurrency, args.latency)
+        return
+
+    print(f"{args.tasks} email enrichments, {args.latency * 1000:.0f} ms simulated provider latency")
+    print(f"{'worker':<14} {'done':>6} {'seconds':>8} {'tasks/s':>8} {'idle MB':>8} {'peak MB':>8} {'tasks/s/GB':>11}")
+    for mode, concurrency in (("prefork", args.prefork), ("async", args.async_concurrency)):
+        r = run(mode, args.tasks, concurrency, args.latency, args.timeout)
+        label = f"{mode} x{concurrency}"
+        print(
+            f"{label:<14} {r['done']:>6} {r['seconds']:>8.1f} {r['rate']:>8.1f} "
+            f"{r['idle_mb']:>8.0f} {r['peak_mb']:>8.0f} {r['per_gb']:>11.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
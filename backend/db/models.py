@@ -1,8 +1,23 @@
 from datetime import datetime
 import enum
 
-from sqlalchemy import JSON, Column, DateTime, Enum as SQLEnum, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import (
+    JSON,
+    Column,
+    Computed,
+    DateTime,
+    Enum as SQLEnum,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 
 from .database import Base
 
@@ -14,6 +29,71 @@ class EnrichmentStatus(enum.Enum):
     FAILED = "failed"
 
 
+class JobStatus(enum.Enum):
+    RUNNING = "running"
+    PAUSED = "paused"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+
+
+class EnrichmentJob(Base):
+    """A batch of enrichment tasks started by one request; live counters are kept in Redis"""
+
+    __tablename__ = "enrichment_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(SQLEnum(JobStatus), default=JobStatus.RUNNING)
+    enrichment_types = Column(JSON, nullable=True)
+    priority = Column(Integer, nullable=True)  # Celery priority lane its tasks are dispatched in
+    lead_count = Column(Integer, default=0)
+    task_count = Column(Integer, default=0)
+    counts = Column(JSON, nullable=True)  # final counters, copied from Redis when the job finishes
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    paused_at = Column(DateTime, nullable=True)
+    paused_seconds = Column(Integer, default=0)  # time spent paused, excluded from throughput
+    completed_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    tasks = relationship("EnrichmentTask", back_populates="job")
+
+
+class Company(Base):
+    """A company shared by every lead at the same normalized domain"""
+
+    __tablename__ = "companies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    domain = Column(String, unique=True, nullable=False)  # normalized, e.g. "acme.com"
+    name = Column(String, nullable=True)
+    enriched_data = Column(JSON, nullable=True)  # company-scoped provider output keyed by enrichment type
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    leads = relationship("Lead", back_populates="company_entity")
+    enrichment_tasks = relationship("CompanyEnrichmentTask", back_populates="company")
+
+
+# Weighted words of a lead for full-text search: name (A), company (B), title and email (C), enriched
+# headline, industry and city (D). The email is split at "@" and "." so its domain words match.
+LEAD_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(company, '') || ' ' "
+    "|| coalesce(enriched_data #>> '{apollo,person,organization,name}', '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(title, '') || ' ' || translate(coalesce(email, ''), '@.', '  ')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(enriched_data #>> '{apollo,person,headline}', '') || ' ' "
+    "|| coalesce(enriched_data #>> '{apollo,person,organization,industry}', '') || ' ' "
+    "|| coalesce(enriched_data #>> '{apollo,person,city}', '')), 'D')"
+)
+# Lowercased name, company, title and email for typo-tolerant trigram matching
+LEAD_SEARCH_TEXT = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(company, '') || ' ' "
+    "|| coalesce(title, '') || ' ' || coalesce(email, ''))"
+)
+
+
 class Lead(Base):
     __tablename__ = "leads"
 
@@ -26,6 +106,7 @@ class Lead(Base):
     linkedin_url = Column(String, nullable=True)
     email = Column(String, nullable=True)
     phone = Column(String, nullable=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True, index=True)
 
     # Enrichment data
     enrichment_status = Column(SQLEnum(EnrichmentStatus), default=EnrichmentStatus.PENDING)
@@ -33,10 +114,28 @@ class Lead(Base):
 
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # Search columns computed by Postgres on every write; deferred so loading a lead never reads them
+    search_vector = deferred(Column(TSVECTOR, Computed(LEAD_SEARCH_VECTOR, persisted=True)))
+    search_text = deferred(Column(Text, Computed(LEAD_SEARCH_TEXT, persisted=True)))
+
+    __table_args__ = (
+        # Email waterfall cache: an email already verified for the same person on another lead
+        Index("ix_leads_lower_first_name_last_name", func.lower(first_name), func.lower(last_name)),
+        Index("ix_leads_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_leads_search_text_trgm",
+            "search_text",
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        ),
+    )
 
     # Relationships
     enrichment_tasks = relationship("EnrichmentTask", back_populates="lead")
+    enrichment_result = relationship("EnrichmentResult", back_populates="lead", uselist=False)
+    company_entity = relationship("Company", back_populates="leads")
 
 
 class EnrichmentTask(Base):
@@ -44,14 +143,145 @@ class EnrichmentTask(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey("leads.id"))
+    job_id = Column(Integer, ForeignKey("enrichment_jobs.id"), nullable=True, index=True)
     task_type = Column(String)  # e.g., "email_validation", "apollo_enrichment", "ai_enrichment"
     status = Column(SQLEnum(EnrichmentStatus), default=EnrichmentStatus.PENDING)
     result = Column(JSON, nullable=True)
     error_message = Column(String, nullable=True)
-    celery_task_id = Column(String, nullable=True)
+    error_class = Column(String, nullable=True)  # timeout, network, server_error, rate_limited, client_error, ...
+    attempts = Column(Integer, default=0)
+    celery_task_id = Column(String, nullable=True, index=True)  # or "retry:<id>" while awaiting a bulk retry
+    input_fingerprint = Column(String(64), nullable=True)  # hash of the lead fields the provider used
 
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # drives status ETags
     completed_at = Column(DateTime, nullable=True)
 
+    __table_args__ = (
+        # Serves every per-lead lookup: status polls, retries, the completion check and the freshness skip
+        Index("ix_enrichment_tasks_lead_id_status", "lead_id", "status"),
+    )
+
     # Relationships
     lead = relationship("Lead", back_populates="enrichment_tasks")
+    job = relationship("EnrichmentJob", back_populates="tasks")
+
+
+class EnrichmentTaskArchive(Base):
+    """Superseded enrichment tasks moved out of enrichment_tasks by the retention job, one partition per month"""
+
+    __tablename__ = "enrichment_task_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)  # id the task had in enrichment_tasks
+    lead_id = Column(Integer, nullable=True, index=True)  # no foreign key: history outlives deleted leads
+    job_id = Column(Integer, nullable=True)
+    task_type = Column(String)
+    status = Column(SQLEnum(EnrichmentStatus))
+    result = Column(JSON, nullable=True)
+    error_message = Column(String, nullable=True)
+    error_class = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+
+    created_at = Column(DateTime, primary_key=True)  # partition key, so part of the primary key
+    completed_at = Column(DateTime, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
+
+
+class EnrichmentTaskSummary(Base):
+    """Per-lead, per-type totals of the task history compacted out of enrichment_tasks"""
+
+    __tablename__ = "enrichment_task_summaries"
+
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+    task_type = Column(String, primary_key=True)
+    runs = Column(Integer, default=0)
+    completed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    cancelled = Column(Integer, default=0)
+    attempts = Column(Integer, default=0)  # provider calls across all compacted runs
+
+    first_created_at = Column(DateTime, nullable=True)
+    last_completed_at = Column(DateTime, nullable=True)
+    last_error_class = Column(String, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class CompanyEnrichmentTask(Base):
+    """One run of a company-scoped enrichment, shared by every lead of the company"""
+
+    __tablename__ = "company_enrichment_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    task_type = Column(String, nullable=False)  # scraper, contact_page, company_info
+    status = Column(SQLEnum(EnrichmentStatus), default=EnrichmentStatus.PROCESSING)
+    result = Column(JSON, nullable=True)
+    error_message = Column(String, nullable=True)
+    error_class = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    celery_task_id = Column(String, nullable=True)  # lead task currently running the provider call
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    claimed_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (UniqueConstraint("company_id", "task_type", name="uq_company_enrichment_tasks_company_type"),)
+
+    # Relationships
+    company = relationship("Company", back_populates="enrichment_tasks")
+
+
+class ScrapedPage(Base):
+    """Validators and parsed result of the last download of a URL, so a re-scrape can skip unchanged pages"""
+
+    __tablename__ = "scraped_pages"
+
+    id = Column(Integer, primary_key=True)
+    url = Column(String, unique=True, nullable=False)
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)  # sent back verbatim in If-Modified-Since
+    content_hash = Column(String(64), nullable=True)  # sha256 of the body
+    result = Column(JSON, nullable=True)  # what scrape_company_website returned for this body
+
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+    changed_at = Column(DateTime, default=datetime.utcnow)
+
+
+class ProviderPayload(Base):
+    """A raw provider response, stored once and compressed; results keep its projected fields and hash"""
+
+    __tablename__ = "provider_payloads"
+
+    hash = Column(String(64), primary_key=True)  # sha256 of the canonical JSON
+    enrichment_type = Column(String, nullable=False)
+    size = Column(Integer, nullable=False)  # bytes of JSON before compression
+    body = Column(LargeBinary, nullable=False)  # zlib-compressed canonical JSON
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class EnrichmentResult(Base):
+    """Per-lead projection of provider output, with hot attributes broken out for filtering"""
+
+    __tablename__ = "enrichment_results"
+
+    lead_id = Column(Integer, ForeignKey("leads.id", ondelete="CASCADE"), primary_key=True)
+
+    # Normalized (lowercase) attributes extracted from provider output
+    email_status = Column(String, nullable=True, index=True)  # valid, invalid, accept_all, unknown, ...
+    industry = Column(String, nullable=True, index=True)
+    company_size = Column(String, nullable=True, index=True)  # employee bucket, e.g. "51-200"
+    seniority = Column(String, nullable=True, index=True)
+
+    data = Column(JSONB, nullable=True)  # provider output keyed by enrichment type
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        # jsonb_path_ops serves containment (@>) lookups on arbitrary paths
+        Index("ix_enrichment_results_data", "data", postgresql_using="gin", postgresql_ops={"data": "jsonb_path_ops"}),
+    )
+
+    # Relationships
+    lead = relationship("Lead", back_populates="enrichment_result")
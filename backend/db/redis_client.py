@@ -0,0 +1,25 @@
+import os
+
+import redis
+import redis.asyncio
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+_client = None
+_async_client = None
+
+
+def get_redis() -> redis.Redis:
+    """Shared synchronous Redis client (breakers, counters, result streams)"""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL)
+    return _client
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """Shared asyncio Redis client for API endpoints that wait on Redis"""
+    global _async_client
+    if _async_client is None:
+        _async_client = redis.asyncio.Redis.from_url(REDIS_URL)
+    return _async_client
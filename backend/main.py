@@ -1,22 +1,13 @@
-from contextlib import asynccontextmanager
-
-from db.database import Base, engine
+from db import database
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import enrich, leads
-
-
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup: Create database tables
-    Base.metadata.create_all(bind=engine)
-    yield
-    # Shutdown: cleanup if needed
+from routes import enrich, leads, profiling
 
+# The schema is managed by migrations ("alembic upgrade head"), not created at startup
+app = FastAPI(title="Clay Clone API", description="Lead enrichment and management API", version="1.0.0")
 
-app = FastAPI(
-    title="Clay Clone API", description="Lead enrichment and management API", version="1.0.0", lifespan=lifespan
-)
+# Opt-in request profiling (X-Profile header or PROFILE_SAMPLE_RATE)
+app.add_middleware(profiling.ProfilingMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -30,6 +21,7 @@ app.add_middleware(
 # Include routers
 app.include_router(leads.router, prefix="/api/leads", tags=["leads"])
 app.include_router(enrich.router, prefix="/api/enrich", tags=["enrich"])
+app.include_router(profiling.router, prefix="/api/profiles", tags=["profiles"])
 
 
 @app.get("/")
@@ -40,3 +32,9 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/db")
+async def db_pool_health():
+    """Connection pool saturation and checkout wait metrics for this API process"""
+    return database.get_pool_stats()
@@ -0,0 +1,44 @@
+from logging.config import fileConfig
+
+from alembic import context
+from db import models  # noqa: F401  registers every table on Base.metadata
+from db.database import DATABASE_URL, Base
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit the migration SQL without connecting ("alembic upgrade head --sql")"""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations on a dedicated connection, without the API pool's statement timeout"""
+    connectable = create_engine(DATABASE_URL, poolclass=NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
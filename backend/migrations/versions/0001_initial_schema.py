@@ -0,0 +1,69 @@
+"""Initial schema: leads and enrichment_tasks
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+Databases created by the old create_all startup already have these tables: run
+"alembic stamp 0001" once, then "alembic upgrade head".
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+enrichment_status = sa.Enum("PENDING", "PROCESSING", "COMPLETED", "FAILED", name="enrichmentstatus")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "leads",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("first_name", sa.String(), nullable=True),
+        sa.Column("last_name", sa.String(), nullable=True),
+        sa.Column("company", sa.String(), nullable=True),
+        sa.Column("title", sa.String(), nullable=True),
+        sa.Column("website", sa.String(), nullable=True),
+        sa.Column("linkedin_url", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("phone", sa.String(), nullable=True),
+        sa.Column("enrichment_status", enrichment_status, nullable=True),
+        sa.Column("enriched_data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_leads_id", "leads", ["id"])
+
+    op.create_table(
+        "enrichment_tasks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("lead_id", sa.Integer(), nullable=True),
+        sa.Column("task_type", sa.String(), nullable=True),
+        sa.Column("status", enrichment_status, nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.Column("celery_task_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["lead_id"], ["leads.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_enrichment_tasks_id", "enrichment_tasks", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_enrichment_tasks_id", table_name="enrichment_tasks")
+    op.drop_table("enrichment_tasks")
+    op.drop_index("ix_leads_id", table_name="leads")
+    op.drop_table("leads")
+    enrichment_status.drop(op.get_bind(), checkfirst=True)
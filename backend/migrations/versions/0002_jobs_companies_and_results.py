@@ -0,0 +1,189 @@
+"""Enrichment jobs, companies and result projections
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+Releases before migrations ran create_all at startup, which created the new tables but never added columns
+to existing ones, so a database from any of them may hold part of this revision. After "alembic stamp 0001"
+every table, column, index and foreign key below is only created when it is missing.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Created by 0001
+enrichment_status = postgresql.ENUM(name="enrichmentstatus", create_type=False)
+
+
+def _inspector():
+    # Offline (--sql) runs have no database to inspect and emit the full revision
+    return None if op.get_context().as_sql else sa.inspect(op.get_bind())
+
+
+def _has_table(table: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and inspector.has_table(table)
+
+
+def _has_column(table: str, column: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and column in {c["name"] for c in inspector.get_columns(table)}
+
+
+def _has_index(table: str, index: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and index in {i["name"] for i in inspector.get_indexes(table)}
+
+
+def _has_foreign_key(table: str, referred_table: str, column: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and any(
+        fk["referred_table"] == referred_table and fk["constrained_columns"] == [column]
+        for fk in inspector.get_foreign_keys(table)
+    )
+
+
+def _create_table(table: str, *columns):
+    if not _has_table(table):
+        op.create_table(table, *columns)
+
+
+def _create_index(index: str, table: str, columns: list[str], **kw):
+    if not _has_index(table, index):
+        op.create_index(index, table, columns, unique=False, **kw)
+
+
+def _add_column(table: str, column: sa.Column):
+    if not _has_column(table, column.name):
+        op.add_column(table, column)
+
+
+def _create_foreign_key(name: str, table: str, referred_table: str, column: str):
+    if not _has_foreign_key(table, referred_table, column):
+        op.create_foreign_key(name, table, referred_table, [column], ["id"])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _create_table(
+        "companies",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("domain", sa.String(), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column("enriched_data", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("domain"),
+    )
+    _create_index(op.f("ix_companies_id"), "companies", ["id"])
+    _create_table(
+        "enrichment_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("status", sa.Enum("RUNNING", "PAUSED", "CANCELLED", "COMPLETED", name="jobstatus"), nullable=True),
+        sa.Column("enrichment_types", sa.JSON(), nullable=True),
+        sa.Column("priority", sa.Integer(), nullable=True),
+        sa.Column("lead_count", sa.Integer(), nullable=True),
+        sa.Column("task_count", sa.Integer(), nullable=True),
+        sa.Column("counts", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("paused_at", sa.DateTime(), nullable=True),
+        sa.Column("paused_seconds", sa.Integer(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    _create_index(op.f("ix_enrichment_jobs_id"), "enrichment_jobs", ["id"])
+    _create_table(
+        "company_enrichment_tasks",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("task_type", sa.String(), nullable=False),
+        sa.Column("status", enrichment_status, nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.Column("error_class", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("celery_task_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("company_id", "task_type", name="uq_company_enrichment_tasks_company_type"),
+    )
+    _create_index(op.f("ix_company_enrichment_tasks_id"), "company_enrichment_tasks", ["id"])
+    _create_table(
+        "enrichment_results",
+        sa.Column("lead_id", sa.Integer(), nullable=False),
+        sa.Column("email_status", sa.String(), nullable=True),
+        sa.Column("industry", sa.String(), nullable=True),
+        sa.Column("company_size", sa.String(), nullable=True),
+        sa.Column("seniority", sa.String(), nullable=True),
+        sa.Column("data", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["lead_id"], ["leads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("lead_id"),
+    )
+    _create_index(op.f("ix_enrichment_results_company_size"), "enrichment_results", ["company_size"])
+    _create_index(
+        "ix_enrichment_results_data",
+        "enrichment_results",
+        ["data"],
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+    _create_index(op.f("ix_enrichment_results_email_status"), "enrichment_results", ["email_status"])
+    _create_index(op.f("ix_enrichment_results_industry"), "enrichment_results", ["industry"])
+    _create_index(op.f("ix_enrichment_results_seniority"), "enrichment_results", ["seniority"])
+    _add_column("enrichment_tasks", sa.Column("job_id", sa.Integer(), nullable=True))
+    _add_column("enrichment_tasks", sa.Column("error_class", sa.String(), nullable=True))
+    _add_column("enrichment_tasks", sa.Column("attempts", sa.Integer(), nullable=True))
+    _add_column("enrichment_tasks", sa.Column("input_fingerprint", sa.String(length=64), nullable=True))
+    _create_index(op.f("ix_enrichment_tasks_celery_task_id"), "enrichment_tasks", ["celery_task_id"])
+    _create_index(op.f("ix_enrichment_tasks_job_id"), "enrichment_tasks", ["job_id"])
+    _create_foreign_key("enrichment_tasks_job_id_fkey", "enrichment_tasks", "enrichment_jobs", "job_id")
+    _add_column("leads", sa.Column("company_id", sa.Integer(), nullable=True))
+    _create_index(op.f("ix_leads_company_id"), "leads", ["company_id"])
+    _create_foreign_key("leads_company_id_fkey", "leads", "companies", "company_id")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("leads_company_id_fkey", "leads", type_="foreignkey")
+    op.drop_index(op.f("ix_leads_company_id"), table_name="leads")
+    op.drop_column("leads", "company_id")
+    op.drop_constraint("enrichment_tasks_job_id_fkey", "enrichment_tasks", type_="foreignkey")
+    op.drop_index(op.f("ix_enrichment_tasks_job_id"), table_name="enrichment_tasks")
+    op.drop_index(op.f("ix_enrichment_tasks_celery_task_id"), table_name="enrichment_tasks")
+    op.drop_column("enrichment_tasks", "input_fingerprint")
+    op.drop_column("enrichment_tasks", "attempts")
+    op.drop_column("enrichment_tasks", "error_class")
+    op.drop_column("enrichment_tasks", "job_id")
+    op.drop_index(op.f("ix_enrichment_results_seniority"), table_name="enrichment_results")
+    op.drop_index(op.f("ix_enrichment_results_industry"), table_name="enrichment_results")
+    op.drop_index(op.f("ix_enrichment_results_email_status"), table_name="enrichment_results")
+    op.drop_index(
+        "ix_enrichment_results_data",
+        table_name="enrichment_results",
+        postgresql_using="gin",
+        postgresql_ops={"data": "jsonb_path_ops"},
+    )
+    op.drop_index(op.f("ix_enrichment_results_company_size"), table_name="enrichment_results")
+    op.drop_table("enrichment_results")
+    op.drop_index(op.f("ix_company_enrichment_tasks_id"), table_name="company_enrichment_tasks")
+    op.drop_table("company_enrichment_tasks")
+    op.drop_index(op.f("ix_enrichment_jobs_id"), table_name="enrichment_jobs")
+    op.drop_table("enrichment_jobs")
+    op.drop_index(op.f("ix_companies_id"), table_name="companies")
+    op.drop_table("companies")
+    sa.Enum(name="jobstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""Lead and task change timestamps
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("enrichment_tasks", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE enrichment_tasks SET updated_at = coalesce(completed_at, created_at)")
+    op.create_index(op.f("ix_leads_updated_at"), "leads", ["updated_at"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_leads_updated_at"), table_name="leads")
+    op.drop_column("enrichment_tasks", "updated_at")
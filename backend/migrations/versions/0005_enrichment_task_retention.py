@@ -0,0 +1,79 @@
+"""Enrichment task retention
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+enrichment_status = postgresql.ENUM(name="enrichmentstatus", create_type=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # enrichment_tasks can be very large: build the index without blocking writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_enrichment_tasks_lead_id_status",
+            "enrichment_tasks",
+            ["lead_id", "status"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+    # Partitions are created month by month by the compact_task_history task as it archives
+    op.create_table(
+        "enrichment_task_archive",
+        sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("lead_id", sa.Integer(), nullable=True),
+        sa.Column("job_id", sa.Integer(), nullable=True),
+        sa.Column("task_type", sa.String(), nullable=True),
+        sa.Column("status", enrichment_status, nullable=True),
+        sa.Column("result", sa.JSON(), nullable=True),
+        sa.Column("error_message", sa.String(), nullable=True),
+        sa.Column("error_class", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+    op.create_index(op.f("ix_enrichment_task_archive_lead_id"), "enrichment_task_archive", ["lead_id"], unique=False)
+    op.create_table(
+        "enrichment_task_summaries",
+        sa.Column("lead_id", sa.Integer(), nullable=False),
+        sa.Column("task_type", sa.String(), nullable=False),
+        sa.Column("runs", sa.Integer(), nullable=True),
+        sa.Column("completed", sa.Integer(), nullable=True),
+        sa.Column("failed", sa.Integer(), nullable=True),
+        sa.Column("cancelled", sa.Integer(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("first_created_at", sa.DateTime(), nullable=True),
+        sa.Column("last_completed_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error_class", sa.String(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["lead_id"], ["leads.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("lead_id", "task_type"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("enrichment_task_summaries")
+    op.drop_index(op.f("ix_enrichment_task_archive_lead_id"), table_name="enrichment_task_archive")
+    # Drops the monthly partitions with it
+    op.drop_table("enrichment_task_archive")
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_enrichment_tasks_lead_id_status", table_name="enrichment_tasks", postgresql_concurrently=True)
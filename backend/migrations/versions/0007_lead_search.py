@@ -0,0 +1,61 @@
+"""Lead search
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 00:00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same expressions as LEAD_SEARCH_VECTOR and LEAD_SEARCH_TEXT in db/models.py at this revision
+LEAD_SEARCH_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(company, '') || ' ' "
+    "|| coalesce(enriched_data #>> '{apollo,person,organization,name}', '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(title, '') || ' ' || translate(coalesce(email, ''), '@.', '  ')), 'C') || "
+    "setweight(to_tsvector('simple', coalesce(enriched_data #>> '{apollo,person,headline}', '') || ' ' "
+    "|| coalesce(enriched_data #>> '{apollo,person,organization,industry}', '') || ' ' "
+    "|| coalesce(enriched_data #>> '{apollo,person,city}', '')), 'D')"
+)
+LEAD_SEARCH_TEXT = (
+    "lower(coalesce(first_name, '') || ' ' || coalesce(last_name, '') || ' ' || coalesce(company, '') || ' ' "
+    "|| coalesce(title, '') || ' ' || coalesce(email, ''))"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Stored generated columns rewrite the leads table once; on a large table run this in a maintenance window
+    op.add_column(
+        "leads", sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(LEAD_SEARCH_VECTOR, persisted=True))
+    )
+    op.add_column("leads", sa.Column("search_text", sa.Text(), sa.Computed(LEAD_SEARCH_TEXT, persisted=True)))
+    op.create_index("ix_leads_search_vector", "leads", ["search_vector"], unique=False, postgresql_using="gin")
+    op.create_index(
+        "ix_leads_search_text_trgm",
+        "leads",
+        ["search_text"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"search_text": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_leads_search_text_trgm", table_name="leads")
+    op.drop_index("ix_leads_search_vector", table_name="leads")
+    op.drop_column("leads", "search_text")
+    op.drop_column("leads", "search_vector")
@@ -0,0 +1,37 @@
+"""Lead name index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 00:00:00
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Built concurrently so writes to leads continue during the build
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_leads_lower_first_name_last_name",
+            "leads",
+            [sa.text("lower(first_name)"), sa.text("lower(last_name)")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_leads_lower_first_name_last_name", table_name="leads", postgresql_concurrently=True)
@@ -1,76 +1,348 @@
+from collections import Counter
+from datetime import datetime
+import json
+import os
+from typing import Literal
+from uuid import uuid4
+
 from db.database import get_db
-from db.models import EnrichmentStatus, EnrichmentTask, Lead
-from fastapi import APIRouter, Depends, HTTPException
+from db.models import EnrichmentJob, EnrichmentStatus, EnrichmentTask, JobStatus, Lead
+from db.redis_client import get_async_redis
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from services.companies import release_failed_company_enrichments
+from services.email_waterfall import get_waterfall_stats
+from services.freshness import freshness_cutoff, is_fresh
+from services.jobs import (
+    PAUSED_TASK_ID,
+    finish_job_if_done,
+    init_job,
+    job_progress,
+    record_job_transition,
+    reopen_jobs,
+    set_job_state,
+    set_task_status,
+)
+from services.payloads import load_payload
+from services.task_history import get_task_history
+from sqlalchemy import and_, func, insert, or_, select, update
 from sqlalchemy.orm import Session
-from workers.tasks import enrich_lead_task
+from workers.celery_app import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    dispatch_bulk_retry,
+    dispatch_enrichment,
+    dispatch_generate_intros,
+    get_queue_depths,
+    intro_stream_key,
+)
+from workers.retry_policy import BREAKER_PROVIDERS, CircuitBreaker
+
+from .responses import is_not_modified, make_etag, not_modified, validator_headers
 
 router = APIRouter()
 
+# Requests up to this many leads are treated as interactive unless told otherwise
+INTERACTIVE_MAX_LEADS = int(os.getenv("INTERACTIVE_MAX_LEADS", "25"))
+
+# Tasks re-dispatched per round trip when a paused job resumes
+JOB_DISPATCH_BATCH_SIZE = int(os.getenv("JOB_DISPATCH_BATCH_SIZE", "1000"))
+
+# Task type of generated intros; they are regenerated with POST /intros, never retried as enrich_lead
+INTRO_TASK_TYPE = "intro"
+# Leads per generate_intros worker task; chunks run in parallel across AI workers
+INTRO_CHUNK_SIZE = int(os.getenv("INTRO_CHUNK_SIZE", "50"))
+# Give up on a stream that has produced nothing for this long
+INTRO_STREAM_IDLE_SECONDS = int(os.getenv("INTRO_STREAM_IDLE_SECONDS", "300"))
+
 
 class EnrichmentRequest(BaseModel):
     lead_ids: list[int]
     enrichment_types: list[str]  # e.g., ["email", "apollo", "ai"]
+    priority: Literal["interactive", "bulk"] | None = None  # defaults by request size
+    skip_fresh: bool = False  # reuse results whose inputs are unchanged and within the provider TTL
 
 
 class EnrichmentResponse(BaseModel):
     message: str
     task_ids: list[str]
     lead_count: int
+    skipped: int = 0
+    job_id: int | None = None  # poll GET /api/enrich/jobs/{job_id} for progress
+
+
+def _find_fresh_results(db: Session, leads: list[Lead], enrichment_types: list[str]) -> set[tuple[int, str]]:
+    """(lead_id, enrichment_type) pairs that already have a fresh completed result"""
+    if not leads or not enrichment_types:
+        return set()
+
+    leads_by_id = {lead.id: lead for lead in leads}
+    candidates = (
+        db.query(EnrichmentTask)
+        .filter(
+            EnrichmentTask.lead_id.in_(leads_by_id.keys()),
+            EnrichmentTask.status == EnrichmentStatus.COMPLETED,
+            or_(
+                *(
+                    and_(
+                        EnrichmentTask.task_type == enrich_type,
+                        EnrichmentTask.completed_at >= freshness_cutoff(enrich_type),
+                    )
+                    for enrich_type in set(enrichment_types)
+                )
+            ),
+        )
+        .all()
+    )
+
+    return {(task.lead_id, task.task_type) for task in candidates if is_fresh(task, leads_by_id[task.lead_id])}
 
 
 @router.post("/", response_model=EnrichmentResponse)
 async def enrich_leads(request: EnrichmentRequest, db: Session = Depends(get_db)):
     """
-    Trigger enrichment for multiple leads
-    Enrichment types: email, apollo, ai, scraper
+    Trigger enrichment for multiple leads as one job
+    Enrichment types: email, email_waterfall, apollo, ai, scraper, contact_page, company_info
     """
     # Validate leads exist
     leads = db.query(Lead).filter(Lead.id.in_(request.lead_ids)).all()
     if len(leads) != len(request.lead_ids):
         raise HTTPException(status_code=404, detail="Some leads not found")
 
-    task_ids = []
+    if request.priority:
+        interactive = request.priority == "interactive"
+    else:
+        interactive = len(leads) <= INTERACTIVE_MAX_LEADS
+    priority = PRIORITY_INTERACTIVE if interactive else PRIORITY_BULK
+
+    fresh = _find_fresh_results(db, leads, request.enrichment_types) if request.skip_fresh else set()
 
+    rows = []
+    lead_ids = []
     for lead in leads:
-        # Update status to processing
-        lead.enrichment_status = EnrichmentStatus.PROCESSING
+        enrich_types = [t for t in request.enrichment_types if (lead.id, t) not in fresh]
+        if enrich_types:
+            lead_ids.append(lead.id)
+        for enrich_type in enrich_types:
+            # Celery ids are assigned up front so rows are committed before any worker can pick them up
+            rows.append(
+                {
+                    "lead_id": lead.id,
+                    "task_type": enrich_type,
+                    "status": EnrichmentStatus.PENDING,
+                    "celery_task_id": str(uuid4()),
+                }
+            )
+    skipped = len(leads) * len(request.enrichment_types) - len(rows)
+
+    response = {
+        "message": f"Enrichment started for {len(leads)} leads",
+        "task_ids": [row["celery_task_id"] for row in rows],
+        "lead_count": len(leads),
+        "skipped": skipped,
+    }
+    if not rows:
+        return response
+
+    job = EnrichmentJob(
+        status=JobStatus.RUNNING,
+        enrichment_types=sorted(set(request.enrichment_types)),
+        priority=priority,
+        lead_count=len(lead_ids),
+        task_count=len(rows),
+    )
+    db.add(job)
+    db.flush()
+
+    task_ids = (
+        db.execute(
+            insert(EnrichmentTask).returning(EnrichmentTask.id, sort_by_parameter_order=True),
+            [{**row, "job_id": job.id} for row in rows],
+        )
+        .scalars()
+        .all()
+    )
+    db.execute(update(Lead).where(Lead.id.in_(lead_ids)).values(enrichment_status=EnrichmentStatus.PROCESSING))
+    db.commit()
+
+    init_job(job.id, Counter(row["task_type"] for row in rows))
+    for row, task_id in zip(rows, task_ids):
+        dispatch_enrichment(
+            row["lead_id"], row["task_type"], task_id, priority=priority, celery_task_id=row["celery_task_id"]
+        )
+
+    return {**response, "job_id": job.id}
+
+
+def _get_job(db: Session, job_id: int) -> EnrichmentJob:
+    job = db.query(EnrichmentJob).filter(EnrichmentJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_progress(job_id: int, db: Session = Depends(get_db)):
+    """Get a job's task counts (overall and per provider), throughput and ETA"""
+    return job_progress(db, _get_job(db, job_id))
 
-        # Create enrichment tasks
-        for enrich_type in request.enrichment_types:
-            task = EnrichmentTask(lead_id=lead.id, task_type=enrich_type, status=EnrichmentStatus.PENDING)
-            db.add(task)
-            db.flush()  # Get the task ID
 
-            # Trigger Celery task
-            celery_task = enrich_lead_task.delay(lead.id, enrich_type, task.id)
-            task.celery_task_id = celery_task.id
-            task_ids.append(celery_task.id)
+@router.post("/jobs/{job_id}/pause")
+async def pause_job(job_id: int, db: Session = Depends(get_db)):
+    """Stop a job's tasks from calling providers; queued tasks are dropped until the job resumes"""
+    job = _get_job(db, job_id)
+    if job.status != JobStatus.RUNNING:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
 
+    set_job_state(job.id, JobStatus.PAUSED)
+    job.status = JobStatus.PAUSED
+    job.paused_at = datetime.utcnow()
     db.commit()
+    return job_progress(db, job)
 
-    return {"message": f"Enrichment started for {len(leads)} leads", "task_ids": task_ids, "lead_count": len(leads)}
+
+@router.post("/jobs/{job_id}/resume")
+async def resume_job(job_id: int, db: Session = Depends(get_db)):
+    """Resume a paused job and re-dispatch the tasks dropped while it was paused"""
+    job = _get_job(db, job_id)
+    if job.status not in (JobStatus.PAUSED, JobStatus.RUNNING):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+
+    if job.status == JobStatus.PAUSED:
+        job.paused_seconds = (job.paused_seconds or 0) + int((datetime.utcnow() - job.paused_at).total_seconds())
+        job.paused_at = None
+        job.status = JobStatus.RUNNING
+        db.commit()
+    set_job_state(job.id, JobStatus.RUNNING)
+
+    # Safe to call again: anything still marked paused is picked up on the next resume
+    dispatched = 0
+    while True:
+        parked = (
+            db.query(EnrichmentTask.id, EnrichmentTask.lead_id, EnrichmentTask.task_type)
+            .filter(
+                EnrichmentTask.job_id == job.id,
+                EnrichmentTask.status == EnrichmentStatus.PENDING,
+                EnrichmentTask.celery_task_id == PAUSED_TASK_ID,
+            )
+            .order_by(EnrichmentTask.id)
+            .limit(JOB_DISPATCH_BATCH_SIZE)
+            .all()
+        )
+        if not parked:
+            break
+
+        celery_ids = {task.id: str(uuid4()) for task in parked}
+        db.execute(
+            update(EnrichmentTask),
+            [{"id": task_id, "celery_task_id": celery_id} for task_id, celery_id in celery_ids.items()],
+        )
+        db.commit()
+
+        for task in parked:
+            dispatch_enrichment(
+                task.lead_id, task.task_type, task.id, priority=job.priority, celery_task_id=celery_ids[task.id]
+            )
+        dispatched += len(parked)
+
+    return {**job_progress(db, job), "dispatched": dispatched}
+
+
+@router.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: int, db: Session = Depends(get_db)):
+    """Cancel a job: pending tasks are marked cancelled at once, running ones finish their current call"""
+    job = _get_job(db, job_id)
+    if job.status not in (JobStatus.RUNNING, JobStatus.PAUSED):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+
+    set_job_state(job.id, JobStatus.CANCELLED)
+    job.status = JobStatus.CANCELLED
+    cancelled_types = (
+        db.execute(
+            update(EnrichmentTask)
+            .where(EnrichmentTask.job_id == job.id, EnrichmentTask.status == EnrichmentStatus.PENDING)
+            .values(
+                status=EnrichmentStatus.FAILED,
+                error_message="Job cancelled",
+                error_class="cancelled",
+                completed_at=datetime.utcnow(),
+            )
+            .returning(EnrichmentTask.task_type)
+        )
+        .scalars()
+        .all()
+    )
+    db.commit()
+
+    for enrichment_type, count in Counter(cancelled_types).items():
+        record_job_transition(job.id, enrichment_type, "pending", "cancelled", count)
+    finish_job_if_done(db, job.id)
+
+    db.refresh(job)
+    return job_progress(db, job)
+
+
+@router.get("/queues")
+async def get_queue_status():
+    """Get pending message counts for every enrichment queue"""
+    return get_queue_depths()
+
+
+@router.get("/breakers")
+async def get_breaker_status():
+    """Get circuit breaker state for every guarded provider"""
+    return {provider: CircuitBreaker(provider).state() for provider in sorted(BREAKER_PROVIDERS)}
+
+
+@router.get("/waterfall/stats")
+async def get_email_waterfall_stats():
+    """Get calls, wins and average latency per email waterfall source"""
+    return get_waterfall_stats()
 
 
 @router.get("/status/{lead_id}")
-async def get_enrichment_status(lead_id: int, db: Session = Depends(get_db)):
-    """Get enrichment status for a specific lead"""
+async def get_enrichment_status(lead_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Get enrichment status for a specific lead
+    The ETag is derived from the lead's and its tasks' updated_at, so polls that change nothing get a 304
+    without loading task results
+    """
+    version = db.execute(
+        select(Lead.updated_at, func.count(EnrichmentTask.id), func.max(EnrichmentTask.updated_at))
+        .outerjoin(EnrichmentTask, EnrichmentTask.lead_id == Lead.id)
+        .where(Lead.id == lead_id)
+        .group_by(Lead.id)
+    ).first()
+    if not version:
+        raise HTTPException(status_code=404, detail="Lead not found")
+
+    lead_updated_at, task_count, tasks_updated_at = version
+    etag = make_etag(lead_id, lead_updated_at, task_count, tasks_updated_at)
+    last_modified = max(filter(None, (lead_updated_at, tasks_updated_at)), default=None)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    response.headers.update(validator_headers(etag, last_modified))
+
     lead = db.query(Lead).filter(Lead.id == lead_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
-
     tasks = db.query(EnrichmentTask).filter(EnrichmentTask.lead_id == lead_id).all()
 
     return {
         "lead_id": lead_id,
         "overall_status": lead.enrichment_status.value,
         "enriched_data": lead.enriched_data,
+        # Totals of older runs compacted out of tasks by the retention job
+        "history": get_task_history(db, lead_id),
         "tasks": [
             {
                 "task_type": task.task_type,
                 "status": task.status.value,
                 "result": task.result,
                 "error_message": task.error_message,
+                "error_class": task.error_class,
+                "attempts": task.attempts,
                 "created_at": task.created_at.isoformat() if task.created_at else None,
                 "completed_at": task.completed_at.isoformat() if task.completed_at else None,
             }
@@ -79,9 +351,23 @@ async def get_enrichment_status(lead_id: int, db: Session = Depends(get_db)):
     }
 
 
+@router.get("/payloads/{digest}")
+async def get_provider_payload(digest: str, db: Session = Depends(get_db)):
+    """Get the full provider response behind a result's "payload" hash"""
+    body = load_payload(db, digest)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Payload not found")
+    # Content-addressed, so a payload never changes
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": f'"{digest}"', "Cache-Control": "private, max-age=31536000, immutable"},
+    )
+
+
 @router.post("/retry/{lead_id}")
-async def retry_enrichment(lead_id: int, db: Session = Depends(get_db)):
-    """Retry failed enrichment tasks for a lead"""
+async def retry_enrichment(lead_id: int, skip_fresh: bool = False, db: Session = Depends(get_db)):
+    """Retry failed enrichment tasks for a lead, optionally skipping types with a fresh result"""
     lead = db.query(Lead).filter(Lead.id == lead_id).first()
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
@@ -89,24 +375,251 @@ async def retry_enrichment(lead_id: int, db: Session = Depends(get_db)):
     # Find failed tasks
     failed_tasks = (
         db.query(EnrichmentTask)
-        .filter(EnrichmentTask.lead_id == lead_id, EnrichmentTask.status == EnrichmentStatus.FAILED)
+        .filter(
+            EnrichmentTask.lead_id == lead_id,
+            EnrichmentTask.status == EnrichmentStatus.FAILED,
+            EnrichmentTask.task_type != INTRO_TASK_TYPE,
+        )
         .all()
     )
 
+    if skip_fresh:
+        fresh = _find_fresh_results(db, [lead], [task.task_type for task in failed_tasks])
+        failed_tasks = [task for task in failed_tasks if (lead.id, task.task_type) not in fresh]
+
+    # A task another retry reset first is left to that retry
+    failed_tasks = [
+        task
+        for task in failed_tasks
+        if set_task_status(
+            db,
+            task,
+            EnrichmentStatus.PENDING,
+            error_message=None,
+            error_class=None,
+            attempts=0,
+            completed_at=None,
+            celery_task_id=str(uuid4()),
+        )
+    ]
     if not failed_tasks:
+        db.rollback()
         return {"message": "No failed tasks to retry"}
 
+    release_failed_company_enrichments(db, [task.id for task in failed_tasks])
+    reopen_jobs(db, {task.job_id for task in failed_tasks if task.job_id})
+    lead.enrichment_status = EnrichmentStatus.PROCESSING
+    db.commit()
+
+    # Trigger Celery tasks again once the reset rows are visible to workers
     task_ids = []
     for task in failed_tasks:
-        task.status = EnrichmentStatus.PENDING
-        task.error_message = None
+        dispatch_enrichment(
+            lead.id, task.task_type, task.id, priority=PRIORITY_INTERACTIVE, celery_task_id=task.celery_task_id
+        )
+        task_ids.append(task.celery_task_id)
 
-        # Trigger Celery task again
-        celery_task = enrich_lead_task.delay(lead.id, task.task_type, task.id)
-        task.celery_task_id = celery_task.id
-        task_ids.append(celery_task.id)
+    return {"message": f"Retrying {len(failed_tasks)} failed tasks", "task_ids": task_ids}
 
-    lead.enrichment_status = EnrichmentStatus.PROCESSING
+
+class BulkRetryRequest(BaseModel):
+    enrichment_types: list[str] | None = None
+    error_classes: list[str] | None = None  # e.g. ["timeout", "rate_limited"]
+    job_id: int | None = None
+    failed_after: datetime | None = None
+    failed_before: datetime | None = None
+    include_cancelled: bool = False
+    limit: int | None = None
+
+
+def _bulk_retry_marker(retry_id: str) -> str:
+    return f"retry:{retry_id}"
+
+
+@router.post("/retries")
+async def bulk_retry(request: BulkRetryRequest, db: Session = Depends(get_db)):
+    """
+    Retry failed tasks across leads and jobs, selected by provider, error class, job and failure time
+    Matching tasks are reset in one UPDATE; a bulk_retry worker re-dispatches them in paced batches
+    """
+    # Intros are regenerated with POST /intros; enrich_lead cannot run them
+    filters = [EnrichmentTask.status == EnrichmentStatus.FAILED, EnrichmentTask.task_type != INTRO_TASK_TYPE]
+    if request.enrichment_types:
+        filters.append(EnrichmentTask.task_type.in_(request.enrichment_types))
+    if request.error_classes:
+        filters.append(EnrichmentTask.error_class.in_(request.error_classes))
+    if request.job_id is not None:
+        filters.append(EnrichmentTask.job_id == request.job_id)
+    if request.failed_after:
+        filters.append(EnrichmentTask.completed_at >= request.failed_after)
+    if request.failed_before:
+        filters.append(EnrichmentTask.completed_at < request.failed_before)
+    if not request.include_cancelled:
+        filters.append(EnrichmentTask.error_class.is_distinct_from("cancelled"))
+
+    retry_id = uuid4().hex
+    marker = _bulk_retry_marker(retry_id)
+    candidates = (
+        select(EnrichmentTask.id, EnrichmentTask.error_class)
+        .where(*filters)
+        .order_by(EnrichmentTask.id)
+        .limit(request.limit)
+        .with_for_update(skip_locked=True)
+        .subquery()
+    )
+    reset = db.execute(
+        update(EnrichmentTask)
+        .where(EnrichmentTask.id == candidates.c.id)
+        .values(
+            status=EnrichmentStatus.PENDING,
+            error_message=None,
+            error_class=None,
+            attempts=0,
+            completed_at=None,
+            celery_task_id=marker,
+        )
+        .returning(EnrichmentTask.job_id, EnrichmentTask.task_type, candidates.c.error_class)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    if not reset:
+        db.rollback()
+        return {"message": "No failed tasks match", "retry_id": None, "matched": 0}
+
+    db.execute(
+        update(Lead)
+        .where(Lead.id.in_(select(EnrichmentTask.lead_id).where(EnrichmentTask.celery_task_id == marker)))
+        .values(enrichment_status=EnrichmentStatus.PROCESSING)
+        .execution_options(synchronize_session=False)
+    )
+    release_failed_company_enrichments(db, select(EnrichmentTask.id).where(EnrichmentTask.celery_task_id == marker))
+    reopen_jobs(db, {row.job_id for row in reset if row.job_id})
     db.commit()
 
-    return {"message": f"Retrying {len(failed_tasks)} failed tasks", "task_ids": task_ids}
+    transitions = Counter(
+        (row.job_id, row.task_type, "cancelled" if row.error_class == "cancelled" else "failed")
+        for row in reset
+        if row.job_id
+    )
+    for (job_id, enrichment_type, old), count in transitions.items():
+        record_job_transition(job_id, enrichment_type, old, "pending", count)
+
+    dispatch_bulk_retry(marker)
+
+    return {
+        "message": f"Retrying {len(reset)} failed tasks",
+        "retry_id": retry_id,
+        "matched": len(reset),
+        "by_provider": dict(Counter(row.task_type for row in reset)),
+    }
+
+
+@router.get("/retries/{retry_id}")
+async def get_bulk_retry_status(retry_id: str, db: Session = Depends(get_db)):
+    """Get how many tasks of a bulk retry are still waiting to be re-dispatched, per provider"""
+    waiting = (
+        db.query(EnrichmentTask.task_type, func.count())
+        .filter(EnrichmentTask.celery_task_id == _bulk_retry_marker(retry_id))
+        .group_by(EnrichmentTask.task_type)
+        .all()
+    )
+    return {"retry_id": retry_id, "waiting": sum(count for _, count in waiting), "by_provider": dict(waiting)}
+
+
+class IntroRequest(BaseModel):
+    lead_ids: list[int]
+    stream: bool = True  # stream intros back as they finish instead of returning the batch id only
+
+
+@router.post("/intros")
+async def generate_intros(
+    request: IntroRequest, format: Literal["ndjson", "sse"] = "ndjson", db: Session = Depends(get_db)
+):
+    """
+    Generate personalized intros for a campaign's leads
+    Leads at the same company are kept in one chunk so company context is fetched once
+    """
+    leads = db.query(Lead.id, Lead.company).filter(Lead.id.in_(request.lead_ids)).all()
+    if len(leads) != len(set(request.lead_ids)):
+        raise HTTPException(status_code=404, detail="Some leads not found")
+
+    batch_id = uuid4().hex
+    leads = sorted(leads, key=lambda lead: ((lead.company or "").lower(), lead.id))
+    rows = db.execute(
+        insert(EnrichmentTask).returning(EnrichmentTask.id, EnrichmentTask.lead_id, sort_by_parameter_order=True),
+        [{"lead_id": lead.id, "task_type": INTRO_TASK_TYPE, "status": EnrichmentStatus.PENDING} for lead in leads],
+    ).all()
+    db.commit()
+
+    redis = get_async_redis()
+    await redis.hset(f"{intro_stream_key(batch_id)}:meta", "total", len(rows))
+    await redis.expire(f"{intro_stream_key(batch_id)}:meta", 24 * 3600)
+
+    for start in range(0, len(rows), INTRO_CHUNK_SIZE):
+        chunk = rows[start : start + INTRO_CHUNK_SIZE]
+        celery_task = dispatch_generate_intros(batch_id, [[row.lead_id, row.id] for row in chunk])
+        db.execute(
+            update(EnrichmentTask)
+            .where(EnrichmentTask.id.in_([row.id for row in chunk]))
+            .values(celery_task_id=celery_task.id)
+        )
+    db.commit()
+
+    if request.stream:
+        return _intro_stream_response(batch_id, format)
+
+    return {
+        "message": f"Intro generation started for {len(rows)} leads",
+        "batch_id": batch_id,
+        "lead_count": len(rows),
+        "stream_url": f"/api/enrich/intros/{batch_id}/stream",
+    }
+
+
+@router.get("/intros/{batch_id}/stream")
+async def stream_intros(
+    batch_id: str,
+    format: Literal["ndjson", "sse"] = "ndjson",
+    last_id: str = "0-0",
+    last_event_id: str | None = Header(None),
+):
+    """Stream the intros of a batch as they finish; resume with last_id (or Last-Event-ID for SSE)"""
+    if not await get_async_redis().exists(f"{intro_stream_key(batch_id)}:meta"):
+        raise HTTPException(status_code=404, detail="Intro batch not found")
+    return _intro_stream_response(batch_id, format, last_event_id or last_id)
+
+
+def _intro_stream_response(batch_id: str, format: str, last_id: str = "0-0") -> StreamingResponse:
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    return StreamingResponse(_intro_events(batch_id, format, last_id), media_type=media_type)
+
+
+async def _intro_events(batch_id: str, format: str, last_id: str):
+    """Yield intros from the batch's Redis stream until every lead has been delivered"""
+    redis = get_async_redis()
+    key = intro_stream_key(batch_id)
+    total = int(await redis.hget(f"{key}:meta", "total") or 0)
+    delivered = 0 if last_id == "0-0" else len(await redis.xrange(key, "-", last_id))
+    idle = 0
+
+    while delivered < total and idle < INTRO_STREAM_IDLE_SECONDS:
+        response = await redis.xread({key: last_id}, count=100, block=5000)
+        if not response:
+            idle += 5
+            if format == "sse":
+                yield ": keepalive\n\n"
+            continue
+
+        idle = 0
+        for _, entries in response:
+            for entry_id, fields in entries:
+                last_id = entry_id.decode()
+                delivered += 1
+                data = fields[b"data"].decode()
+                if format == "sse":
+                    yield f"id: {last_id}\nevent: intro\ndata: {data}\n\n"
+                else:
+                    yield data + "\n"
+
+    summary = json.dumps({"batch_id": batch_id, "done": delivered >= total, "delivered": delivered, "total": total})
+    yield f"event: done\ndata: {summary}\n\n" if format == "sse" else summary + "\n"
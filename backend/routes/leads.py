@@ -1,14 +1,52 @@
+from collections import Counter
 import csv
+from datetime import datetime, timezone
 import io
+import json
+import os
 
-from db.database import get_db
-from db.models import Lead
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from pydantic import BaseModel
+from db.database import SessionLocal, get_db
+from db.models import EnrichmentResult, EnrichmentStatus, EnrichmentTask, Lead
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from services.jobs import STATUS_COUNTERS, finish_job_if_done, record_job_transition
+from services.lead_search import (
+    SEARCH_MAX_CANDIDATES,
+    count_search_matches,
+    search_leads_query,
+    search_terms,
+    set_similarity_threshold,
+)
+from sqlalchemy import delete, func, insert, null, select, update
 from sqlalchemy.orm import Session
 
+from .responses import (
+    ORJSONResponse,
+    has_validators,
+    is_not_modified,
+    make_etag,
+    not_modified,
+    stream_json_array,
+    validator_headers,
+)
+
 router = APIRouter()
 
+# Rows per INSERT while ingesting an NDJSON stream
+NDJSON_CHUNK_SIZE = int(os.getenv("NDJSON_CHUNK_SIZE", "1000"))
+NDJSON_MAX_REPORTED_ERRORS = 100
+
+# Lead pages above this many rows are streamed as a JSON array, fetched LEAD_STREAM_CHUNK_SIZE rows at a time
+LEAD_STREAM_THRESHOLD = int(os.getenv("LEAD_STREAM_THRESHOLD", "1000"))
+LEAD_STREAM_CHUNK_SIZE = int(os.getenv("LEAD_STREAM_CHUNK_SIZE", "500"))
+
+# Lead fields its company link is derived from; changing one unlinks the lead from its company
+COMPANY_FIELDS = {"website", "company"}
+
+# Leads locked and changed per statement by the bulk update and delete endpoints
+LEAD_BULK_CHUNK_SIZE = int(os.getenv("LEAD_BULK_CHUNK_SIZE", "5000"))
+
 
 class LeadCreate(BaseModel):
     first_name: str | None = None
@@ -31,15 +69,71 @@ class LeadResponse(BaseModel):
     linkedin_url: str | None
     email: str | None
     phone: str | None
-    enrichment_status: str
+    company_id: int | None = None
+    enrichment_status: EnrichmentStatus | None
     enriched_data: dict | None
-    created_at: str
-    updated_at: str
+    created_at: datetime | None
+    updated_at: datetime | None
 
     class Config:
         from_attributes = True
 
 
+class LeadFilter(BaseModel):
+    email_status: str | None = None
+    industry: str | None = None
+    company_size: str | None = None
+    seniority: str | None = None
+    enriched: dict | None = None  # JSON containment on provider output, as in GET /api/leads/
+    enrichment_status: EnrichmentStatus | None = None
+    company: str | None = None
+    updated_before: datetime | None = None
+    updated_after: datetime | None = None
+
+
+class BulkLeadSelection(BaseModel):
+    """Leads to change: the given ids, the leads matching filter, or the given ids that match filter"""
+
+    ids: list[int] | None = None
+    filter: LeadFilter | None = None
+
+
+class BulkLeadUpdate(BulkLeadSelection):
+    values: LeadCreate
+
+
+# Columns selected (or returned by INSERT ... RETURNING) in the LeadResponse shape
+LEAD_RESPONSE_COLUMNS = [getattr(Lead, field) for field in LeadResponse.model_fields]
+
+
+def _lead_rows(keys, rows) -> list[dict]:
+    """Core result tuples as LeadResponse-shaped dicts, ready for ORJSONResponse without model validation"""
+    return [dict(zip(keys, row)) for row in rows]
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """Timestamps are stored as naive UTC"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+def _attribute_conditions(email_status, industry, company_size, seniority) -> list:
+    """EnrichmentResult conditions for the hot attribute filters (values are stored lowercased)"""
+    attribute_filters = {
+        EnrichmentResult.email_status: email_status,
+        EnrichmentResult.industry: industry,
+        EnrichmentResult.company_size: company_size,
+        EnrichmentResult.seniority: seniority,
+    }
+    return [column == value.strip().lower() for column, value in attribute_filters.items() if value]
+
+
+def _page_validators(versions) -> tuple[str, datetime | None]:
+    """ETag and Last-Modified of a page of leads from its (id, updated_at) pairs"""
+    versions = [tuple(version) for version in versions]
+    last_modified = max((updated_at for _, updated_at in versions if updated_at), default=None)
+    return make_etag(versions), last_modified
+
+
 @router.post("/", response_model=LeadResponse)
 async def create_lead(lead: LeadCreate, db: Session = Depends(get_db)):
     """Create a single lead"""
@@ -52,13 +146,73 @@ async def create_lead(lead: LeadCreate, db: Session = Depends(get_db)):
 
 @router.post("/bulk", response_model=list[LeadResponse])
 async def create_leads_bulk(leads: list[LeadCreate], db: Session = Depends(get_db)):
-    """Create multiple leads at once"""
-    db_leads = [Lead(**lead.model_dump()) for lead in leads]
-    db.add_all(db_leads)
+    """Create multiple leads at once with a multi-row INSERT ... RETURNING"""
+    if not leads:
+        return ORJSONResponse(content=[])
+
+    result = db.execute(
+        insert(Lead).returning(*LEAD_RESPONSE_COLUMNS, sort_by_parameter_order=True),
+        [lead.model_dump() for lead in leads],
+    )
+    rows = _lead_rows(result.keys(), result.all())
     db.commit()
-    for lead in db_leads:
-        db.refresh(lead)
-    return db_leads
+
+    return ORJSONResponse(content=rows)
+
+
+@router.post("/bulk/ndjson")
+async def create_leads_ndjson(request: Request, db: Session = Depends(get_db)):
+    """
+    Create leads from a newline-delimited JSON body (one LeadCreate object per line)
+    Lines are validated and inserted in chunks while the body is still uploading;
+    invalid lines are skipped and reported by line number
+    """
+    batch = []
+    count = 0
+    errors = []
+    error_count = 0
+    line_number = 0
+    pending = b""
+
+    def flush():
+        nonlocal batch, count
+        if batch:
+            db.execute(insert(Lead), batch)
+            db.commit()
+            count += len(batch)
+            batch = []
+
+    def handle_line(line: bytes):
+        nonlocal error_count
+        if not line.strip():
+            return
+        try:
+            batch.append(LeadCreate.model_validate_json(line).model_dump())
+        except ValidationError as e:
+            error_count += 1
+            if len(errors) < NDJSON_MAX_REPORTED_ERRORS:
+                errors.append({"line": line_number, "error": e.errors(include_url=False, include_input=False)})
+        if len(batch) >= NDJSON_CHUNK_SIZE:
+            flush()
+
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            line_number += 1
+            handle_line(line)
+
+    if pending:
+        line_number += 1
+        handle_line(pending)
+    flush()
+
+    return {
+        "message": f"Successfully created {count} leads",
+        "count": count,
+        "error_count": error_count,
+        "errors": errors,
+    }
 
 
 @router.post("/upload-csv")
@@ -92,19 +246,274 @@ async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)
 
 
 @router.get("/", response_model=list[LeadResponse])
-async def get_leads(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all leads with pagination"""
-    leads = db.query(Lead).offset(skip).limit(limit).all()
-    return leads
+async def get_leads(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    email_status: str | None = None,
+    industry: str | None = None,
+    company_size: str | None = None,
+    seniority: str | None = None,
+    enriched: str | None = Query(
+        None, description='JSON containment filter on provider output, e.g. {"apollo": {"person": {"city": "Berlin"}}}'
+    ),
+    include_enriched_data: bool = Query(True, description="Set to false to return enriched_data as null"),
+    updated_since: datetime | None = Query(None, description="Only leads modified after this time"),
+    db: Session = Depends(get_db),
+):
+    """
+    Get all leads with pagination, optionally filtered on enrichment results
+    Rows are read as plain tuples and rendered with orjson; pages above LEAD_STREAM_THRESHOLD are streamed.
+    The page's ETag covers the id and updated_at of every row, so an unchanged page answers 304.
+    """
+    columns = [
+        column if include_enriched_data or column.key != "enriched_data" else null().label("enriched_data")
+        for column in LEAD_RESPONSE_COLUMNS
+    ]
+    query = select(*columns)
+
+    conditions = _attribute_conditions(email_status, industry, company_size, seniority)
+
+    if enriched:
+        try:
+            conditions.append(EnrichmentResult.data.contains(json.loads(enriched)))
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="enriched must be a JSON object")
+
+    if conditions:
+        query = query.join(EnrichmentResult, EnrichmentResult.lead_id == Lead.id).where(*conditions)
+    if updated_since:
+        query = query.where(Lead.updated_at > _naive_utc(updated_since))
+    query = query.order_by(Lead.id).offset(skip).limit(limit)
+
+    # Validate against (id, updated_at) alone before reading or rendering any payload
+    validators = None
+    if has_validators(request) or limit > LEAD_STREAM_THRESHOLD:
+        validators = _page_validators(db.execute(query.with_only_columns(Lead.id, Lead.updated_at)))
+        if is_not_modified(request, *validators):
+            return not_modified(*validators)
+
+    if limit > LEAD_STREAM_THRESHOLD:
+        return StreamingResponse(
+            stream_json_array(_stream_lead_chunks(query)),
+            media_type="application/json",
+            headers=validator_headers(*validators),
+        )
+
+    result = db.execute(query)
+    rows = _lead_rows(result.keys(), result.all())
+    validators = validators or _page_validators((row["id"], row["updated_at"]) for row in rows)
+    return ORJSONResponse(content=rows, headers=validator_headers(*validators))
+
+
+def _stream_lead_chunks(query):
+    """
+    Yield a page of leads in chunks over a server-side cursor
+    Uses its own session: the request's session is closed before a streamed body is sent
+    """
+    with SessionLocal() as db:
+        result = db.execute(query.execution_options(yield_per=LEAD_STREAM_CHUNK_SIZE))
+        keys = result.keys()
+        for rows in result.partitions():
+            yield _lead_rows(keys, rows)
+
+
+def _selection_conditions(selection: BulkLeadSelection) -> list:
+    lead_filter = selection.filter or LeadFilter()
+    conditions = []
+
+    result_conditions = _attribute_conditions(
+        lead_filter.email_status, lead_filter.industry, lead_filter.company_size, lead_filter.seniority
+    )
+    if lead_filter.enriched:
+        result_conditions.append(EnrichmentResult.data.contains(lead_filter.enriched))
+    if result_conditions:
+        conditions.append(Lead.id.in_(select(EnrichmentResult.lead_id).where(*result_conditions)))
+
+    if lead_filter.enrichment_status:
+        conditions.append(Lead.enrichment_status == lead_filter.enrichment_status)
+    if lead_filter.company:
+        conditions.append(Lead.company == lead_filter.company)
+    if lead_filter.updated_before:
+        conditions.append(Lead.updated_at < _naive_utc(lead_filter.updated_before))
+    if lead_filter.updated_after:
+        conditions.append(Lead.updated_at > _naive_utc(lead_filter.updated_after))
+
+    if selection.ids is None and not conditions:
+        raise HTTPException(status_code=400, detail="Select leads by ids or a non-empty filter")
+    return conditions
+
+
+def _locked_lead_chunks(db: Session, selection: BulkLeadSelection):
+    """
+    Yield the ids of the selected leads in id order, LEAD_BULK_CHUNK_SIZE at a time, each chunk locked
+    FOR UPDATE until the transaction ends
+    """
+    conditions = _selection_conditions(selection)
+    query = select(Lead.id).where(*conditions).order_by(Lead.id).with_for_update(of=Lead)
+
+    if selection.ids is not None:
+        ids = sorted(set(selection.ids))
+        for start in range(0, len(ids), LEAD_BULK_CHUNK_SIZE):
+            chunk = db.execute(query.where(Lead.id.in_(ids[start : start + LEAD_BULK_CHUNK_SIZE]))).scalars().all()
+            if chunk:
+                yield chunk
+        return
+
+    # Keyset over the filter: updated leads may still match it, so resume after the last id seen
+    last_id = 0
+    while chunk := db.execute(query.where(Lead.id > last_id).limit(LEAD_BULK_CHUNK_SIZE)).scalars().all():
+        yield chunk
+        last_id = chunk[-1]
+
+
+def _delete_leads(db: Session, lead_ids: list[int]) -> tuple[int, int, Counter]:
+    """
+    Delete leads and their enrichment tasks (results and task summaries cascade) without loading them
+    The leads are locked before their tasks, the order workers use when saving a result, so a delete and
+    a save of the same lead cannot deadlock
+    Returns the leads and tasks deleted, and per (job, type) how many of those tasks were still pending or
+    running, which the caller moves to cancelled once committed
+    """
+    lead_ids = (
+        db.execute(select(Lead.id).where(Lead.id.in_(lead_ids)).order_by(Lead.id).with_for_update()).scalars().all()
+    )
+    if not lead_ids:
+        return 0, 0, Counter()
+
+    deleted_tasks = (
+        delete(EnrichmentTask)
+        .where(EnrichmentTask.lead_id.in_(lead_ids))
+        .returning(EnrichmentTask.job_id, EnrichmentTask.task_type, EnrichmentTask.status)
+        .cte("deleted_tasks")
+    )
+    task_counts = db.execute(
+        select(deleted_tasks.c.job_id, deleted_tasks.c.task_type, deleted_tasks.c.status, func.count()).group_by(
+            deleted_tasks.c.job_id, deleted_tasks.c.task_type, deleted_tasks.c.status
+        )
+    ).all()
+    leads = db.execute(delete(Lead).where(Lead.id.in_(lead_ids)).execution_options(synchronize_session=False)).rowcount
+
+    open_tasks = Counter()
+    for job_id, enrichment_type, status, count in task_counts:
+        if job_id and status in (EnrichmentStatus.PENDING, EnrichmentStatus.PROCESSING):
+            open_tasks[(job_id, enrichment_type, STATUS_COUNTERS[status])] += count
+    return leads, sum(row[3] for row in task_counts), open_tasks
+
+
+def _cancel_deleted_tasks(db: Session, open_tasks: Counter):
+    """Count deleted tasks that were pending or running as cancelled, so their jobs can still finish"""
+    for (job_id, enrichment_type, old), count in open_tasks.items():
+        record_job_transition(job_id, enrichment_type, old, "cancelled", count)
+    for job_id in {job_id for job_id, _, _ in open_tasks}:
+        finish_job_if_done(db, job_id)
+
+
+@router.post("/bulk/update")
+async def update_leads_bulk(request: BulkLeadUpdate, db: Session = Depends(get_db)):
+    """
+    Set the same fields on every selected lead
+    One UPDATE per LEAD_BULK_CHUNK_SIZE leads, all in one transaction; returns the number of leads updated
+    """
+    values = request.values.model_dump(exclude_unset=True)
+    if not values:
+        raise HTTPException(status_code=400, detail="values must set at least one field")
+    if COMPANY_FIELDS & values.keys():
+        values["company_id"] = None
+
+    updated = 0
+    for chunk in _locked_lead_chunks(db, request):
+        updated += db.execute(
+            update(Lead).where(Lead.id.in_(chunk)).values(**values).execution_options(synchronize_session=False)
+        ).rowcount
+    db.commit()
+
+    return {"message": f"Updated {updated} leads", "updated": updated}
+
+
+@router.post("/bulk/delete")
+async def delete_leads_bulk(request: BulkLeadSelection, db: Session = Depends(get_db)):
+    """
+    Delete every selected lead with its enrichment tasks, results and task summaries
+    Set-based deletes per LEAD_BULK_CHUNK_SIZE leads, all in one transaction; pending and running tasks of
+    a job are counted as cancelled
+    """
+    deleted = 0
+    deleted_tasks = 0
+    open_tasks = Counter()
+    for chunk in _locked_lead_chunks(db, request):
+        leads, tasks, chunk_open_tasks = _delete_leads(db, chunk)
+        deleted += leads
+        deleted_tasks += tasks
+        open_tasks += chunk_open_tasks
+    db.commit()
+    _cancel_deleted_tasks(db, open_tasks)
+
+    return {"message": f"Deleted {deleted} leads", "deleted": deleted, "deleted_tasks": deleted_tasks}
+
+
+@router.get("/search")
+async def search_leads(
+    q: str = Query(..., min_length=1, max_length=200, description="Words or word prefixes; typos are tolerated"),
+    skip: int = 0,
+    limit: int = Query(20, ge=1, le=100),
+    fuzzy: bool = Query(True, description="Set to false to only match whole words and prefixes"),
+    include_enriched_data: bool = Query(True, description="Set to false to return enriched_data as null"),
+    db: Session = Depends(get_db),
+):
+    """
+    Search leads by name, company, title, email and enriched headline, industry and city
+    Results are ranked best first, each with its "score"; prefix matches come before typo-only matches
+    """
+    terms = search_terms(q)
+    if not terms:
+        raise HTTPException(status_code=400, detail="q must contain a letter or digit")
+
+    columns = [
+        column if include_enriched_data or column.key != "enriched_data" else null().label("enriched_data")
+        for column in LEAD_RESPONSE_COLUMNS
+    ]
+    set_similarity_threshold(db)
+    # One extra row tells whether there is a next page without counting every match
+    result = db.execute(search_leads_query(terms, columns, fuzzy).offset(skip).limit(limit + 1))
+    rows = _lead_rows(result.keys(), result.all())
+    matches = rows[0]["matches"] if rows else count_search_matches(db, terms, fuzzy)
+    for row in rows:
+        del row["matches"]
+
+    return ORJSONResponse(
+        content={
+            "results": rows[:limit],
+            "skip": skip,
+            "limit": limit,
+            "has_more": len(rows) > limit,
+            "matches": matches,
+            # Only the first SEARCH_MAX_CANDIDATES matches are ranked; narrow the query to see the others
+            "truncated": matches >= SEARCH_MAX_CANDIDATES,
+        }
+    )
 
 
 @router.get("/{lead_id}", response_model=LeadResponse)
-async def get_lead(lead_id: int, db: Session = Depends(get_db)):
-    """Get a specific lead by ID"""
-    lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not lead:
+async def get_lead(lead_id: int, request: Request, db: Session = Depends(get_db)):
+    """Get a specific lead by ID; conditional requests are answered from updated_at alone"""
+    if has_validators(request):
+        updated_at = db.execute(select(Lead.updated_at).where(Lead.id == lead_id)).first()
+        if not updated_at:
+            raise HTTPException(status_code=404, detail="Lead not found")
+        etag = make_etag(lead_id, updated_at[0])
+        if is_not_modified(request, etag, updated_at[0]):
+            return not_modified(etag, updated_at[0])
+
+    result = db.execute(select(*LEAD_RESPONSE_COLUMNS).where(Lead.id == lead_id))
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Lead not found")
-    return lead
+
+    lead = dict(zip(result.keys(), row))
+    return ORJSONResponse(
+        content=lead, headers=validator_headers(make_etag(lead_id, lead["updated_at"]), lead["updated_at"])
+    )
 
 
 @router.put("/{lead_id}", response_model=LeadResponse)
@@ -114,7 +523,11 @@ async def update_lead(lead_id: int, lead_update: LeadCreate, db: Session = Depen
     if not db_lead:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    for key, value in lead_update.model_dump(exclude_unset=True).items():
+    values = lead_update.model_dump(exclude_unset=True)
+    if any(values[field] != getattr(db_lead, field) for field in COMPANY_FIELDS if field in values):
+        # Re-linked to the company of the new website or name by the next company-scoped enrichment
+        db_lead.company_id = None
+    for key, value in values.items():
         setattr(db_lead, key, value)
 
     db.commit()
@@ -124,11 +537,11 @@ async def update_lead(lead_id: int, lead_update: LeadCreate, db: Session = Depen
 
 @router.delete("/{lead_id}")
 async def delete_lead(lead_id: int, db: Session = Depends(get_db)):
-    """Delete a lead"""
-    db_lead = db.query(Lead).filter(Lead.id == lead_id).first()
-    if not db_lead:
+    """Delete a lead with its enrichment tasks, results and task summaries"""
+    deleted, _, open_tasks = _delete_leads(db, [lead_id])
+    if not deleted:
         raise HTTPException(status_code=404, detail="Lead not found")
 
-    db.delete(db_lead)
     db.commit()
+    _cancel_deleted_tasks(db, open_tasks)
     return {"message": "Lead deleted successfully"}
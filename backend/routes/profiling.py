@@ -0,0 +1,80 @@
+import hmac
+import os
+import random
+from uuid import uuid4
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+from services.profiling import finish_profile, get_folded_stacks, get_profile, list_profiles, start_profile
+
+router = APIRouter()
+
+# A request sent with "X-Profile: <PROFILE_TOKEN>" is profiled; header triggering is off while the token is unset
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+# Fraction of all API requests profiled
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that ask for it or are sampled, and return the profile id in X-Profile-Id
+    Plain ASGI so unprofiled requests pass straight through, streamed bodies included
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Always a fresh id, so a client-supplied X-Request-ID can never overwrite another request's profile
+        profile_id = uuid4().hex
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64] or None
+        profile = start_profile("request", profile_id, f"{scope['method']} {scope['path']}")
+        status_code = None
+
+        async def send_with_profile_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            finish_profile(profile, status_code=status_code, request_id=request_id)
+
+    @staticmethod
+    def _should_profile(scope) -> bool:
+        if PROFILE_TOKEN:
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    return hmac.compare_digest(value, PROFILE_TOKEN.encode())
+        return bool(PROFILE_SAMPLE_RATE) and random.random() < PROFILE_SAMPLE_RATE
+
+
+@router.get("/")
+async def get_profiles(limit: int = 50, kind: str | None = None):
+    """List recent request and task profiles, newest first"""
+    return list_profiles(limit, kind)
+
+
+@router.get("/{profile_id}")
+async def get_profile_summary(profile_id: str):
+    """Get a profile's hottest functions and per-statement SQL counts and timings"""
+    profile = get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@router.get("/{profile_id}/folded", response_class=PlainTextResponse)
+async def get_profile_stacks(profile_id: str):
+    """Get a profile's stack samples in folded form, for flamegraph.pl, speedscope or inferno"""
+    folded = get_folded_stacks(profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(folded)
@@ -0,0 +1,78 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+import hashlib
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+import orjson
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON rendered with orjson, for handlers that return plain rows instead of models
+    Datetimes are encoded as ISO 8601 and enums as their values
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def stream_json_array(chunks: Iterable[list]) -> Iterator[bytes]:
+    """Render lists of rows as one JSON array, a chunk per write, so large pages are never held in memory whole"""
+    yield b"["
+    first = True
+    for chunk in chunks:
+        if not chunk:
+            continue
+        body = orjson.dumps(chunk, option=ORJSON_OPTIONS)[1:-1]
+        yield body if first else b"," + body
+        first = False
+    yield b"]"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag over the values that determine a representation (ids, timestamps, counts)"""
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest() + '"'
+
+
+def validator_headers(etag: str, last_modified: datetime | None) -> dict:
+    """
+    ETag and Last-Modified headers; naive datetimes are UTC as written by the models
+    no-cache lets clients keep the body but makes them revalidate on every poll
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+
+def has_validators(request: Request) -> bool:
+    """Whether the client sent a conditional GET, so it is worth checking before loading the payload"""
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent (RFC 9110 precedence)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have whole seconds
+    return last_modified.replace(microsecond=0, tzinfo=timezone.utc) <= since
+
+
+def not_modified(etag: str, last_modified: datetime | None) -> Response:
+    return Response(status_code=304, headers=validator_headers(etag, last_modified))
@@ -1,7 +1,30 @@
 import json
 import os
 
-import openai
+
+def _openai():
+    """The OpenAI SDK, imported on first use so processes that never call it do not pay for loading it"""
+    import openai
+
+    return openai
+
+
+def classify_openai_error(error: Exception) -> str:
+    """Map an OpenAI SDK error to a retry error class"""
+    openai = _openai()
+    if isinstance(error, openai.error.Timeout):
+        return "timeout"
+    if isinstance(error, openai.error.RateLimitError):
+        return "rate_limited"
+    if isinstance(error, openai.error.APIConnectionError):
+        return "network"
+    if isinstance(error, openai.error.ServiceUnavailableError):
+        return "server_error"
+    if isinstance(error, openai.error.APIError):
+        return "server_error" if not error.http_status or error.http_status >= 500 else "client_error"
+    if isinstance(error, openai.error.OpenAIError):
+        return "client_error"
+    return "unknown"
 
 
 class AIEnrichmentService:
@@ -10,7 +33,7 @@ class AIEnrichmentService:
     def __init__(self):
         self.api_key = os.getenv("OPENAI_API_KEY")
         if self.api_key:
-            openai.api_key = self.api_key
+            _openai().api_key = self.api_key
         self.model = "gpt-4o-mini"  # or gpt-4 for better results
 
     async def enrich_lead_profile(self, lead_data: dict) -> dict:
@@ -23,7 +46,7 @@ class AIEnrichmentService:
         try:
             prompt = self._build_enrichment_prompt(lead_data)
 
-            response = await openai.ChatCompletion.acreate(
+            response = await _openai().ChatCompletion.acreate(
                 model=self.model,
                 messages=[
                     {
@@ -40,7 +63,7 @@ class AIEnrichmentService:
 
             return {"ai_insights": result, "model": self.model, "success": True}
         except Exception as e:
-            return {"error": str(e), "success": False}
+            return self._error_result(e)
 
     async def generate_personalized_intro(self, lead_data: dict, company_info: dict = None) -> dict:
         """
@@ -52,7 +75,7 @@ class AIEnrichmentService:
         try:
             prompt = self._build_personalization_prompt(lead_data, company_info)
 
-            response = await openai.ChatCompletion.acreate(
+            response = await _openai().ChatCompletion.acreate(
                 model=self.model,
                 messages=[
                     {
@@ -69,7 +92,7 @@ class AIEnrichmentService:
 
             return {"personalized_intro": intro, "success": True}
         except Exception as e:
-            return {"error": str(e), "success": False}
+            return self._error_result(e)
 
     async def extract_company_info(self, company_name: str, website: str = None) -> dict:
         """
@@ -92,7 +115,7 @@ class AIEnrichmentService:
             Format as JSON with keys: industry, size, products, news, pain_points
             """
 
-            response = await openai.ChatCompletion.acreate(
+            response = await _openai().ChatCompletion.acreate(
                 model=self.model,
                 messages=[
                     {
@@ -116,7 +139,7 @@ class AIEnrichmentService:
 
             return {"company_info": company_info, "success": True}
         except Exception as e:
-            return {"error": str(e), "success": False}
+            return self._error_result(e)
 
     async def analyze_linkedin_profile(self, linkedin_data: dict) -> dict:
         """
@@ -140,7 +163,7 @@ class AIEnrichmentService:
             Format as JSON.
             """
 
-            response = await openai.ChatCompletion.acreate(
+            response = await _openai().ChatCompletion.acreate(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a professional networker analyzing profiles for outreach."},
@@ -154,7 +177,11 @@ class AIEnrichmentService:
 
             return {"linkedin_insights": result, "success": True}
         except Exception as e:
-            return {"error": str(e), "success": False}
+            return self._error_result(e)
+
+    def _error_result(self, error: Exception) -> dict:
+        """Failed-result dict carrying the error class used by the retry policy"""
+        return {"error": str(error), "error_class": classify_openai_error(error), "success": False}
 
     def _build_enrichment_prompt(self, lead_data: dict) -> str:
         """Build prompt for lead enrichment"""
@@ -2,6 +2,8 @@ import os
 
 import httpx
 
+from .errors import http_error_result
+
 
 class ApolloService:
     """Service for Apollo.io API integration"""
@@ -36,7 +38,7 @@ class ApolloService:
                 response.raise_for_status()
                 return response.json()
             except httpx.HTTPError as e:
-                return {"error": str(e), "success": False}
+                return http_error_result(e)
 
     async def find_email(self, first_name: str, last_name: str, domain: str) -> dict:
         """
@@ -61,7 +63,7 @@ class ApolloService:
                     }
                 return {"error": "Email not found", "success": False}
             except httpx.HTTPError as e:
-                return {"error": str(e), "success": False}
+                return http_error_result(e)
 
     async def search_people(self, filters: dict) -> dict:
         """
@@ -78,4 +80,4 @@ class ApolloService:
                 response.raise_for_status()
                 return response.json()
             except httpx.HTTPError as e:
-                return {"error": str(e), "success": False}
+                return http_error_result(e)
@@ -0,0 +1,188 @@
+from datetime import datetime, timedelta
+import os
+from urllib.parse import urlsplit
+
+from db.models import Company, CompanyEnrichmentTask, EnrichmentStatus, EnrichmentTask, Lead
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from .freshness import freshness_cutoff
+
+# Enrichment types that depend only on the company, so one run serves every lead at it
+COMPANY_ENRICHMENT_TYPES = {"scraper", "contact_page", "company_info"}
+
+# A claim not refreshed for this long belongs to a worker that died; another lead may take it over
+COMPANY_CLAIM_TIMEOUT_SECONDS = int(os.getenv("COMPANY_CLAIM_TIMEOUT_SECONDS", "900"))
+# A permanent company failure is shared with waiting leads for this long before it is tried again
+COMPANY_FAILURE_TTL_SECONDS = int(os.getenv("COMPANY_FAILURE_TTL_SECONDS", "3600"))
+
+
+def normalize_domain(value: str | None) -> str | None:
+    """Reduce a website or domain to its bare lowercase host, e.g. "https://www.Acme.com/about" -> "acme.com" """
+    if not value or not value.strip():
+        return None
+    value = value.strip().lower()
+    host = urlsplit(value if "//" in value else f"//{value}").hostname
+    if not host or "." not in host:
+        return None
+    return host.removeprefix("www.")
+
+
+def get_or_create_company(db: Session, domain: str, name: str | None = None) -> int:
+    """Id of the company for a normalized domain, creating it if needed (safe under concurrency)"""
+    stmt = insert(Company).values(domain=domain, name=name).on_conflict_do_nothing(index_elements=[Company.domain])
+    company_id = db.execute(stmt.returning(Company.id)).scalar()
+    if company_id is None:
+        company_id = db.execute(select(Company.id).where(Company.domain == domain)).scalar_one()
+    return company_id
+
+
+def find_company_by_name(db: Session, name: str) -> Company | None:
+    """A known company with this name, used before paying for a domain lookup"""
+    return db.query(Company).filter(func.lower(Company.name) == name.strip().lower()).first()
+
+
+def link_lead_company(db: Session, lead: Lead, domain: str | None = None) -> int | None:
+    """
+    Attach the lead to the company of its website (or the given domain); returns the company id
+    An existing link is kept unless the lead's website now points at another domain. A domain found for a lead
+    without a website is kept on the company only: the lead's website stays as the user entered it.
+    """
+    domain = normalize_domain(domain or lead.website)
+    if lead.company_id:
+        if domain is None:
+            return lead.company_id
+        linked_domain = db.execute(select(Company.domain).where(Company.id == lead.company_id)).scalar()
+        if linked_domain == domain:
+            return lead.company_id
+
+    if not domain:
+        return None
+    lead.company_id = get_or_create_company(db, domain, lead.company)
+    return lead.company_id
+
+
+def company_website(db: Session, company_id: int) -> str | None:
+    """Address of a company's domain, for leads that were linked to it without a website"""
+    domain = db.execute(select(Company.domain).where(Company.id == company_id)).scalar()
+    return f"https://{domain}" if domain else None
+
+
+def claim_company_enrichment(
+    db: Session, company_id: int, enrichment_type: str, worker_task_id: str, now: datetime | None = None
+) -> tuple[CompanyEnrichmentTask, bool]:
+    """
+    Get the company's shared run of an enrichment and whether the caller should perform it.
+
+    The caller claims the run if none exists, the last result is stale, a recent failure has
+    expired, the previous claim was abandoned, or the caller already holds it (a retry).
+    Otherwise the returned row holds a result to reuse or is still being worked on.
+    """
+    now = now or datetime.utcnow()
+
+    stmt = insert(CompanyEnrichmentTask).values(
+        company_id=company_id,
+        task_type=enrichment_type,
+        status=EnrichmentStatus.PROCESSING,
+        attempts=1,
+        celery_task_id=worker_task_id,
+        created_at=now,
+        claimed_at=now,
+    )
+    stmt = stmt.on_conflict_do_nothing(
+        index_elements=[CompanyEnrichmentTask.company_id, CompanyEnrichmentTask.task_type]
+    )
+    claimed_id = db.execute(stmt.returning(CompanyEnrichmentTask.id)).scalar()
+
+    if claimed_id is None:
+        claimable = or_(
+            and_(
+                CompanyEnrichmentTask.status == EnrichmentStatus.COMPLETED,
+                CompanyEnrichmentTask.completed_at < freshness_cutoff(enrichment_type, now),
+            ),
+            and_(
+                CompanyEnrichmentTask.status == EnrichmentStatus.FAILED,
+                CompanyEnrichmentTask.completed_at < now - timedelta(seconds=COMPANY_FAILURE_TTL_SECONDS),
+            ),
+            and_(
+                CompanyEnrichmentTask.status.in_([EnrichmentStatus.PENDING, EnrichmentStatus.PROCESSING]),
+                or_(
+                    CompanyEnrichmentTask.celery_task_id == worker_task_id,
+                    CompanyEnrichmentTask.claimed_at < now - timedelta(seconds=COMPANY_CLAIM_TIMEOUT_SECONDS),
+                ),
+            ),
+        )
+        claimed_id = db.execute(
+            update(CompanyEnrichmentTask)
+            .where(
+                CompanyEnrichmentTask.company_id == company_id,
+                CompanyEnrichmentTask.task_type == enrichment_type,
+                claimable,
+            )
+            .values(
+                status=EnrichmentStatus.PROCESSING,
+                attempts=CompanyEnrichmentTask.attempts + 1,
+                celery_task_id=worker_task_id,
+                claimed_at=now,
+            )
+            .returning(CompanyEnrichmentTask.id)
+        ).scalar()
+
+    db.commit()
+
+    company_task = (
+        db.query(CompanyEnrichmentTask)
+        .filter(CompanyEnrichmentTask.company_id == company_id, CompanyEnrichmentTask.task_type == enrichment_type)
+        .populate_existing()
+        .one()
+    )
+    return company_task, claimed_id is not None
+
+
+def release_company_claim(company_task: CompanyEnrichmentTask):
+    """Give up a claimed run without an outcome, so the next lead of the company to check takes it over"""
+    company_task.celery_task_id = None
+    company_task.claimed_at = datetime.utcnow() - timedelta(seconds=COMPANY_CLAIM_TIMEOUT_SECONDS + 1)
+
+
+def release_failed_company_enrichments(db: Session, task_ids):
+    """Forget failed company runs behind the given lead tasks (ids or a select of ids) so a retry calls the provider again"""
+    db.execute(
+        delete(CompanyEnrichmentTask)
+        .where(
+            CompanyEnrichmentTask.status == EnrichmentStatus.FAILED,
+            CompanyEnrichmentTask.company_id == Lead.company_id,
+            CompanyEnrichmentTask.task_type == EnrichmentTask.task_type,
+            Lead.id == EnrichmentTask.lead_id,
+            EnrichmentTask.id.in_(task_ids),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def finish_company_enrichment(db: Session, company_task: CompanyEnrichmentTask, result: dict | None, retrying: bool):
+    """Record the claimer's outcome; a run that will be retried stays claimed so other leads keep waiting"""
+    if retrying:
+        company_task.error_message = result.get("error") if result else None
+        company_task.error_class = result.get("error_class") if result else None
+        return
+
+    if result and not result.get("error"):
+        company_task.status = EnrichmentStatus.COMPLETED
+        company_task.error_message = None
+        company_task.error_class = None
+
+        # An unchanged re-scrape only renews the run; the stored result is already this one
+        if not (result.get("unchanged") and company_task.result and not company_task.result.get("error")):
+            company_task.result = result
+            company = company_task.company
+            company.enriched_data = {**(company.enriched_data or {}), company_task.task_type: result}
+    else:
+        company_task.status = EnrichmentStatus.FAILED
+        company_task.result = result
+        company_task.error_message = result.get("error", "Unknown error") if result else "Unknown error"
+        company_task.error_class = result.get("error_class") if result else None
+
+    company_task.celery_task_id = None
+    company_task.completed_at = datetime.utcnow()
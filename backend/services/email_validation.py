@@ -1,8 +1,9 @@
 import os
 
-from email_validator import EmailNotValidError, validate_email
 import httpx
 
+from .errors import http_error_result
+
 
 class EmailValidationService:
     """Service for email validation using external APIs"""
@@ -13,6 +14,9 @@ class EmailValidationService:
 
     async def validate_email_syntax(self, email: str) -> dict:
         """Basic email syntax validation"""
+        # Imported here: email_validator pulls in dnspython, which only the email workers need
+        from email_validator import EmailNotValidError, validate_email
+
         try:
             valid = validate_email(email, check_deliverability=False)
             return {"valid": True, "email": valid.normalized, "method": "syntax"}
@@ -60,7 +64,7 @@ class EmailValidationService:
                     }
                 return {"valid": False, "error": "Invalid response", "success": False}
             except httpx.HTTPError as e:
-                return {"valid": False, "error": str(e), "success": False}
+                return http_error_result(e, valid=False)
 
     async def _validate_zerobounce(self, email: str) -> dict:
         """Validate email using ZeroBounce API"""
@@ -83,7 +87,7 @@ class EmailValidationService:
                     "success": True,
                 }
             except httpx.HTTPError as e:
-                return {"valid": False, "error": str(e), "success": False}
+                return http_error_result(e, valid=False)
 
     async def find_email_pattern(self, first_name: str, last_name: str, domain: str) -> dict:
         """
@@ -116,4 +120,4 @@ class EmailValidationService:
                     }
                 return {"error": "Email not found", "success": False}
             except httpx.HTTPError as e:
-                return {"error": str(e), "success": False}
+                return http_error_result(e)
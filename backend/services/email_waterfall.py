@@ -0,0 +1,172 @@
+import asyncio
+import os
+import time
+
+from db.redis_client import get_redis
+
+from .apollo_service import ApolloService
+from .email_validation import EmailValidationService
+from .errors import RETRYABLE_ERROR_CLASSES
+
+WATERFALL_SOURCES = ("cache", "apollo", "hunter")
+DEFAULT_WATERFALL_ORDER = "cache,apollo,hunter"
+
+
+class EmailWaterfallService:
+    """
+    Find an email by trying sources in order and stopping at the first verified hit.
+    A source that has not answered within hedge_after seconds gets the next source started alongside it.
+    """
+
+    def __init__(self, order: list[str] = None, hedge_after: float = None, cache_lookup=None):
+        order = order or os.getenv("EMAIL_WATERFALL_ORDER", DEFAULT_WATERFALL_ORDER).split(",")
+        self.order = [source.strip() for source in order if source.strip() in WATERFALL_SOURCES]
+        if hedge_after is None:
+            hedge_after = float(os.getenv("EMAIL_WATERFALL_HEDGE_SECONDS", "5"))
+        self.hedge_after = hedge_after
+        self.cache_lookup = cache_lookup  # async (first_name, last_name, domain) -> {"email": ...} or {}
+        self.apollo = ApolloService()
+        self.validator = EmailValidationService()
+
+    async def find_email(self, first_name: str, last_name: str, domain: str) -> dict:
+        """
+        Run the waterfall and return the winning email with a per-step log
+        """
+        started = time.perf_counter()
+        remaining = [source for source in self.order if source != "cache" or self.cache_lookup]
+        running = {}
+        steps = []
+        fallback = None
+        errors = []
+
+        def elapsed_ms() -> int:
+            return int((time.perf_counter() - started) * 1000)
+
+        def launch(hedged: bool = False):
+            source = remaining.pop(0)
+            step = {"source": source, "hedged": hedged, "started_ms": elapsed_ms()}
+            steps.append(step)
+            running[asyncio.create_task(self._query(source, first_name, last_name, domain))] = step
+
+        if not remaining:
+            return {"error": "No email sources configured", "success": False}
+
+        launch()
+        try:
+            while running:
+                done, _ = await asyncio.wait(
+                    running,
+                    timeout=self.hedge_after if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    launch(hedged=True)
+                    continue
+
+                for finished in done:
+                    step = running.pop(finished)
+                    result = finished.result()
+                    step["elapsed_ms"] = elapsed_ms() - step["started_ms"]
+
+                    if not result.get("email"):
+                        step["outcome"] = "error" if result.get("error_class") else "not_found"
+                        if result.get("error_class"):
+                            errors.append(result["error_class"])
+                        continue
+
+                    verification = await self._verify(step["source"], result)
+                    step["outcome"] = "verified" if verification["verified"] else "unverified"
+                    candidate = {**result, **verification, "source": step["source"]}
+
+                    if verification["verified"] or not self.validator.api_key:
+                        return self._winner(candidate, steps, elapsed_ms())
+                    fallback = fallback or candidate
+
+                if not running and remaining:
+                    launch()
+        finally:
+            for task, step in running.items():
+                task.cancel()
+                step["outcome"] = "cancelled"
+
+        if fallback:
+            return self._winner(fallback, steps, elapsed_ms())
+
+        result = {"error": "Email not found", "steps": steps, "elapsed_ms": elapsed_ms(), "success": False}
+        if errors and all(error_class in RETRYABLE_ERROR_CLASSES for error_class in errors):
+            result["error_class"] = errors[0]
+        return result
+
+    async def _query(self, source: str, first_name: str, last_name: str, domain: str) -> dict:
+        """Ask one source for an email; never raises"""
+        try:
+            if source == "cache":
+                return await self.cache_lookup(first_name, last_name, domain) or {}
+            if source == "apollo":
+                result = await self.apollo.find_email(first_name, last_name, domain)
+                return {**result, "verified": result.get("confidence") == "verified"}
+            if source == "hunter":
+                return await self.validator.find_email_pattern(first_name, last_name, domain)
+            return {"error": f"Unknown email source: {source}"}
+        except Exception as e:
+            return {"error": str(e)}
+
+    async def _verify(self, source: str, result: dict) -> dict:
+        """Verify a candidate unless its source already did"""
+        if result.get("verified"):
+            return {"verified": True, "status": "valid", "verified_by": source}
+        if not self.validator.api_key:
+            return {"verified": False, "status": "unverified", "verified_by": None}
+
+        check = await self.validator.validate_email_full(result["email"])
+        return {
+            "verified": bool(check.get("valid")),
+            "status": check.get("status") or ("valid" if check.get("valid") else "invalid"),
+            "verified_by": check.get("provider"),
+        }
+
+    def _winner(self, candidate: dict, steps: list, elapsed_ms: int) -> dict:
+        return {
+            "email": candidate["email"],
+            "verified": candidate["verified"],
+            "status": candidate["status"],
+            "verified_by": candidate["verified_by"],
+            "source": candidate["source"],
+            "confidence": candidate.get("confidence"),
+            "steps": steps,
+            "elapsed_ms": elapsed_ms,
+            "success": True,
+        }
+
+
+WATERFALL_STATS_KEY = "email_waterfall:stats"
+
+
+def record_waterfall_stats(result: dict):
+    """Count calls, latency and wins per waterfall source so the order can be tuned"""
+    pipe = get_redis().pipeline()
+    for step in result.get("steps", []):
+        # A hedged step cancelled by an earlier winner never finished, so it has no latency to count
+        if "elapsed_ms" not in step:
+            continue
+        pipe.hincrby(WATERFALL_STATS_KEY, f"{step['source']}:calls", 1)
+        pipe.hincrby(WATERFALL_STATS_KEY, f"{step['source']}:ms", step.get("elapsed_ms", 0))
+    if result.get("source"):
+        pipe.hincrby(WATERFALL_STATS_KEY, f"{result['source']}:wins", 1)
+    pipe.execute()
+
+
+def get_waterfall_stats() -> dict:
+    """Calls, wins and average latency per waterfall source"""
+    raw = {key.decode(): int(value) for key, value in get_redis().hgetall(WATERFALL_STATS_KEY).items()}
+    stats = {}
+    for source in WATERFALL_SOURCES:
+        calls = raw.get(f"{source}:calls", 0)
+        wins = raw.get(f"{source}:wins", 0)
+        stats[source] = {
+            "calls": calls,
+            "wins": wins,
+            "win_rate": round(wins / calls, 3) if calls else None,
+            "avg_ms": round(raw.get(f"{source}:ms", 0) / calls) if calls else None,
+        }
+    return stats
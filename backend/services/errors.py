@@ -0,0 +1,32 @@
+import httpx
+
+# Error classes worth retrying; anything else (4xx, bad input, missing keys) fails permanently
+RETRYABLE_ERROR_CLASSES = {"timeout", "network", "server_error", "rate_limited"}
+
+
+def classify_http_error(error: httpx.HTTPError) -> str:
+    """Map an httpx error to a retry error class"""
+    if isinstance(error, httpx.TimeoutException):
+        return "timeout"
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        if status == 429:
+            return "rate_limited"
+        if status >= 500:
+            return "server_error"
+        return "client_error"
+    if isinstance(error, httpx.TransportError):
+        return "network"
+    return "unknown"
+
+
+def http_error_result(error: httpx.HTTPError, **extra) -> dict:
+    """Standard failed-result dict for an HTTP error, carrying its error class"""
+    result = {"error": str(error), "error_class": classify_http_error(error), "success": False, **extra}
+
+    if isinstance(error, httpx.HTTPStatusError):
+        retry_after = error.response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            result["retry_after"] = int(retry_after)
+
+    return result
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+import hashlib
+import json
+import os
+
+# Lead fields each enrichment type reads; changing any of them makes a stored result stale
+PROVIDER_INPUT_FIELDS = {
+    "email": ("first_name", "last_name", "website", "email"),
+    "email_waterfall": ("first_name", "last_name", "website", "email"),
+    "apollo": ("first_name", "last_name", "company", "linkedin_url"),
+    "ai": ("first_name", "last_name", "company", "title", "linkedin_url"),
+    "scraper": ("website",),
+    "contact_page": ("website",),
+    "company_info": ("company", "website"),
+}
+
+# How long a completed result is reused before the provider is called again
+DEFAULT_FRESHNESS_TTLS = {
+    "email": timedelta(days=30),
+    "email_waterfall": timedelta(days=30),
+    "apollo": timedelta(days=90),
+    "ai": timedelta(days=90),
+    "scraper": timedelta(days=14),
+    "contact_page": timedelta(days=14),
+    "company_info": timedelta(days=90),
+}
+
+
+def freshness_ttl(enrichment_type: str) -> timedelta:
+    """TTL for an enrichment type, overridable with FRESHNESS_TTL_<TYPE>_HOURS"""
+    hours = os.getenv(f"FRESHNESS_TTL_{enrichment_type.upper()}_HOURS")
+    if hours is not None:
+        return timedelta(hours=float(hours))
+    return DEFAULT_FRESHNESS_TTLS.get(enrichment_type, timedelta(0))
+
+
+def input_fingerprint(lead, enrichment_type: str) -> str:
+    """Hash of the lead fields an enrichment type depends on"""
+    fields = PROVIDER_INPUT_FIELDS.get(enrichment_type, ("first_name", "last_name", "company", "website", "email"))
+    values = {field: (getattr(lead, field) or "").strip().lower() for field in fields}
+    payload = json.dumps([enrichment_type, values], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def freshness_cutoff(enrichment_type: str, now: datetime | None = None) -> datetime:
+    """Oldest completed_at that still counts as fresh"""
+    return (now or datetime.utcnow()) - freshness_ttl(enrichment_type)
+
+
+def is_fresh(task, lead, now: datetime | None = None) -> bool:
+    """Whether a completed task can stand in for a new run on this lead"""
+    if not task.completed_at or not task.input_fingerprint:
+        return False
+    if task.completed_at < freshness_cutoff(task.task_type, now):
+        return False
+    return task.input_fingerprint == input_fingerprint(lead, task.task_type)
@@ -0,0 +1,227 @@
+from collections import Counter
+from datetime import datetime
+
+from db.models import EnrichmentJob, EnrichmentStatus, EnrichmentTask, JobStatus
+from db.redis_client import get_redis
+from sqlalchemy import event, func, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+JOB_COUNTERS = ("pending", "running", "completed", "failed", "cancelled")
+# Per provider, for conditional re-scrapes: pages downloaded and parsed vs skipped as unchanged
+PAGE_COUNTERS = ("pages_changed", "pages_unchanged")
+JOB_KEY_TTL_SECONDS = 30 * 24 * 3600
+# celery_task_id of a task whose message was dropped while its job was paused: it matches no message, so a
+# copy still in the broker is skipped as superseded, and resuming the job re-dispatches exactly these tasks
+PAUSED_TASK_ID = "paused"
+
+# Counter each task status is tallied under
+STATUS_COUNTERS = {
+    EnrichmentStatus.PENDING: "pending",
+    EnrichmentStatus.PROCESSING: "running",
+    EnrichmentStatus.COMPLETED: "completed",
+    EnrichmentStatus.FAILED: "failed",
+}
+
+
+def job_progress_key(job_id: int) -> str:
+    """Redis hash of live counters: totals ("pending") and per provider ("email:pending")"""
+    return f"job:{job_id}:progress"
+
+
+def job_state_key(job_id: int) -> str:
+    """Redis flag workers check before calling a provider"""
+    return f"job:{job_id}:state"
+
+
+def init_job(job_id: int, counts_by_type: dict[str, int]):
+    """Start the job's counters with every task pending"""
+    key = job_progress_key(job_id)
+    pipe = get_redis().pipeline()
+    for enrichment_type, count in counts_by_type.items():
+        pipe.hincrby(key, "pending", count)
+        pipe.hincrby(key, f"{enrichment_type}:pending", count)
+    pipe.expire(key, JOB_KEY_TTL_SECONDS)
+    pipe.set(job_state_key(job_id), JobStatus.RUNNING.value, ex=JOB_KEY_TTL_SECONDS)
+    pipe.execute()
+
+
+def get_job_state(job_id: int) -> str:
+    state = get_redis().get(job_state_key(job_id))
+    return state.decode() if state else JobStatus.RUNNING.value
+
+
+def set_job_state(job_id: int, status: JobStatus):
+    get_redis().set(job_state_key(job_id), status.value, ex=JOB_KEY_TTL_SECONDS)
+
+
+def record_job_transition(job_id: int, enrichment_type: str, old: str | None, new: str, count: int = 1):
+    """Move count tasks of a job from one counter to another"""
+    key = job_progress_key(job_id)
+    pipe = get_redis().pipeline()
+    if old:
+        pipe.hincrby(key, old, -count)
+        pipe.hincrby(key, f"{enrichment_type}:{old}", -count)
+    pipe.hincrby(key, new, count)
+    pipe.hincrby(key, f"{enrichment_type}:{new}", count)
+    pipe.execute()
+
+
+def record_page_check(job_id: int, enrichment_type: str, changed: bool):
+    """Count a page a job's task re-scraped as changed or unchanged"""
+    counter = "pages_changed" if changed else "pages_unchanged"
+    get_redis().hincrby(job_progress_key(job_id), f"{enrichment_type}:{counter}", 1)
+
+
+def _counter(status: EnrichmentStatus | None, error_class: str | None) -> str | None:
+    if status == EnrichmentStatus.FAILED and error_class == "cancelled":
+        return "cancelled"
+    return STATUS_COUNTERS.get(status)
+
+
+def set_task_status(
+    db: Session, task: EnrichmentTask, status: EnrichmentStatus, cancelled: bool = False, **values
+) -> bool:
+    """
+    Change a task's status, with any other column values, if its row still has the status the task was read with
+    One conditional UPDATE: a task cancelled, reset or deleted since it was read is left alone and False is
+    returned. The job's counters move once the transaction commits.
+    """
+    changed = db.execute(
+        update(EnrichmentTask)
+        .where(EnrichmentTask.id == task.id, EnrichmentTask.status == task.status)
+        .values(status=status, **values)
+        .returning(EnrichmentTask.id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if not changed:
+        return False
+
+    old = _counter(task.status, task.error_class)
+    new = "cancelled" if cancelled else STATUS_COUNTERS[status]
+    if task.job_id and old != new:
+        db.info.setdefault("job_transitions", Counter())[(task.job_id, task.task_type, old, new)] += 1
+    # Keep the loaded task in step with its row without flushing it again
+    for key, value in {"status": status, **values}.items():
+        set_committed_value(task, key, value)
+    return True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_committed_transitions(db: Session):
+    for (job_id, enrichment_type, old, new), count in db.info.pop("job_transitions", {}).items():
+        record_job_transition(job_id, enrichment_type, old, new, count)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_transitions(db: Session):
+    db.info.pop("job_transitions", None)
+
+
+def read_job_counters(db: Session, job_id: int) -> dict:
+    """Live counters from Redis, rebuilt from enrichment_tasks if the hash was lost"""
+    key = job_progress_key(job_id)
+    raw = get_redis().hgetall(key)
+    if raw:
+        return {field.decode(): int(value) for field, value in raw.items()}
+
+    rows = (
+        db.query(EnrichmentTask.task_type, EnrichmentTask.status, EnrichmentTask.error_class, func.count())
+        .filter(EnrichmentTask.job_id == job_id)
+        .group_by(EnrichmentTask.task_type, EnrichmentTask.status, EnrichmentTask.error_class)
+        .all()
+    )
+    counters = Counter()
+    for enrichment_type, status, error_class, count in rows:
+        name = _counter(status, error_class)
+        counters[name] += count
+        counters[f"{enrichment_type}:{name}"] += count
+
+    if counters:
+        pipe = get_redis().pipeline()
+        pipe.hset(key, mapping=dict(counters))
+        pipe.expire(key, JOB_KEY_TTL_SECONDS)
+        pipe.execute()
+    return dict(counters)
+
+
+def finish_job_if_done(db: Session, job_id: int) -> bool:
+    """Mark the job completed once no task is pending or running; returns whether it finished"""
+    pending, running = get_redis().hmget(job_progress_key(job_id), "pending", "running")
+    if int(pending or 0) > 0 or int(running or 0) > 0:
+        return False
+
+    job = (
+        db.query(EnrichmentJob)
+        .filter(EnrichmentJob.id == job_id, EnrichmentJob.completed_at.is_(None))
+        .with_for_update()
+        .first()
+    )
+    if not job:
+        db.rollback()
+        return False
+
+    if job.status != JobStatus.CANCELLED:
+        job.status = JobStatus.COMPLETED
+    job.counts = read_job_counters(db, job_id)
+    job.completed_at = datetime.utcnow()
+    db.commit()
+    return True
+
+
+def reopen_jobs(db: Session, job_ids: set[int]):
+    """Put finished or cancelled jobs back to running after some of their tasks were re-queued"""
+    if not job_ids:
+        return
+    reopened = (
+        db.execute(
+            update(EnrichmentJob)
+            .where(
+                EnrichmentJob.id.in_(job_ids),
+                EnrichmentJob.status.in_([JobStatus.COMPLETED, JobStatus.CANCELLED]),
+            )
+            .values(status=JobStatus.RUNNING, counts=None, completed_at=None)
+            .returning(EnrichmentJob.id)
+        )
+        .scalars()
+        .all()
+    )
+    for job_id in reopened:
+        set_job_state(job_id, JobStatus.RUNNING)
+
+
+def job_progress(db: Session, job: EnrichmentJob, now: datetime | None = None) -> dict:
+    """Counters, throughput and ETA for a job"""
+    now = now or datetime.utcnow()
+    counters = job.counts if job.completed_at and job.counts else read_job_counters(db, job.id)
+    totals = {name: max(counters.get(name, 0), 0) for name in JOB_COUNTERS}
+
+    by_provider = {}
+    for enrichment_type in job.enrichment_types or []:
+        by_provider[enrichment_type] = {
+            name: max(counters.get(f"{enrichment_type}:{name}", 0), 0) for name in JOB_COUNTERS
+        }
+        for name in PAGE_COUNTERS:
+            if f"{enrichment_type}:{name}" in counters:
+                by_provider[enrichment_type][name] = counters[f"{enrichment_type}:{name}"]
+
+    # Throughput over the time the job was actually running
+    end = job.completed_at or (job.paused_at if job.status == JobStatus.PAUSED else now)
+    active_seconds = max((end - job.created_at).total_seconds() - (job.paused_seconds or 0), 0)
+    processed = totals["completed"] + totals["failed"]
+    per_second = processed / active_seconds if active_seconds else 0
+    remaining = totals["pending"] + totals["running"]
+
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "lead_count": job.lead_count,
+        "task_count": job.task_count,
+        "counts": totals,
+        "by_provider": by_provider,
+        "percent_complete": round(100 * (job.task_count - remaining) / job.task_count, 1) if job.task_count else 100.0,
+        "throughput_per_minute": round(per_second * 60, 1),
+        "eta_seconds": round(remaining / per_second) if per_second and job.status == JobStatus.RUNNING else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
@@ -0,0 +1,81 @@
+"""
+Ranked lead search over the columns Postgres maintains on every write
+
+A query matches a lead when every term is a prefix of one of its words (GIN index on Lead.search_vector),
+or, to tolerate typos, when it is word-similar to Lead.search_text (GIN trigram index, pg_trgm). Prefix
+matches rank above typo-only matches; within each, leads are ordered by ts_rank_cd (name hits weigh most,
+whole words more than prefixes) plus trigram similarity. Only SEARCH_MAX_CANDIDATES matches are ranked,
+which bounds the cost of very broad queries such as a single letter: prefix matches are taken first and
+typo-only matches fill whatever room is left, so typos never crowd out a prefix hit.
+"""
+
+import os
+import re
+
+from db.models import Lead
+from sqlalchemy import Float, Numeric, cast, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "1000"))
+# pg_trgm word similarity a typo-only match needs (0-1; pg_trgm's own default is 0.6)
+SEARCH_SIMILARITY_THRESHOLD = float(os.getenv("SEARCH_SIMILARITY_THRESHOLD", "0.5"))
+SEARCH_MAX_TERMS = 8
+# Trigram matching is skipped for shorter queries, which share too many trigrams to mean anything
+FUZZY_MIN_LENGTH = 3
+
+_TERM = re.compile(r"[^\W_]+")
+
+
+def search_terms(query: str) -> list[str]:
+    """Lowercase words of a query; punctuation (e.g. the "@" of an email) separates terms"""
+    return _TERM.findall(query.lower())[:SEARCH_MAX_TERMS]
+
+
+def _prefix_tsquery(terms: list[str]):
+    return func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+
+
+def search_candidates(terms: list[str], fuzzy: bool = True):
+    """Ids of at most SEARCH_MAX_CANDIDATES matching leads: prefix matches, then typo-only matches in the room left"""
+    prefix_match = Lead.search_vector.op("@@")(_prefix_tsquery(terms))
+    prefix = select(Lead.id).where(prefix_match).limit(SEARCH_MAX_CANDIDATES).cte("prefix_candidates")
+    text = " ".join(terms)
+    if not (fuzzy and len(text) >= FUZZY_MIN_LENGTH):
+        return prefix
+
+    room = func.greatest(SEARCH_MAX_CANDIDATES - select(func.count()).select_from(prefix).scalar_subquery(), 0)
+    typos = select(Lead.id).where(literal(text).op("<%")(Lead.search_text), ~prefix_match).limit(room)
+    return union_all(select(prefix.c.id), typos).cte("candidates")
+
+
+def search_leads_query(terms: list[str], columns, fuzzy: bool = True):
+    """
+    Select columns plus a "score" for the leads matching terms, best first, and on every row "matches": how many
+    leads were ranked (SEARCH_MAX_CANDIDATES at most)
+    Run set_similarity_threshold in the same transaction first
+    """
+    tsquery = _prefix_tsquery(terms)
+    prefix_match = Lead.search_vector.op("@@")(tsquery)
+    candidates = search_candidates(terms, fuzzy)
+    # Whole-word hits add a second rank, so "smith" puts Smith before Smithson
+    exact_tsquery = func.to_tsquery("simple", " | ".join(terms))
+    score = (
+        func.ts_rank_cd(Lead.search_vector, tsquery)
+        + func.ts_rank_cd(Lead.search_vector, exact_tsquery)
+        + func.word_similarity(" ".join(terms), Lead.search_text)
+    )
+    matches = select(func.count()).select_from(candidates).scalar_subquery()
+    return (
+        select(*columns, cast(func.round(cast(score, Numeric), 4), Float).label("score"), matches.label("matches"))
+        .join(candidates, candidates.c.id == Lead.id)
+        .order_by(prefix_match.desc(), score.desc(), Lead.id)
+    )
+
+
+def count_search_matches(db: Session, terms: list[str], fuzzy: bool = True) -> int:
+    """How many leads a search ranks, for a page past the last match"""
+    return db.execute(select(func.count()).select_from(search_candidates(terms, fuzzy))).scalar()
+
+
+def set_similarity_threshold(db: Session):
+    db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(SEARCH_SIMILARITY_THRESHOLD), True)))
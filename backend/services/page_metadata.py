@@ -0,0 +1,322 @@
+"""
+Single-pass extraction of company metadata from an HTML page
+
+One streaming parse (html.parser, no tree) collects the title and meta tags, OpenGraph, JSON-LD
+Organization data, social profiles, emails, phones and technology fingerprints. Every pattern is compiled
+once at import and social profiles are matched with a host lookup instead of scanning every domain.
+"""
+
+from html.parser import HTMLParser
+import json
+import re
+from urllib.parse import urljoin, urlsplit
+
+MAX_EMAILS = 10
+MAX_PHONES = 5
+# Inline scripts are only scanned this far for technology snippets (tag manager loaders sit at the top)
+INLINE_SCRIPT_SCAN_CHARS = 4000
+
+SOCIAL_DOMAINS = {
+    "linkedin.com": "linkedin",
+    "twitter.com": "twitter",
+    "x.com": "twitter",
+    "facebook.com": "facebook",
+    "fb.com": "facebook",
+    "instagram.com": "instagram",
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+    "github.com": "github",
+    "tiktok.com": "tiktok",
+    "crunchbase.com": "crunchbase",
+}
+
+ORGANIZATION_TYPES = {
+    "Organization",
+    "Corporation",
+    "LocalBusiness",
+    "OnlineBusiness",
+    "ProfessionalService",
+    "NGO",
+    "EducationalOrganization",
+}
+
+# Script, stylesheet and inline snippet signatures
+TECH_SIGNATURES = {
+    "Google Analytics": r"google-analytics\.com|googletagmanager\.com/gtag/",
+    "Google Tag Manager": r"googletagmanager\.com/gtm\.js",
+    "Segment": r"cdn\.segment\.com",
+    "HubSpot": r"js\.hs-scripts\.com|js\.hsforms\.net|js\.hs-analytics\.net",
+    "Marketo": r"munchkin\.marketo\.net",
+    "Pardot": r"pi\.pardot\.com",
+    "Hotjar": r"static\.hotjar\.com",
+    "Mixpanel": r"cdn\.mxpnl\.com",
+    "Intercom": r"widget\.intercom\.io|js\.intercomcdn\.com",
+    "Drift": r"js\.driftt\.com",
+    "Zendesk": r"static\.zdassets\.com",
+    "Facebook Pixel": r"connect\.facebook\.net",
+    "LinkedIn Insight": r"snap\.licdn\.com",
+    "Stripe": r"js\.stripe\.com",
+    "Calendly": r"assets\.calendly\.com",
+    "Shopify": r"cdn\.shopify\.com",
+    "WordPress": r"/wp-content/|/wp-includes/",
+    "Wix": r"static\.wixstatic\.com|static\.parastorage\.com",
+    "Squarespace": r"static1\.squarespace\.com",
+    "Webflow": r"website-files\.com|webflow\.js",
+    "Next.js": r"/_next/static/",
+    "Cloudflare": r"/cdn-cgi/",
+    "jQuery": r"jquery[.-][\d.]*(?:min\.)?js",
+    "Bootstrap": r"bootstrap(?:\.min)?\.(?:js|css)",
+}
+
+# <meta name="generator"> values
+GENERATOR_SIGNATURES = {
+    "WordPress": r"wordpress",
+    "Wix": r"wix\.com",
+    "Webflow": r"webflow",
+    "Squarespace": r"squarespace",
+    "Drupal": r"drupal",
+    "Joomla": r"joomla",
+    "Ghost": r"ghost",
+    "Hugo": r"hugo",
+    "Gatsby": r"gatsby",
+    "HubSpot": r"hubspot",
+}
+
+
+def _compile_signatures(signatures: dict) -> tuple[re.Pattern, dict]:
+    """One alternation with a named group per technology, so a single search tells which one matched"""
+    groups = {f"t{index}": name for index, name in enumerate(signatures)}
+    pattern = "|".join(f"(?P<t{index}>{signature})" for index, signature in enumerate(signatures.values()))
+    return re.compile(pattern, re.IGNORECASE), groups
+
+
+TECH_PATTERN, TECH_GROUPS = _compile_signatures(TECH_SIGNATURES)
+GENERATOR_PATTERN, GENERATOR_GROUPS = _compile_signatures(GENERATOR_SIGNATURES)
+EMAIL_PATTERN = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+NON_DIGITS = re.compile(r"\D")
+# Matches that look like emails but are placeholders or retina image names (logo@2x.png)
+IGNORED_EMAIL_PATTERN = re.compile(
+    r"example\.com|test\.com|placeholder|domain\.com|\.(?:png|jpe?g|gif|svg|webp)$", re.IGNORECASE
+)
+# Quoted URLs in inline scripts, the only part of a loader snippet the signatures need to see
+SCRIPT_URL_PATTERN = re.compile(r"""["']((?:https?:)?//[^"'\s]{4,300})""")
+# Share buttons link to the network, not to the company's profile
+SOCIAL_SHARE_PATTERN = re.compile(r"/(?:sharer|share|intent|shareArticle)\b", re.IGNORECASE)
+
+# Tags whose text is not page copy
+SKIPPED_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+
+def social_platform(url: str) -> str | None:
+    """Platform of a profile URL from its host ("uk.linkedin.com" -> "linkedin"), or None"""
+    try:
+        host = urlsplit(url).hostname
+    except ValueError:
+        return None
+    if not host:
+        return None
+    platform = SOCIAL_DOMAINS.get(host.removeprefix("www."))
+    if platform is None and host.count(".") > 1:
+        platform = SOCIAL_DOMAINS.get(host.split(".", host.count(".") - 1)[-1])
+    return platform
+
+
+class _PageParser(HTMLParser):
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.title = []
+        self.meta = {}
+        self.opengraph = {}
+        self.json_ld = []
+        self.social_links = {}
+        self.emails = {}
+        self.phones = {}
+        self.technologies = set()
+        self.text = []
+
+        self._open = None  # "title", "ld_json", "script" or a skipped text tag being read
+        self._ld_json = []
+        self._script_chars = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a":
+            href = attrs.get("href")
+            if href:
+                self._add_link(href.strip())
+        elif tag == "meta":
+            self._add_meta(attrs)
+        elif tag == "script":
+            src = attrs.get("src")
+            if src:
+                self._add_technologies(src)
+            if (attrs.get("type") or "").lower() == "application/ld+json":
+                self._open = "ld_json"
+                self._ld_json = []
+            else:
+                self._open = "script"
+                self._script_chars = 0
+        elif tag == "link":
+            href = attrs.get("href")
+            if href:
+                self._add_technologies(href)
+        elif tag == "title" and self._open is None and not self.title:
+            # Only the document title; inline SVGs have <title> elements too
+            self._open = "title"
+        elif tag in SKIPPED_TEXT_TAGS:
+            self._open = tag
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._open == "ld_json":
+            self.json_ld.append("".join(self._ld_json))
+            self._open = None
+        elif tag == self._open:
+            self._open = None
+
+    def handle_data(self, data):
+        if self._open is None:
+            self.text.append(data)
+        elif self._open == "title":
+            self.title.append(data)
+        elif self._open == "ld_json":
+            self._ld_json.append(data)
+        elif self._open == "script" and self._script_chars < INLINE_SCRIPT_SCAN_CHARS:
+            for url in SCRIPT_URL_PATTERN.findall(data, 0, INLINE_SCRIPT_SCAN_CHARS - self._script_chars):
+                self._add_technologies(url)
+            self._script_chars += len(data)
+
+    def _add_link(self, href: str):
+        lowered = href[:7].lower()
+        if lowered == "mailto:":
+            email = href[7:].split("?", 1)[0].strip()
+            if EMAIL_PATTERN.fullmatch(email) and not IGNORED_EMAIL_PATTERN.search(email):
+                self.emails.setdefault(email.lower(), email)
+        elif lowered[:4] == "tel:":
+            phone = href[4:].strip()
+            if phone:
+                self.phones.setdefault(NON_DIGITS.sub("", phone), phone)
+        elif lowered[:4] == "http" or href[:2] == "//":
+            self.add_social(urljoin(self.base_url, href) if href[:2] == "//" else href)
+
+    def add_social(self, url: str):
+        platform = social_platform(url)
+        if platform and platform not in self.social_links and not SOCIAL_SHARE_PATTERN.search(url):
+            self.social_links[platform] = url
+
+    def _add_meta(self, attrs: dict):
+        content = attrs.get("content")
+        if content is None:
+            return
+        key = (attrs.get("property") or attrs.get("name") or "").lower()
+        if key.startswith("og:"):
+            self.opengraph.setdefault(key[3:], content.strip())
+        elif key == "description":
+            self.meta.setdefault(key, content.strip())
+        elif key == "generator":
+            match = GENERATOR_PATTERN.search(content)
+            if match:
+                self.technologies.add(GENERATOR_GROUPS[match.lastgroup])
+
+    def _add_technologies(self, value: str):
+        for match in TECH_PATTERN.finditer(value):
+            self.technologies.add(TECH_GROUPS[match.lastgroup])
+
+
+def _organization(blocks: list[str]) -> dict | None:
+    """The first schema.org Organization (or subtype) in the page's JSON-LD blocks"""
+    pending = []
+    for block in blocks:
+        try:
+            pending.append(json.loads(block))
+        except ValueError:
+            continue
+
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, list):
+            pending.extend(node)
+            continue
+        if not isinstance(node, dict):
+            continue
+        types = node.get("@type")
+        # Malformed sites put objects in @type; only type names can match
+        types = {value for value in (types if isinstance(types, list) else [types]) if isinstance(value, str)}
+        if types & ORGANIZATION_TYPES:
+            return _organization_fields(node)
+        if "@graph" in node:
+            pending.extend(node["@graph"] if isinstance(node["@graph"], list) else [node["@graph"]])
+    return None
+
+
+def _organization_fields(node: dict) -> dict:
+    def text(value):
+        if isinstance(value, dict):
+            value = value.get("url") or value.get("name") or value.get("value")
+        if isinstance(value, list):
+            value = value[0] if value else None
+        return value.strip() if isinstance(value, str) and value.strip() else None
+
+    address = node.get("address")
+    if isinstance(address, list):
+        address = address[0] if address else None
+    if isinstance(address, dict):
+        parts = ("streetAddress", "addressLocality", "addressRegion", "postalCode", "addressCountry")
+        address = ", ".join(filter(None, (text(address.get(part)) for part in parts))) or None
+
+    employees = node.get("numberOfEmployees")
+    if isinstance(employees, dict):
+        low, high = employees.get("minValue"), employees.get("maxValue")
+        employees = employees.get("value") or (f"{low}-{high}" if low and high else low or high)
+
+    same_as = node.get("sameAs") or []
+    organization = {
+        "name": text(node.get("name")),
+        "legal_name": text(node.get("legalName")),
+        "url": text(node.get("url")),
+        "logo": text(node.get("logo")),
+        "description": text(node.get("description")),
+        "email": text(node.get("email")),
+        "telephone": text(node.get("telephone")),
+        "founding_date": text(node.get("foundingDate")),
+        "employees": str(employees) if employees else None,
+        "address": text(address),
+        "same_as": [url for url in ([same_as] if isinstance(same_as, str) else same_as) if isinstance(url, str)],
+    }
+    return {key: value for key, value in organization.items() if value}
+
+
+def extract_page_metadata(html: str, base_url: str) -> dict:
+    """Title, description, OpenGraph, JSON-LD organization, socials, emails, phones and technologies of a page"""
+    parser = _PageParser(base_url)
+    parser.feed(html)
+    parser.close()
+
+    organization = _organization(parser.json_ld)
+    if organization:
+        for url in organization.get("same_as", []):
+            parser.add_social(url)
+        if organization.get("email"):
+            parser.emails.setdefault(organization["email"].removeprefix("mailto:").lower(), organization["email"])
+        if organization.get("telephone"):
+            parser.phones.setdefault(NON_DIGITS.sub("", organization["telephone"]), organization["telephone"])
+
+    # Phones come only from tel: links and JSON-LD: digit runs in page text are mostly years, prices and ids
+    text = " ".join(parser.text)
+    for email in EMAIL_PATTERN.findall(text):
+        if len(parser.emails) >= MAX_EMAILS:
+            break
+        if not IGNORED_EMAIL_PATTERN.search(email):
+            parser.emails.setdefault(email.lower(), email)
+
+    title = " ".join("".join(parser.title).split()) or parser.opengraph.get("title")
+    return {
+        "title": title or None,
+        "description": parser.meta.get("description") or parser.opengraph.get("description"),
+        "opengraph": parser.opengraph,
+        "organization": organization,
+        "social_links": parser.social_links,
+        "emails": list(parser.emails.values())[:MAX_EMAILS],
+        "phones": list(parser.phones.values())[:MAX_PHONES],
+        "technologies": sorted(parser.technologies),
+    }
@@ -0,0 +1,104 @@
+"""
+Content-addressed storage of raw provider responses
+
+A large provider response is stored once in provider_payloads, zlib-compressed and keyed by the sha256 of its
+canonical JSON, so re-enriching the same person adds no new payload. The task result, Lead.enriched_data and
+enrichment_results keep only the fields PAYLOAD_PROJECTIONS picks for the type, plus "payload": <hash>.
+"""
+
+import hashlib
+import json
+import os
+import zlib
+
+from db.models import ProviderPayload
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+# Responses smaller than this are kept inline whole
+PAYLOAD_MIN_BYTES = int(os.getenv("PAYLOAD_MIN_BYTES", "2048"))
+PAYLOAD_COMPRESSION_LEVEL = 6
+
+# Apollo people/match fields read by the lead update, extract_hot_attributes, search and the UI
+APOLLO_PERSON_FIELDS = (
+    "id",
+    "name",
+    "first_name",
+    "last_name",
+    "title",
+    "headline",
+    "email",
+    "email_status",
+    "phone",
+    "linkedin_url",
+    "seniority",
+    "departments",
+    "city",
+    "state",
+    "country",
+)
+APOLLO_ORGANIZATION_FIELDS = (
+    "id",
+    "name",
+    "website_url",
+    "primary_domain",
+    "linkedin_url",
+    "industry",
+    "estimated_num_employees",
+    "city",
+    "country",
+)
+
+
+def _pick(data: dict, fields: tuple[str, ...]) -> dict:
+    return {field: data[field] for field in fields if data.get(field) is not None}
+
+
+def project_apollo(result: dict) -> dict:
+    person = result.get("person")
+    if not person:
+        return {"person": None}
+    projected = _pick(person, APOLLO_PERSON_FIELDS)
+    if person.get("organization"):
+        projected["organization"] = _pick(person["organization"], APOLLO_ORGANIZATION_FIELDS)
+    return {"person": projected}
+
+
+# Enrichment types whose raw response goes to provider_payloads, with the projection kept inline
+PAYLOAD_PROJECTIONS = {
+    "apollo": project_apollo,
+}
+
+
+def compact_result(db: Session, enrichment_type: str, result: dict | None) -> dict | None:
+    """
+    Store a successful provider response's payload and return the projection to keep in its place
+    Errors, small responses, other types and results already compacted are returned unchanged
+    """
+    project = PAYLOAD_PROJECTIONS.get(enrichment_type)
+    if project is None or not result or result.get("error") or "payload" in result:
+        return result
+
+    raw = json.dumps(result, sort_keys=True, separators=(",", ":")).encode()
+    if len(raw) < PAYLOAD_MIN_BYTES:
+        return result
+
+    digest = hashlib.sha256(raw).hexdigest()
+    db.execute(
+        insert(ProviderPayload)
+        .values(
+            hash=digest,
+            enrichment_type=enrichment_type,
+            size=len(raw),
+            body=zlib.compress(raw, PAYLOAD_COMPRESSION_LEVEL),
+        )
+        .on_conflict_do_nothing(index_elements=[ProviderPayload.hash])
+    )
+    return {**project(result), "payload": digest}
+
+
+def load_payload(db: Session, digest: str) -> bytes | None:
+    """The raw JSON of a stored payload"""
+    body = db.execute(select(ProviderPayload.body).where(ProviderPayload.hash == digest)).scalar()
+    return zlib.decompress(body) if body is not None else None
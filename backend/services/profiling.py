@@ -0,0 +1,269 @@
+"""
+Opt-in profiling of single API requests and enrichment tasks
+
+A profile samples the call stack of the thread serving the request or task every PROFILE_INTERVAL_MS and
+records every SQL statement it runs. A request shares its event loop thread with every other request, so its
+stack is only sampled while its own asyncio task is the one running. Stacks are stored in folded form ("a;b;c count" per line), which
+flamegraph.pl, speedscope and inferno read directly. Nothing is hooked until the first profile starts, so
+with profiling off the only cost is the decision whether to start one.
+"""
+
+import asyncio
+from collections import Counter
+import contextvars
+from datetime import datetime, timezone
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from db.redis_client import get_redis
+import redis
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# Fraction of enrich_lead tasks profiled, optionally only for the types in PROFILE_TASK_TYPES
+PROFILE_TASK_SAMPLE_RATE = float(os.getenv("PROFILE_TASK_SAMPLE_RATE", "0"))
+PROFILE_TASK_TYPES = {value.strip() for value in os.getenv("PROFILE_TASK_TYPES", "").split(",") if value.strip()}
+PROFILE_TTL_SECONDS = int(os.getenv("PROFILE_TTL_SECONDS", str(3 * 24 * 3600)))
+PROFILE_INDEX_SIZE = 1000
+PROFILE_TOP_QUERIES = 20
+PROFILE_TOP_FUNCTIONS = 20
+
+PROFILE_KEY = "profile:{}"
+PROFILE_INDEX_KEY = "profiles"
+
+_current_profile = contextvars.ContextVar("profile", default=None)
+
+
+class Profile:
+    """Stack samples and SQL timings collected for one request or task"""
+
+    def __init__(self, kind: str, profile_id: str, name: str):
+        self.kind = kind
+        self.id = profile_id
+        self.name = name
+        self.thread_id = threading.get_ident()
+        # Set when started from a coroutine: the loop thread runs other tasks too, so only this one is sampled
+        try:
+            self.loop = asyncio.get_running_loop()
+            self.task = asyncio.current_task(self.loop)
+        except RuntimeError:
+            self.loop = self.task = None
+        self.stacks = Counter()
+        self.queries = {}  # statement -> [count, total seconds, max seconds]
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.duration = None
+        self.meta = {}
+
+    def record_query(self, statement: str, elapsed: float):
+        stats = self.queries.setdefault(statement, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        samples = sum(self.stacks.values())
+        self_time = Counter()
+        for stack, count in self.stacks.items():
+            self_time[stack.rsplit(";", 1)[-1]] += count
+        queries = sorted(self.queries.items(), key=lambda item: item[1][1], reverse=True)
+
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "interval_ms": PROFILE_INTERVAL_MS,
+            "samples": samples,
+            # Leaf frames by share of samples: where the thread actually was, including waits on I/O
+            "top_functions": [
+                {"function": function, "samples": count, "share": round(count / samples, 3)}
+                for function, count in self_time.most_common(PROFILE_TOP_FUNCTIONS)
+            ],
+            "sql": {
+                "count": sum(stats[0] for _, stats in queries),
+                "total_ms": round(sum(stats[1] for _, stats in queries) * 1000, 3),
+                "statements": [
+                    {
+                        "statement": statement,
+                        "count": count,
+                        "total_ms": round(total * 1000, 3),
+                        "max_ms": round(longest * 1000, 3),
+                    }
+                    for statement, (count, total, longest) in queries[:PROFILE_TOP_QUERIES]
+                ],
+            },
+            **self.meta,
+        }
+
+
+_frame_labels = {}
+
+
+def _fold(frame) -> str:
+    """Root-first stack of a frame in folded form"""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        label = _frame_labels.get(code)
+        if label is None:
+            path = "/".join(code.co_filename.rsplit("/", 2)[-2:])
+            label = _frame_labels[code] = f"{code.co_qualname} ({path}:{code.co_firstlineno})".replace(";", ",")
+        labels.append(label)
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _StackSampler:
+    """One background thread sampling the threads of every running profile; it idles while there are none"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles = set()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.add(profile)
+            # Also restarts the thread in forked worker children, which do not inherit it
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def remove(self, profile: Profile):
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self):
+        interval = PROFILE_INTERVAL_MS / 1000
+        while True:
+            self._wake.clear()
+            with self._lock:
+                profiles = list(self._profiles)
+            if not profiles:
+                self._wake.wait()
+                continue
+
+            # A task counts as sampled only if it was running both before and after the frames were taken
+            running = {profile: self._running_task(profile) for profile in profiles}
+            frames = sys._current_frames()
+            for profile in profiles:
+                frame = frames.get(profile.thread_id)
+                task = running[profile]
+                if frame is not None and task is self._running_task(profile) and profile.task in (None, task):
+                    profile.stacks[_fold(frame)] += 1
+            del frames
+            time.sleep(interval)
+
+    @staticmethod
+    def _running_task(profile: Profile):
+        return asyncio.current_task(profile.loop) if profile.loop is not None else None
+
+
+_sampler = _StackSampler()
+_sql_hooks_lock = threading.Lock()
+_sql_hooks_installed = False
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_profile.get() is not None:
+        context._profile_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current_profile.get()
+    started = getattr(context, "_profile_started", None)
+    if profile is not None and started is not None:
+        profile.record_query(statement, time.perf_counter() - started)
+
+
+def _install_sql_hooks():
+    """Time statements on every engine, including ones built later by init_engine"""
+    global _sql_hooks_installed
+    with _sql_hooks_lock:
+        if not _sql_hooks_installed:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+            _sql_hooks_installed = True
+
+
+def should_profile_task(enrichment_type: str) -> bool:
+    if not PROFILE_TASK_SAMPLE_RATE or (PROFILE_TASK_TYPES and enrichment_type not in PROFILE_TASK_TYPES):
+        return False
+    return random.random() < PROFILE_TASK_SAMPLE_RATE
+
+
+def start_profile(kind: str, profile_id: str, name: str) -> Profile:
+    """
+    Start profiling the current thread and context, or only the current asyncio task when called from one
+    Call finish_profile from the same context: SQL is attributed through a context variable
+    """
+    _install_sql_hooks()
+    profile = Profile(kind, profile_id, name)
+    profile.token = _current_profile.set(profile)
+    _sampler.add(profile)
+    return profile
+
+
+def finish_profile(profile: Profile, **meta):
+    """Stop sampling and store the profile; meta (status code, task state, ...) is added to its summary"""
+    _sampler.remove(profile)
+    _current_profile.reset(profile.token)
+    profile.duration = time.perf_counter() - profile.started
+    profile.meta.update(meta)
+
+    key = PROFILE_KEY.format(profile.id)
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hset(key, mapping={"summary": json.dumps(profile.summary()), "folded": profile.folded()})
+        pipe.expire(key, PROFILE_TTL_SECONDS)
+        pipe.zadd(PROFILE_INDEX_KEY, {profile.id: profile.started_at.timestamp()})
+        pipe.zremrangebyrank(PROFILE_INDEX_KEY, 0, -PROFILE_INDEX_SIZE - 1)
+        pipe.execute()
+    except redis.RedisError:
+        # Profiles are best effort; never fail the request or task over one
+        pass
+
+
+def get_profile(profile_id: str) -> dict | None:
+    summary = get_redis().hget(PROFILE_KEY.format(profile_id), "summary")
+    return json.loads(summary) if summary else None
+
+
+def get_folded_stacks(profile_id: str) -> str | None:
+    folded = get_redis().hget(PROFILE_KEY.format(profile_id), "folded")
+    return folded.decode() if folded is not None else None
+
+
+def list_profiles(limit: int = 50, kind: str = None) -> list[dict]:
+    """Most recent profiles first; expired ones are skipped"""
+    client = get_redis()
+    profile_ids = client.zrevrange(PROFILE_INDEX_KEY, 0, PROFILE_INDEX_SIZE - 1)
+    pipe = client.pipeline()
+    for profile_id in profile_ids:
+        pipe.hget(PROFILE_KEY.format(profile_id.decode()), "summary")
+
+    profiles = []
+    for summary in pipe.execute():
+        if summary is None:
+            continue
+        profile = json.loads(summary)
+        if kind and profile["kind"] != kind:
+            continue
+        profile.pop("top_functions")
+        profile["sql"].pop("statements")
+        profiles.append(profile)
+        if len(profiles) == limit:
+            break
+    return profiles
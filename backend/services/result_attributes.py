@@ -0,0 +1,72 @@
+from datetime import datetime
+
+from db.models import EnrichmentResult, Lead
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+# Upper bound of each employee-count bucket, smallest first
+COMPANY_SIZE_BUCKETS = [
+    (10, "1-10"),
+    (50, "11-50"),
+    (200, "51-200"),
+    (500, "201-500"),
+    (1000, "501-1000"),
+    (5000, "1001-5000"),
+]
+
+
+def company_size_bucket(employees) -> str | None:
+    """Bucket an employee count into the ranges used for filtering"""
+    try:
+        employees = int(employees)
+    except (TypeError, ValueError):
+        return None
+    if employees <= 0:
+        return None
+    for upper, label in COMPANY_SIZE_BUCKETS:
+        if employees <= upper:
+            return label
+    return "5001+"
+
+
+def _normalize(value) -> str | None:
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip().lower()
+
+
+def extract_hot_attributes(enriched_data: dict | None) -> dict:
+    """Pull the filterable attributes out of a lead's provider output"""
+    enriched_data = enriched_data or {}
+    email = enriched_data.get("email") or enriched_data.get("email_waterfall") or {}
+    person = (enriched_data.get("apollo") or {}).get("person") or {}
+    organization = person.get("organization") or {}
+
+    email_status = _normalize(email.get("status"))
+    if not email_status and "valid" in email:
+        email_status = "valid" if email["valid"] else "invalid"
+    if not email_status and person.get("email_status") == "verified":
+        email_status = "valid"
+
+    return {
+        "email_status": email_status,
+        "industry": _normalize(organization.get("industry")),
+        "company_size": company_size_bucket(organization.get("estimated_num_employees")),
+        "seniority": _normalize(person.get("seniority")),
+    }
+
+
+def upsert_enrichment_result(db: Session, lead: Lead):
+    """Write the lead's extracted attributes and provider output to enrichment_results"""
+    values = {
+        "lead_id": lead.id,
+        "data": lead.enriched_data or {},
+        "updated_at": datetime.utcnow(),
+        **extract_hot_attributes(lead.enriched_data),
+    }
+    stmt = insert(EnrichmentResult).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[EnrichmentResult.lead_id],
+        set_={key: stmt.excluded[key] for key in values if key != "lead_id"},
+    )
+    db.execute(stmt)
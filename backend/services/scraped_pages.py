@@ -0,0 +1,45 @@
+from datetime import datetime
+
+from db.models import ScrapedPage
+from sqlalchemy import case, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+
+def get_scraped_page(db: Session, url: str) -> dict | None:
+    """Stored validators, body hash and result of a URL, as ScraperService takes them for a conditional re-scrape"""
+    row = db.execute(
+        select(ScrapedPage.etag, ScrapedPage.last_modified, ScrapedPage.content_hash, ScrapedPage.result).where(
+            ScrapedPage.url == url
+        )
+    ).first()
+    return row._asdict() if row else None
+
+
+def save_scraped_page(db: Session, url: str, page: dict):
+    """Store what a scrape downloaded; changed_at only moves when the body hash changes"""
+    now = datetime.utcnow()
+    stmt = insert(ScrapedPage).values(
+        url=url,
+        etag=page["etag"],
+        last_modified=page["last_modified"],
+        content_hash=page["content_hash"],
+        result=page["result"],
+        fetched_at=now,
+        changed_at=now,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ScrapedPage.url],
+        set_={
+            "etag": stmt.excluded.etag,
+            "last_modified": stmt.excluded.last_modified,
+            "content_hash": stmt.excluded.content_hash,
+            "result": stmt.excluded.result,
+            "fetched_at": now,
+            "changed_at": case(
+                (ScrapedPage.content_hash == stmt.excluded.content_hash, ScrapedPage.changed_at), else_=now
+            ),
+        },
+    )
+    db.execute(stmt)
+    db.commit()
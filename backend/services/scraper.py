@@ -1,9 +1,22 @@
+import hashlib
 import re
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
 import httpx
 
+from .errors import http_error_result
+from .page_metadata import extract_page_metadata
+
+
+def conditional_headers(previous: dict) -> dict:
+    """If-None-Match / If-Modified-Since for a page from its stored validators"""
+    headers = {}
+    if previous.get("etag"):
+        headers["If-None-Match"] = previous["etag"]
+    if previous.get("last_modified"):
+        headers["If-Modified-Since"] = previous["last_modified"]
+    return headers
+
 
 class ScraperService:
     """Service for web scraping and data extraction"""
@@ -17,39 +30,55 @@ class ScraperService:
         """
         Scrape basic information from a company website
         """
+        result, _ = await self.scrape_company_website_if_changed(url)
+        return result
+
+    async def scrape_company_website_if_changed(self, url: str, previous: dict = None) -> tuple[dict, dict | None]:
+        """
+        Scrape a company website unless it is unchanged since the previous scrape
+        previous holds the stored etag, last_modified, content_hash and result of the URL. On a 304 or an
+        identical body the previous result is returned with "unchanged": True, without parsing.
+        Also returns the page's validators and hash when they need storing, otherwise None.
+        """
+        headers = self.headers
+        if previous and previous.get("result"):
+            headers = {**headers, **conditional_headers(previous)}
+        else:
+            previous = None
+
         try:
             async with httpx.AsyncClient(follow_redirects=True) as client:
-                response = await client.get(url, headers=self.headers, timeout=30.0)
+                response = await client.get(url, headers=headers, timeout=30.0)
+                if response.status_code == 304 and previous:
+                    return {**previous["result"], "unchanged": True}, None
                 response.raise_for_status()
 
-                soup = BeautifulSoup(response.text, "html.parser")
-
-                # Extract basic info
-                title = soup.find("title")
-                description = soup.find("meta", attrs={"name": "description"})
-
-                # Try to find social links
-                social_links = self._extract_social_links(soup, url)
-
-                # Try to find contact email
-                emails = self._extract_emails(soup.get_text())
-
-                return {
-                    "url": url,
-                    "title": title.text.strip() if title else None,
-                    "description": description["content"] if description and description.get("content") else None,
-                    "social_links": social_links,
-                    "emails": list(set(emails)) if emails else [],
-                    "success": True,
+                page = {
+                    "etag": response.headers.get("etag"),
+                    "last_modified": response.headers.get("last-modified"),
+                    "content_hash": hashlib.sha256(response.content).hexdigest(),
                 }
+                if previous and page["content_hash"] == previous.get("content_hash"):
+                    # Server without validators (or new ones for the same body): nothing to parse
+                    unchanged = {**previous["result"], "unchanged": True}
+                    same_validators = all(page[name] == previous.get(name) for name in ("etag", "last_modified"))
+                    return unchanged, None if same_validators else {**page, "result": previous["result"]}
+
+                # One pass over the page: title, OpenGraph, JSON-LD organization, socials, contacts, technologies
+                result = {"url": url, **extract_page_metadata(response.text, url), "success": True}
+                return result, {**page, "result": result}
+        except httpx.HTTPError as e:
+            return http_error_result(e), None
         except Exception as e:
-            return {"error": str(e), "success": False}
+            return {"error": str(e), "success": False}, None
 
     async def scrape_linkedin_company(self, linkedin_url: str) -> dict:
         """
         Scrape LinkedIn company page (basic info only - respects robots.txt)
         Note: For production, use LinkedIn API instead
         """
+        from bs4 import BeautifulSoup
+
         try:
             async with httpx.AsyncClient(follow_redirects=True) as client:
                 response = await client.get(linkedin_url, headers=self.headers, timeout=30.0)
@@ -67,6 +96,8 @@ class ScraperService:
                     "note": "Limited data - use LinkedIn API for full access",
                     "success": True,
                 }
+        except httpx.HTTPError as e:
+            return http_error_result(e)
         except Exception as e:
             return {"error": str(e), "success": False}
 
@@ -106,6 +137,8 @@ class ScraperService:
         """
         Find and scrape contact page
         """
+        from bs4 import BeautifulSoup
+
         try:
             # First, try to find contact page
             async with httpx.AsyncClient(follow_redirects=True) as client:
@@ -138,30 +171,11 @@ class ScraperService:
                     "phones": list(set(phones)),
                     "success": True,
                 }
+        except httpx.HTTPError as e:
+            return http_error_result(e)
         except Exception as e:
             return {"error": str(e), "success": False}
 
-    def _extract_social_links(self, soup: BeautifulSoup, base_url: str) -> dict:
-        """Extract social media links from page"""
-        social_links = {}
-        social_domains = {
-            "linkedin.com": "linkedin",
-            "twitter.com": "twitter",
-            "x.com": "twitter",
-            "facebook.com": "facebook",
-            "instagram.com": "instagram",
-            "youtube.com": "youtube",
-        }
-
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            for domain, platform in social_domains.items():
-                if domain in href:
-                    social_links[platform] = href
-                    break
-
-        return social_links
-
     def _extract_emails(self, text: str) -> list:
         """Extract email addresses from text"""
         email_pattern = r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"
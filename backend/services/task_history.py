@@ -0,0 +1,246 @@
+"""
+Retention for enrichment_tasks
+
+enrichment_tasks keeps, per lead and enrichment type, the newest task and the newest completed one (which
+the freshness skip reads), plus anything younger than TASK_RETENTION_DAYS. That bounds the rows the per-lead
+queries on the hot path read however long the history grows. compact_task_history moves the older,
+superseded runs out in batches: each batch is folded into enrichment_task_summaries and, unless
+TASK_ARCHIVE_MONTHS is 0, copied to enrichment_task_archive, whose monthly partitions are dropped whole
+once they are TASK_ARCHIVE_MONTHS old.
+"""
+
+from datetime import datetime, timedelta
+import os
+
+from db.models import EnrichmentJob, EnrichmentStatus, EnrichmentTask, EnrichmentTaskArchive, EnrichmentTaskSummary
+from sqlalchemy import and_, delete, exists, func, or_, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by, array_agg, insert
+from sqlalchemy.orm import Session, aliased
+
+TASK_RETENTION_DAYS = int(os.getenv("TASK_RETENTION_DAYS", "30"))
+# Archived tasks are kept this many whole months; 0 keeps only the summaries
+TASK_ARCHIVE_MONTHS = int(os.getenv("TASK_ARCHIVE_MONTHS", "12"))
+TASK_COMPACTION_BATCH_SIZE = int(os.getenv("TASK_COMPACTION_BATCH_SIZE", "5000"))
+
+ARCHIVE_TABLE = EnrichmentTaskArchive.__tablename__
+ARCHIVE_COLUMNS = (
+    "id",
+    "lead_id",
+    "job_id",
+    "task_type",
+    "status",
+    "result",
+    "error_message",
+    "error_class",
+    "attempts",
+    "created_at",
+    "completed_at",
+)
+
+
+def _month_start(moment: datetime) -> datetime:
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month: datetime) -> datetime:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def _partition_name(month: datetime) -> str:
+    return f"{ARCHIVE_TABLE}_{month:%Y_%m}"
+
+
+def ensure_archive_partitions(db: Session, since: datetime, until: datetime):
+    """Create the monthly archive partitions covering since..until"""
+    month = _month_start(since)
+    while month <= until:
+        upper = _next_month(month)
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {_partition_name(month)} PARTITION OF {ARCHIVE_TABLE} "
+                f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{upper:%Y-%m-%d}')"
+            )
+        )
+        month = upper
+
+
+def drop_expired_archive_partitions(db: Session, now: datetime) -> list[str]:
+    """Drop the archive partitions whose whole month is older than TASK_ARCHIVE_MONTHS"""
+    oldest_kept = _month_start(now)
+    for _ in range(TASK_ARCHIVE_MONTHS):
+        oldest_kept = _month_start(oldest_kept - timedelta(days=1))
+
+    partitions = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": ARCHIVE_TABLE},
+    ).scalars()
+    expired = sorted(name for name in partitions if name < _partition_name(oldest_kept))
+    for name in expired:
+        db.execute(text(f"DROP TABLE {name}"))
+    return expired
+
+
+def _compactable_tasks(batch_ids: list[int], cutoff: datetime):
+    """Terminal tasks of the batch that are past retention, belong to a finished job and are superseded"""
+    newer = aliased(EnrichmentTask)
+    newer_run = exists().where(
+        newer.lead_id == EnrichmentTask.lead_id,
+        newer.task_type == EnrichmentTask.task_type,
+        newer.id > EnrichmentTask.id,
+    )
+    return (
+        select(EnrichmentTask.id)
+        .where(
+            EnrichmentTask.id.in_(batch_ids),
+            EnrichmentTask.created_at < cutoff,
+            EnrichmentTask.status.in_([EnrichmentStatus.COMPLETED, EnrichmentStatus.FAILED]),
+            or_(
+                EnrichmentTask.job_id.is_(None),
+                EnrichmentTask.job_id.in_(select(EnrichmentJob.id).where(EnrichmentJob.completed_at.isnot(None))),
+            ),
+            or_(
+                # Orphans of deleted leads
+                EnrichmentTask.lead_id.is_(None),
+                # A completed task stays until a newer completed one replaces it as the lead's fresh result
+                and_(
+                    newer_run,
+                    or_(
+                        EnrichmentTask.status == EnrichmentStatus.FAILED,
+                        newer_run.where(newer.status == EnrichmentStatus.COMPLETED),
+                    ),
+                ),
+            ),
+        )
+        # Rows a retry or a worker holds are left for the next run
+        .with_for_update(skip_locked=True)
+    )
+
+
+def _compact(db: Session, task_ids, archive: bool) -> int:
+    """Delete the tasks, fold them into the per-lead summaries and optionally archive them, in one statement"""
+    moved = (
+        delete(EnrichmentTask)
+        .where(EnrichmentTask.id.in_(task_ids))
+        .returning(*(getattr(EnrichmentTask, column) for column in ARCHIVE_COLUMNS))
+        .cte("moved")
+    )
+
+    completed = moved.c.status == EnrichmentStatus.COMPLETED
+    cancelled = and_(moved.c.status == EnrichmentStatus.FAILED, moved.c.error_class == "cancelled")
+    failed = and_(moved.c.status == EnrichmentStatus.FAILED, moved.c.error_class.is_distinct_from("cancelled"))
+    last_error_class = array_agg(aggregate_order_by(moved.c.error_class, moved.c.id.desc())).filter(failed)
+
+    summaries = insert(EnrichmentTaskSummary).from_select(
+        [
+            "lead_id",
+            "task_type",
+            "runs",
+            "completed",
+            "failed",
+            "cancelled",
+            "attempts",
+            "first_created_at",
+            "last_completed_at",
+            "last_error_class",
+            "updated_at",
+        ],
+        select(
+            moved.c.lead_id,
+            moved.c.task_type,
+            func.count(),
+            func.count().filter(completed),
+            func.count().filter(failed),
+            func.count().filter(cancelled),
+            func.coalesce(func.sum(moved.c.attempts), 0),
+            func.min(moved.c.created_at),
+            func.max(moved.c.completed_at),
+            # Batches run oldest first, so this batch's latest error is the newest one
+            last_error_class[1],
+            func.now(),
+        )
+        .where(moved.c.lead_id.isnot(None))
+        .group_by(moved.c.lead_id, moved.c.task_type),
+    )
+    summary = EnrichmentTaskSummary.__table__.c
+    summaries = summaries.on_conflict_do_update(
+        index_elements=[summary.lead_id, summary.task_type],
+        set_={
+            "runs": summary.runs + summaries.excluded.runs,
+            "completed": summary.completed + summaries.excluded.completed,
+            "failed": summary.failed + summaries.excluded.failed,
+            "cancelled": summary.cancelled + summaries.excluded.cancelled,
+            "attempts": summary.attempts + summaries.excluded.attempts,
+            "first_created_at": func.least(summary.first_created_at, summaries.excluded.first_created_at),
+            "last_completed_at": func.greatest(summary.last_completed_at, summaries.excluded.last_completed_at),
+            "last_error_class": func.coalesce(summaries.excluded.last_error_class, summary.last_error_class),
+            "updated_at": summaries.excluded.updated_at,
+        },
+    )
+
+    statement = select(func.count()).select_from(moved).add_cte(summaries.cte("summarized"))
+    if archive:
+        archived = insert(EnrichmentTaskArchive).from_select(
+            [*ARCHIVE_COLUMNS, "archived_at"],
+            select(*(moved.c[column] for column in ARCHIVE_COLUMNS), func.now()),
+        )
+        statement = statement.add_cte(archived.cte("archived"))
+    return db.execute(statement).scalar_one()
+
+
+def compact_task_history(
+    db: Session, now: datetime | None = None, batch_size: int = TASK_COMPACTION_BATCH_SIZE
+) -> dict:
+    """
+    Move superseded tasks older than TASK_RETENTION_DAYS out of enrichment_tasks, one committed batch at a time
+    Walks the table in id order, so it stops at the first batch created after the cutoff
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=TASK_RETENTION_DAYS)
+    archive = TASK_ARCHIVE_MONTHS > 0
+    compacted = scanned = 0
+    last_id = 0
+
+    while True:
+        batch = db.execute(
+            select(EnrichmentTask.id, EnrichmentTask.created_at)
+            .where(EnrichmentTask.id > last_id)
+            .order_by(EnrichmentTask.id)
+            .limit(batch_size)
+        ).all()
+        old = [row for row in batch if row.created_at and row.created_at < cutoff]
+        if not old:
+            break
+
+        if archive:
+            ensure_archive_partitions(db, min(row.created_at for row in old), cutoff)
+        compacted += _compact(db, _compactable_tasks([row.id for row in old], cutoff), archive)
+        db.commit()
+        scanned += len(batch)
+        last_id = batch[-1].id
+
+    dropped = drop_expired_archive_partitions(db, now) if archive else []
+    db.commit()
+    return {"scanned": scanned, "compacted": compacted, "dropped_partitions": dropped}
+
+
+def get_task_history(db: Session, lead_id: int) -> dict:
+    """Compacted task totals of a lead, keyed by enrichment type"""
+    rows = db.execute(select(EnrichmentTaskSummary).where(EnrichmentTaskSummary.lead_id == lead_id)).scalars()
+    return {
+        row.task_type: {
+            "runs": row.runs,
+            "completed": row.completed,
+            "failed": row.failed,
+            "cancelled": row.cancelled,
+            "attempts": row.attempts,
+            "first_created_at": row.first_created_at.isoformat() if row.first_created_at else None,
+            "last_completed_at": row.last_completed_at.isoformat() if row.last_completed_at else None,
+            "last_error_class": row.last_error_class,
+        }
+        for row in rows
+    }
@@ -0,0 +1,260 @@
+"""
+Asyncio worker for the I/O-bound enrichment queues
+
+Consumes the same enrich_lead messages as the Celery workers, but runs hundreds of them at once on one
+event loop per process: provider calls are awaited, a semaphore per provider bounds calls to each API, and
+database and Redis steps run on a thread pool sized to the connection pool. Retries are re-published under
+the same message id, exactly as Celery's retry does, so both kinds of worker can serve a queue together.
+
+Run from backend/ (scale out with more processes or containers, not threads):
+    DB_ROLE=async_worker python -m workers.async_worker -Q enrich_email,enrich_apollo,enrich_scraper -c 200
+"""
+
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import logging
+import os
+import queue
+import resource
+import signal
+import socket
+import threading
+import time
+
+from db import database
+from kombu import Consumer
+
+from workers.celery_app import ENRICHMENT_QUEUES, celery_app
+from workers.tasks import EnrichmentRetry, process_enrichment
+
+logger = logging.getLogger("workers.async_worker")
+
+ASYNC_WORKER_CONCURRENCY = int(os.getenv("ASYNC_WORKER_CONCURRENCY", "200"))
+ASYNC_WORKER_SHUTDOWN_SECONDS = float(os.getenv("ASYNC_WORKER_SHUTDOWN_SECONDS", "30"))
+ASYNC_WORKER_REPORT_SECONDS = float(os.getenv("ASYNC_WORKER_REPORT_SECONDS", "30"))
+
+# Concurrent provider calls per enrichment type in one process, overridable with ASYNC_WORKER_LIMIT_<TYPE>
+DEFAULT_PROVIDER_LIMITS = {
+    "email": 100,
+    "email_waterfall": 50,
+    "apollo": 20,
+    "ai": 20,
+    "scraper": 100,
+    "contact_page": 100,
+    "company_info": 20,
+}
+
+
+def provider_limit(enrichment_type: str) -> int:
+    limit = os.getenv(f"ASYNC_WORKER_LIMIT_{enrichment_type.upper()}")
+    return int(limit) if limit is not None else DEFAULT_PROVIDER_LIMITS.get(enrichment_type, 20)
+
+
+class AsyncWorker:
+    """
+    One consumer thread owns the broker connection (kombu channels are not thread-safe): it receives
+    messages, hands them to the event loop and runs the acks the loop queues back to it.
+    """
+
+    def __init__(self, queues: list[str], concurrency: int = ASYNC_WORKER_CONCURRENCY, db_threads: int = None):
+        self.queues = [queue for queue in celery_app.conf.task_queues if queue.name in queues]
+        self.concurrency = concurrency
+        pool_size = database.get_pool_stats().get("pool_size", 8)
+        self.db_executor = ThreadPoolExecutor(max_workers=db_threads or pool_size, thread_name_prefix="db")
+        self.semaphores = {}
+        self.loop = None
+        self.inflight = set()
+        self.waiting = set()
+        self.delayed = 0
+        self.completed = 0
+        self.retried = 0
+        self.started_at = time.monotonic()
+
+        self._consumer = None
+        self._consumer_calls = queue.SimpleQueue()
+        self._stopping = threading.Event()
+        self._finished = threading.Event()
+
+    async def offload(self, fn, *args):
+        """Run a blocking database or Redis step on the DB thread pool"""
+        return await self.loop.run_in_executor(self.db_executor, fn, *args)
+
+    def provider_slot(self, enrichment_type: str) -> asyncio.Semaphore:
+        if enrichment_type not in self.semaphores:
+            self.semaphores[enrichment_type] = asyncio.Semaphore(provider_limit(enrichment_type))
+        return self.semaphores[enrichment_type]
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            self.loop.add_signal_handler(sig, stop.set)
+
+        consumer = threading.Thread(target=self._consume, args=(stop,), name="consumer", daemon=True)
+        consumer.start()
+        reporter = asyncio.create_task(self._report())
+        logger.info("Consuming %s with %d concurrent tasks", ", ".join(q.name for q in self.queues), self.concurrency)
+
+        await stop.wait()
+        self._stopping.set()
+        # Messages still waiting for their ETA are not started; they stay unacked and are redelivered
+        for task in self.waiting:
+            task.cancel()
+        logger.info("Stopping: waiting for %d in-flight tasks", len(self.inflight) - len(self.waiting))
+        if self.inflight:
+            _, pending = await asyncio.wait(self.inflight, timeout=ASYNC_WORKER_SHUTDOWN_SECONDS)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        reporter.cancel()
+        self._finished.set()
+        await self.loop.run_in_executor(None, consumer.join)
+        self.db_executor.shutdown()
+
+    # Consumer thread
+
+    def _consume(self, stop: asyncio.Event):
+        try:
+            with celery_app.connection_for_read() as conn:
+                self._consumer = Consumer(conn, queues=self.queues, callbacks=[self._on_message], accept=["json"])
+                self._consumer.qos(prefetch_count=self.concurrency)
+                with self._consumer:
+                    while not self._stopping.is_set():
+                        self._run_consumer_calls()
+                        try:
+                            conn.drain_events(timeout=0.05)
+                        except socket.timeout:
+                            pass
+
+                # Unacked messages go back to the queue when the connection closes, so ack what finishes first
+                while not self._finished.is_set():
+                    self._run_consumer_calls()
+                    time.sleep(0.05)
+                self._run_consumer_calls()
+        except Exception:
+            logger.exception("Consumer failed")
+            self.loop.call_soon_threadsafe(stop.set)
+
+    def _run_consumer_calls(self):
+        while True:
+            try:
+                call = self._consumer_calls.get_nowait()
+            except queue.Empty:
+                return
+            call()
+
+    def _call_in_consumer(self, fn, *args):
+        self._consumer_calls.put(lambda: fn(*args))
+
+    def _on_message(self, body, message):
+        headers = message.headers
+        args, kwargs, _ = body
+        eta = headers.get("eta")
+        if eta:
+            eta = datetime.fromisoformat(eta)
+            eta = eta if eta.tzinfo else eta.replace(tzinfo=timezone.utc)
+            if eta > datetime.now(timezone.utc):
+                # Like Celery, a message held for its ETA does not count against the prefetch limit
+                self._set_delayed(1)
+            else:
+                eta = None
+
+        asyncio.run_coroutine_threadsafe(
+            self._handle(message, headers["task"], headers["id"], args, kwargs, eta, headers.get("retries") or 0),
+            self.loop,
+        )
+
+    def _set_delayed(self, change: int):
+        self.delayed += change
+        self._consumer.qos(prefetch_count=self.concurrency + self.delayed)
+
+    # Event loop
+
+    async def _handle(self, message, name: str, message_id: str, args, kwargs, eta, retries: int):
+        task = asyncio.current_task()
+        self.inflight.add(task)
+        try:
+            if eta:
+                self.waiting.add(task)
+                await asyncio.sleep((eta - datetime.now(timezone.utc)).total_seconds())
+                self.waiting.discard(task)
+                self._call_in_consumer(self._set_delayed, -1)
+
+            if name == "enrich_lead":
+                await self._enrich(message, message_id, args, kwargs, retries)
+            else:
+                # Other tasks routed to these queues (generate_intros on enrich_ai) run as ordinary Celery tasks
+                await asyncio.to_thread(celery_app.tasks[name].apply, args, kwargs, task_id=message_id)
+        except asyncio.CancelledError:
+            # Cut off by shutdown: left unacked so the broker redelivers it
+            return
+        except Exception:
+            logger.exception("Task %s[%s] failed", name, message_id)
+        finally:
+            self.waiting.discard(task)
+            self.inflight.discard(task)
+        self._call_in_consumer(message.ack)
+
+    async def _enrich(self, message, message_id: str, args, kwargs, retries: int):
+        db = database.SessionLocal(expire_on_commit=False)
+        try:
+            await process_enrichment(
+                db, *args, **kwargs, message_id=message_id, offload=self.offload, provider_slot=self.provider_slot
+            )
+            self.completed += 1
+        except EnrichmentRetry as retry:
+            # Same message id, so the task row still recognizes it as the current dispatch
+            await self.offload(self._republish, message, message_id, args, kwargs, retries, retry.countdown)
+            self.retried += 1
+        finally:
+            await self.offload(db.close)
+
+    @staticmethod
+    def _republish(message, message_id: str, args, kwargs, retries: int, countdown: float):
+        celery_app.send_task(
+            "enrich_lead",
+            args=args,
+            kwargs=kwargs,
+            task_id=message_id,
+            countdown=countdown,
+            retries=retries + 1,
+            priority=message.properties.get("priority"),
+        )
+
+    async def _report(self):
+        while True:
+            await asyncio.sleep(ASYNC_WORKER_REPORT_SECONDS)
+            elapsed = time.monotonic() - self.started_at
+            logger.info(
+                "completed=%d retried=%d in_flight=%d delayed=%d rate=%.1f/s max_rss=%.0fMB",
+                self.completed,
+                self.retried,
+                len(self.inflight),
+                self.delayed,
+                self.completed / elapsed if elapsed else 0,
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "-Q",
+        "--queues",
+        default="enrich_email,enrich_apollo,enrich_scraper",
+        help=f"comma-separated queues out of: {', '.join(sorted(set(ENRICHMENT_QUEUES.values())))}",
+    )
+    parser.add_argument("-c", "--concurrency", type=int, default=ASYNC_WORKER_CONCURRENCY)
+    parser.add_argument("--db-threads", type=int, default=None, help="defaults to the connection pool size")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    database.init_engine(os.getenv("DB_ROLE", "async_worker"))
+    worker = AsyncWorker(args.queues.split(","), args.concurrency, args.db_threads)
+    asyncio.run(worker.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Celery app, queue layout and enqueue helpers
+
+The API imports only this module: tasks are sent by name, so the worker code and the
+provider SDKs it pulls in are never loaded into the web process.
+"""
+
+import os
+
+from celery import Celery
+from kombu import Queue
+
+redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+celery_app = Celery("clay_clone_workers", broker=redis_url, backend=redis_url)
+
+# Each enrichment type gets its own queue so slow providers never block fast ones
+DEFAULT_QUEUE = "default"
+ENRICHMENT_QUEUES = {
+    "email": "enrich_email",
+    "email_waterfall": "enrich_email",
+    "apollo": "enrich_apollo",
+    "ai": "enrich_ai",
+    "scraper": "enrich_scraper",
+    "contact_page": "enrich_scraper",
+    "company_info": "enrich_ai",
+}
+# Every queue once, in declaration order (several enrichment types share a queue)
+QUEUE_NAMES = list(dict.fromkeys([DEFAULT_QUEUE, *ENRICHMENT_QUEUES.values()]))
+
+# Priority lanes within each queue (Redis transport serves lower numbers first)
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 6
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_SEP = ":"
+
+# How often celery beat runs the enrichment task retention job
+TASK_COMPACTION_INTERVAL_HOURS = float(os.getenv("TASK_COMPACTION_INTERVAL_HOURS", "24"))
+
+
+def route_enrichment_task(name, args, kwargs, options, task=None, **kw):
+    """Send enrich_lead messages to the queue of their enrichment type"""
+    if name == "generate_intros":
+        return {"queue": ENRICHMENT_QUEUES["ai"]}
+    if name != "enrich_lead":
+        return None
+    enrichment_type = args[1] if args and len(args) > 1 else (kwargs or {}).get("enrichment_type")
+    return {"queue": ENRICHMENT_QUEUES.get(enrichment_type, DEFAULT_QUEUE)}
+
+
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    result_serializer="json",
+    timezone="UTC",
+    enable_utc=True,
+    task_default_queue=DEFAULT_QUEUE,
+    task_queues=[Queue(queue) for queue in QUEUE_NAMES],
+    task_routes=(route_enrichment_task,),
+    task_default_priority=PRIORITY_BULK,
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+    },
+    # Progress and results are read from Postgres and the job counters, never from the result backend
+    task_ignore_result=True,
+    # Prefetching would let bulk messages jump ahead of later interactive ones
+    worker_prefetch_multiplier=1,
+    # Workers started with -A workers.celery_app still register the task code
+    imports=("workers.tasks",),
+    beat_schedule={
+        "compact-task-history": {
+            "task": "compact_task_history",
+            "schedule": TASK_COMPACTION_INTERVAL_HOURS * 3600,
+        },
+    },
+)
+
+
+def dispatch_enrichment(
+    lead_id: int, enrichment_type: str, task_id: int, priority: int = PRIORITY_BULK, celery_task_id: str = None
+):
+    """
+    Queue an enrichment on its provider queue in the given priority lane
+    Pass the celery_task_id already stored on the task row so the worker can tell current messages from stale ones
+    """
+    return celery_app.send_task(
+        "enrich_lead", args=(lead_id, enrichment_type, task_id), priority=priority, task_id=celery_task_id
+    )
+
+
+def dispatch_generate_intros(batch_id: str, lead_tasks: list[list[int]]):
+    """Queue a chunk of [lead_id, task_id] pairs for intro generation on the AI queue"""
+    return celery_app.send_task("generate_intros", args=(batch_id, lead_tasks))
+
+
+def dispatch_bulk_retry(marker: str, priority: int = PRIORITY_BULK):
+    """Start the paced re-dispatch of the tasks reset by a bulk retry"""
+    return celery_app.send_task("bulk_retry", args=(marker,), kwargs={"priority": priority})
+
+
+def get_queue_depths() -> dict:
+    """Pending message counts per queue, split by priority lane"""
+    with celery_app.connection_for_read() as conn:
+        pipe = conn.default_channel.client.pipeline()
+        for queue in QUEUE_NAMES:
+            for step in PRIORITY_STEPS:
+                pipe.llen(queue if step == 0 else f"{queue}{PRIORITY_SEP}{step}")
+        counts = iter(pipe.execute())
+
+    depths = {}
+    for queue in QUEUE_NAMES:
+        lanes = {str(step): next(counts) for step in PRIORITY_STEPS}
+        depths[queue] = {"total": sum(lanes.values()), "by_priority": lanes}
+    return depths
+
+
+def intro_stream_key(batch_id: str) -> str:
+    """Redis stream that receives each finished intro of a batch"""
+    return f"intros:{batch_id}"
@@ -0,0 +1,97 @@
+import os
+import random
+
+from db.redis_client import get_redis
+from services.errors import RETRYABLE_ERROR_CLASSES
+
+MAX_RETRIES = int(os.getenv("ENRICHMENT_MAX_RETRIES", "5"))
+BACKOFF_BASE_SECONDS = float(os.getenv("ENRICHMENT_BACKOFF_BASE_SECONDS", "5"))
+BACKOFF_MAX_SECONDS = float(os.getenv("ENRICHMENT_BACKOFF_MAX_SECONDS", "600"))
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_WINDOW_SECONDS = int(os.getenv("BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_COOLDOWN_SECONDS = int(os.getenv("BREAKER_COOLDOWN_SECONDS", "30"))
+BREAKER_PROBE_SECONDS = int(os.getenv("BREAKER_PROBE_SECONDS", "60"))
+
+# Scraping hits each lead's own website, so one failing site says nothing about the next
+BREAKER_PROVIDERS = {"email", "apollo", "ai"}
+
+
+def is_retryable(result: dict | None) -> bool:
+    """Whether a failed provider result is transient"""
+    return bool(result) and result.get("error_class") in RETRYABLE_ERROR_CLASSES
+
+
+def backoff_delay(attempt: int) -> float:
+    """Jittered exponential backoff for the given attempt (starting at 1)"""
+    ceiling = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** max(attempt - 1, 0))
+    return random.uniform(BACKOFF_BASE_SECONDS / 2, max(ceiling, BACKOFF_BASE_SECONDS / 2))
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker shared by every worker through Redis.
+
+    Closed: calls go through and retryable failures are counted in a rolling window.
+    Open: after too many failures, calls are refused until the cooldown expires.
+    Half-open: one task probes the provider; success closes the breaker, failure reopens it.
+    """
+
+    def __init__(self, provider: str, client=None):
+        self.provider = provider
+        self.client = client or get_redis()
+        self.enabled = provider in BREAKER_PROVIDERS
+        self._failures_key = f"breaker:{provider}:failures"
+        self._open_key = f"breaker:{provider}:open"
+        self._tripped_key = f"breaker:{provider}:tripped"
+        self._probe_key = f"breaker:{provider}:probe"
+
+    def wait_time(self) -> float:
+        """Seconds to wait before calling the provider, 0 if the call may go ahead now"""
+        if not self.enabled:
+            return 0
+
+        open_ms = self.client.pttl(self._open_key)
+        if open_ms and open_ms > 0:
+            return open_ms / 1000
+
+        if self.client.exists(self._tripped_key):
+            # Half-open: only the task holding the probe slot may call the provider
+            if not self.client.set(self._probe_key, 1, nx=True, ex=BREAKER_PROBE_SECONDS):
+                return BREAKER_COOLDOWN_SECONDS / 2
+
+        return 0
+
+    def record_success(self):
+        if self.enabled:
+            self.client.delete(self._failures_key, self._tripped_key, self._probe_key)
+
+    def record_failure(self):
+        if not self.enabled:
+            return
+
+        if self.client.exists(self._tripped_key):
+            self._open()
+            return
+
+        failures = self.client.incr(self._failures_key)
+        if failures == 1:
+            self.client.expire(self._failures_key, BREAKER_WINDOW_SECONDS)
+        if failures >= BREAKER_FAILURE_THRESHOLD:
+            self._open()
+
+    def state(self) -> str:
+        if not self.enabled:
+            return "disabled"
+        if self.client.exists(self._open_key):
+            return "open"
+        if self.client.exists(self._tripped_key):
+            return "half_open"
+        return "closed"
+
+    def _open(self):
+        pipe = self.client.pipeline()
+        pipe.set(self._open_key, 1, ex=BREAKER_COOLDOWN_SECONDS)
+        pipe.set(self._tripped_key, 1, ex=BREAKER_COOLDOWN_SECONDS + BREAKER_PROBE_SECONDS * 10)
+        pipe.delete(self._failures_key, self._probe_key)
+        pipe.execute()
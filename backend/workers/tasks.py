@@ -1,119 +1,716 @@
+import asyncio
+from contextlib import nullcontext
 from datetime import datetime
+import json
+import logging
 import os
+import random
+from uuid import uuid4
 
-from celery import Celery
+from celery.signals import task_postrun, task_prerun, worker_process_init
 
 # Import database
-from db.database import SessionLocal
-from db.models import EnrichmentStatus, EnrichmentTask, Lead
+from db.database import SessionLocal, init_engine
+from db.models import EnrichmentResult, EnrichmentStatus, EnrichmentTask, JobStatus, Lead
+from db.redis_client import get_redis
 from services.ai_enrichment import AIEnrichmentService
 
 # Import services
 from services.apollo_service import ApolloService
+from services.companies import (
+    COMPANY_ENRICHMENT_TYPES,
+    claim_company_enrichment,
+    company_website,
+    find_company_by_name,
+    finish_company_enrichment,
+    link_lead_company,
+    release_company_claim,
+)
 from services.email_validation import EmailValidationService
+from services.email_waterfall import EmailWaterfallService, record_waterfall_stats
+from services.freshness import input_fingerprint
+from services.jobs import PAUSED_TASK_ID, finish_job_if_done, get_job_state, record_page_check, set_task_status
+from services.payloads import PAYLOAD_PROJECTIONS, compact_result
+from services.profiling import finish_profile, should_profile_task, start_profile
+from services.result_attributes import upsert_enrichment_result
+from services.scraped_pages import get_scraped_page, save_scraped_page
 from services.scraper import ScraperService
-from sqlalchemy.orm import Session
-
-# Initialize Celery
-redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
-celery_app = Celery("clay_clone_workers", broker=redis_url, backend=redis_url)
-
-celery_app.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    timezone="UTC",
-    enable_utc=True,
+from services.task_history import compact_task_history
+from sqlalchemy import func, inspect, select, update
+from sqlalchemy.orm import Session, joinedload
+
+from workers.celery_app import (
+    DEFAULT_QUEUE,
+    ENRICHMENT_QUEUES,
+    PRIORITY_BULK,
+    celery_app,
+    dispatch_enrichment,
+    get_queue_depths,
+    intro_stream_key,
 )
+from workers.retry_policy import MAX_RETRIES, CircuitBreaker, backoff_delay, is_retryable
+
+logger = logging.getLogger("workers.tasks")
+
+# How often a lead task re-checks a company enrichment another lead is running
+COMPANY_WAIT_SECONDS = float(os.getenv("COMPANY_WAIT_SECONDS", "5"))
+
+# Types whose handler re-scrapes conditionally; their jobs count changed vs unchanged pages
+PAGE_CHECK_TYPES = {"scraper"}
+
+# Bulk retries re-dispatch at most rate * interval tasks per provider each interval
+BULK_RETRY_INTERVAL_SECONDS = float(os.getenv("BULK_RETRY_INTERVAL_SECONDS", "10"))
+DEFAULT_BULK_RETRY_RATES = {
+    "email": 10,
+    "email_waterfall": 5,
+    "apollo": 5,
+    "ai": 5,
+    "scraper": 20,
+    "contact_page": 20,
+    "company_info": 5,
+}
+# Hold a provider's retries while this many messages are already waiting on its queue
+BULK_RETRY_MAX_QUEUE_DEPTH = int(os.getenv("BULK_RETRY_MAX_QUEUE_DEPTH", "1000"))
+
+
+@worker_process_init.connect
+def _init_worker_db(**kwargs):
+    """Give each forked worker child its own engine instead of the parent's inherited pool"""
+    init_engine("worker", after_fork=True)
+
+
+def bulk_retry_rate(enrichment_type: str) -> float:
+    """Tasks per second a bulk retry may re-dispatch for a provider, overridable with BULK_RETRY_RATE_<TYPE>"""
+    rate = os.getenv(f"BULK_RETRY_RATE_{enrichment_type.upper()}")
+    return float(rate) if rate is not None else DEFAULT_BULK_RETRY_RATES.get(enrichment_type, 5)
+
+
+class EnrichmentRetry(Exception):
+    """Raised once the task row is saved: re-queue the same message after countdown seconds"""
 
+    def __init__(self, countdown: float):
+        super().__init__(countdown)
+        self.countdown = countdown
 
-@celery_app.task(name="enrich_lead")
-def enrich_lead_task(lead_id: int, enrichment_type: str, task_id: int):
+
+async def run_inline(fn, *args):
+    """Offload used under Celery: database and Redis steps run in the task's own thread"""
+    return fn(*args)
+
+
+@celery_app.task(name="enrich_lead", bind=True, max_retries=None)
+def enrich_lead_task(self, lead_id: int, enrichment_type: str, task_id: int):
     """
     Main task for enriching a lead
-    Enrichment types: email, apollo, ai, scraper
+    Enrichment types: email, email_waterfall, apollo, ai, scraper, contact_page, company_info
+    Transient provider errors are retried with backoff; an open circuit breaker parks the task.
+    Company-scoped types run once per company: other leads wait for that run and reuse its result.
     """
-    db = SessionLocal()
+    db = SessionLocal(expire_on_commit=False)
 
     try:
-        # Get lead and task
-        lead = db.query(Lead).filter(Lead.id == lead_id).first()
-        task = db.query(EnrichmentTask).filter(EnrichmentTask.id == task_id).first()
+        return asyncio.run(process_enrichment(db, lead_id, enrichment_type, task_id, self.request.id))
+    except EnrichmentRetry as e:
+        raise self.retry(countdown=e.countdown)
+    finally:
+        db.close()
 
-        if not lead or not task:
-            return {"error": "Lead or task not found"}
 
-        # Update task status
-        task.status = EnrichmentStatus.PROCESSING
-        db.commit()
+# Profiles of running enrich_lead tasks by message id (PROFILE_TASK_SAMPLE_RATE, PROFILE_TASK_TYPES)
+_task_profiles = {}
+
+
+@task_prerun.connect
+def _start_task_profile(task_id=None, task=None, args=(), **kwargs):
+    if task.name == "enrich_lead" and len(args) > 1 and should_profile_task(args[1]):
+        profile = start_profile("task", task_id, f"enrich_lead {args[1]}")
+        profile.meta.update({"lead_id": args[0], "attempt": task.request.retries + 1})
+        _task_profiles[task_id] = profile
+
+
+@task_postrun.connect
+def _finish_task_profile(task_id=None, state=None, **kwargs):
+    profile = _task_profiles.pop(task_id, None)
+    if profile:
+        finish_profile(profile, state=state)
+
+
+async def process_enrichment(
+    db: Session,
+    lead_id: int,
+    enrichment_type: str,
+    task_id: int,
+    message_id: str,
+    offload=run_inline,
+    provider_slot=None,
+) -> dict:
+    """
+    The enrich_lead flow, shared by the Celery task and the asyncio worker (workers/async_worker.py)
+    Provider calls are awaited; every database and Redis step goes through offload, which runs it inline
+    under Celery and on a thread pool in the asyncio worker. provider_slot(enrichment_type), when given,
+    returns an async context manager that bounds concurrent calls per provider.
+    Raises EnrichmentRetry when the message should be re-queued.
+    """
+    task = None
+    company_task = None
+
+    try:
+        lead, task, skipped = await offload(_load_enrichment, db, lead_id, task_id, message_id)
+        if skipped:
+            return skipped
+
+        shared_result = None
+        if enrichment_type in COMPANY_ENRICHMENT_TYPES and await resolve_lead_company(lead, db, offload):
+            company_task, claimed = await offload(
+                claim_company_enrichment, db, lead.company_id, enrichment_type, message_id
+            )
+            if not claimed:
+                if company_task.status not in (EnrichmentStatus.COMPLETED, EnrichmentStatus.FAILED):
+                    # Another lead of the same company is running it: wait for its result
+                    await offload(_park_task, db, task, f"Waiting for company {enrichment_type} result")
+                    raise EnrichmentRetry(COMPANY_WAIT_SECONDS + random.uniform(0, 2))
+                shared_result = company_task.result or {
+                    "error": company_task.error_message,
+                    "error_class": company_task.error_class,
+                }
+                company_task = None
+
+        breaker = CircuitBreaker(enrichment_type)
+        wait = 0 if shared_result is not None else await offload(breaker.wait_time)
+        if wait:
+            # Provider is unhealthy: free the worker slot and come back once the breaker may close
+            await offload(_park_task, db, task, f"Waiting for {enrichment_type} circuit breaker")
+            raise EnrichmentRetry(wait + random.uniform(0, 5))
+
+        if not await offload(_start_task, db, lead, task, company_task, enrichment_type):
+            return {"skipped": "Task cancelled or deleted before it started"}
 
         # Perform enrichment based on type
-        result = None
-        if enrichment_type == "email":
-            result = enrich_email(lead, db)
-        elif enrichment_type == "apollo":
-            result = enrich_apollo(lead, db)
-        elif enrichment_type == "ai":
-            result = enrich_ai(lead, db)
-        elif enrichment_type == "scraper":
-            result = enrich_scraper(lead, db)
+        if shared_result is not None:
+            result = shared_result
+        elif enrichment_type in ENRICHMENT_HANDLERS:
+            async with provider_slot(enrichment_type) if provider_slot else nullcontext():
+                result = await ENRICHMENT_HANDLERS[enrichment_type](lead, db, offload)
         else:
             result = {"error": f"Unknown enrichment type: {enrichment_type}"}
 
-        # Update task with result
-        if result and not result.get("error"):
-            task.status = EnrichmentStatus.COMPLETED
-            task.result = result
-            task.completed_at = datetime.utcnow()
-
-            # Update lead enriched data
-            if not lead.enriched_data:
-                lead.enriched_data = {}
-            lead.enriched_data[enrichment_type] = result
-
-            # Check if all tasks are complete
-            all_tasks = db.query(EnrichmentTask).filter(EnrichmentTask.lead_id == lead_id).all()
-            if all(t.status == EnrichmentStatus.COMPLETED for t in all_tasks):
-                lead.enrichment_status = EnrichmentStatus.COMPLETED
-        else:
-            task.status = EnrichmentStatus.FAILED
-            task.error_message = result.get("error", "Unknown error") if result else "Unknown error"
-            task.completed_at = datetime.utcnow()
+        # Any answer from the provider, even a 4xx, means it is up
+        if shared_result is None:
+            await offload(breaker.record_failure if is_retryable(result) else breaker.record_success)
+
+        return await offload(_save_result, db, lead, task, company_task, enrichment_type, result, shared_result)
+    except EnrichmentRetry:
+        raise
+    except Exception as e:
+        await offload(_fail_task, db, task, company_task, e)
+        return {"error": str(e)}
 
+
+def _load_enrichment(db: Session, lead_id: int, task_id: int, message_id: str):
+    """Load the lead and task; returns a skip result instead when the message must not run"""
+    lead = db.query(Lead).filter(Lead.id == lead_id).first()
+    task = db.query(EnrichmentTask).filter(EnrichmentTask.id == task_id).first()
+
+    if not lead or not task:
+        return lead, task, {"error": "Lead or task not found"}
+
+    if task.status in (EnrichmentStatus.COMPLETED, EnrichmentStatus.FAILED):
+        return lead, task, {"skipped": f"Task already {task.status.value}"}
+    if task.celery_task_id == PAUSED_TASK_ID:
+        return lead, task, {"skipped": "Job paused"}
+    if task.celery_task_id and task.celery_task_id != message_id:
+        return lead, task, {"skipped": "Superseded by a newer dispatch"}
+
+    # Check the job's pause/cancel flag before spending anything on providers
+    job_state = get_job_state(task.job_id) if task.job_id else JobStatus.RUNNING.value
+    if job_state == JobStatus.CANCELLED.value:
+        cancelled = set_task_status(
+            db,
+            task,
+            EnrichmentStatus.FAILED,
+            cancelled=True,
+            error_message="Job cancelled",
+            error_class="cancelled",
+            completed_at=datetime.utcnow(),
+        )
         db.commit()
-        return result
+        if cancelled:
+            finish_job_if_done(db, task.job_id)
+        return lead, task, {"skipped": "Job cancelled"}
+    if job_state == JobStatus.PAUSED.value:
+        # Drop the message; resuming the job re-dispatches the tasks marked paused
+        set_task_status(db, task, EnrichmentStatus.PENDING, error_message="Job paused", celery_task_id=PAUSED_TASK_ID)
+        db.commit()
+        return lead, task, {"skipped": "Job paused"}
 
-    except Exception as e:
-        # Update task as failed
-        if task:
-            task.status = EnrichmentStatus.FAILED
-            task.error_message = str(e)
-            task.completed_at = datetime.utcnow()
+    # End the read transaction so no connection is held while providers are awaited
+    db.commit()
+    return lead, task, None
+
+
+def _park_task(db: Session, task: EnrichmentTask, reason: str):
+    set_task_status(db, task, EnrichmentStatus.PENDING, error_message=reason)
+    db.commit()
+
+
+def _start_task(db: Session, lead: Lead, task: EnrichmentTask, company_task, enrichment_type: str) -> bool:
+    """Mark the task running; False when it was cancelled or deleted since it was loaded"""
+    started = set_task_status(
+        db,
+        task,
+        EnrichmentStatus.PROCESSING,
+        input_fingerprint=input_fingerprint(lead, enrichment_type),
+        attempts=(task.attempts or 0) + 1,
+    )
+    if not started and company_task:
+        release_company_claim(company_task)
+    db.commit()
+    return started
+
+
+def _drop_result(db: Session, lead: Lead) -> dict:
+    """
+    The task was cancelled, or deleted with its lead, while the provider ran: save only the company's outcome,
+    which other leads may be waiting on. Whoever changed the task already moved its job counters.
+    """
+    db.expunge(lead)
+    db.commit()
+    return {"skipped": "Task cancelled or deleted while running"}
+
+
+def _save_result(db: Session, lead: Lead, task: EnrichmentTask, company_task, enrichment_type, result, shared_result):
+    """Save the provider outcome, together with any lead fields the handler filled in"""
+    # A shared company failure is final for this lead; only the run's claimer retries
+    retrying = shared_result is None and is_retryable(result) and task.attempts <= MAX_RETRIES
+    # Large responses are stored once as a compressed payload; the task, lead and company keep a projection
+    result = compact_result(db, enrichment_type, result)
+    if company_task:
+        finish_company_enrichment(db, company_task, result, retrying)
+
+    # Update task with result
+    if result and not result.get("error"):
+        # Lock the lead before the task, in the order lead deletes take them; gone means deleted while running
+        if db.execute(select(Lead.id).where(Lead.id == lead.id).with_for_update()).first() is None:
+            return _drop_result(db, lead)
+        completed = set_task_status(
+            db,
+            task,
+            EnrichmentStatus.COMPLETED,
+            result=result,
+            error_message=None,
+            error_class=None,
+            completed_at=datetime.utcnow(),
+            # Fingerprint the lead as the handler left it: providers fill in fields they also read (the email
+            # provider sets email, Apollo sets linkedin_url), and the start-of-run hash would never match again
+            input_fingerprint=input_fingerprint(lead, enrichment_type),
+        )
+        if not completed:
+            return _drop_result(db, lead)
+
+        if shared_result is None and enrichment_type in PAGE_CHECK_TYPES and task.job_id:
+            record_page_check(task.job_id, enrichment_type, changed=not result.get("unchanged"))
+
+        # An unchanged re-scrape leaves the lead's stored result and its projection as they are
+        if not (result.get("unchanged") and enrichment_type in (lead.enriched_data or {})):
+            # Re-read enriched_data under a row lock so concurrent providers for the same lead don't drop each other's output
+            db.refresh(lead, ["enriched_data"], with_for_update=True)
+            # Update lead enriched data (reassign so the JSON column is flagged as changed)
+            lead.enriched_data = {**(lead.enriched_data or {}), enrichment_type: result}
+            upsert_enrichment_result(db, lead)
+
+        # Check if all tasks are complete, without loading their results
+        unfinished = (
+            db.query(EnrichmentTask.id)
+            .filter(EnrichmentTask.lead_id == lead.id, EnrichmentTask.status != EnrichmentStatus.COMPLETED)
+            .first()
+        )
+        if unfinished is None:
+            lead.enrichment_status = EnrichmentStatus.COMPLETED
+    elif retrying:
+        parked = set_task_status(
+            db,
+            task,
+            EnrichmentStatus.PENDING,
+            error_message=result.get("error"),
+            error_class=result.get("error_class"),
+        )
+        if not parked:
+            return _drop_result(db, lead)
+        db.commit()
+        raise EnrichmentRetry(result.get("retry_after") or backoff_delay(task.attempts))
+    else:
+        failed = set_task_status(
+            db,
+            task,
+            EnrichmentStatus.FAILED,
+            error_message=result.get("error", "Unknown error") if result else "Unknown error",
+            error_class=result.get("error_class") if result else None,
+            completed_at=datetime.utcnow(),
+        )
+        if not failed:
+            return _drop_result(db, lead)
+
+    db.commit()
+    if task.job_id:
+        finish_job_if_done(db, task.job_id)
+    return result
+
+
+def _fail_task(db: Session, task: EnrichmentTask | None, company_task, error: Exception):
+    """Mark the task failed after an unexpected error"""
+    db.rollback()
+    if company_task:
+        finish_company_enrichment(db, company_task, {"error": str(error), "error_class": "unknown"}, retrying=False)
+    # The rollback expired the task: re-read its status, or find it deleted with its lead
+    if task and db.get(EnrichmentTask, inspect(task).identity) is not None:
+        failed = set_task_status(
+            db,
+            task,
+            EnrichmentStatus.FAILED,
+            error_message=str(error),
+            error_class="unknown",
+            completed_at=datetime.utcnow(),
+        )
+        db.commit()
+        if failed and task.job_id:
+            finish_job_if_done(db, task.job_id)
+    else:
+        db.commit()
+
+
+def _read(db: Session, query, *args):
+    """Run a read and end its transaction, so the connection goes back to the pool while providers are awaited"""
+    try:
+        return query(db, *args)
+    finally:
+        db.commit()
+
+
+async def resolve_lead_company(lead: Lead, db: Session, offload=run_inline) -> int | None:
+    """Link the lead to its company, finding the domain from the company name when it has no website"""
+    domain = None
+    if not (lead.company_id or lead.website):
+        if not lead.company:
+            return None
+        known = await offload(_read, db, find_company_by_name, lead.company)
+        if known:
+            domain = known.domain
+        else:
+            found = await ScraperService().find_company_domain(lead.company)
+            if not found.get("success"):
+                return None
+            domain = found["domain"]
+
+    return await offload(_link_company, db, lead, domain)
+
+
+def _link_company(db: Session, lead: Lead, domain: str | None) -> int | None:
+    company_id = link_lead_company(db, lead, domain)
+    db.commit()
+    return company_id
+
+
+@celery_app.task(name="bulk_retry", bind=True, max_retries=None)
+def bulk_retry_task(self, marker: str, priority: int = PRIORITY_BULK):
+    """
+    Re-dispatch the tasks reset by a bulk retry (celery_task_id == marker), one paced batch per provider
+    every BULK_RETRY_INTERVAL_SECONDS. Providers with an open breaker or a deep queue are skipped until later.
+    """
+    db = SessionLocal()
+
+    try:
+        enrichment_types = [
+            row[0]
+            for row in db.query(EnrichmentTask.task_type).filter(EnrichmentTask.celery_task_id == marker).distinct()
+        ]
+        if not enrichment_types:
+            return {"marker": marker, "remaining": 0}
+
+        depths = get_queue_depths()
+        for enrichment_type in enrichment_types:
+            queue = ENRICHMENT_QUEUES.get(enrichment_type, DEFAULT_QUEUE)
+            if CircuitBreaker(enrichment_type).state() == "open":
+                continue
+            if depths.get(queue, {}).get("total", 0) >= BULK_RETRY_MAX_QUEUE_DEPTH:
+                continue
+
+            batch = (
+                db.query(EnrichmentTask.id, EnrichmentTask.lead_id)
+                .filter(EnrichmentTask.celery_task_id == marker, EnrichmentTask.task_type == enrichment_type)
+                .order_by(EnrichmentTask.id)
+                .limit(max(int(bulk_retry_rate(enrichment_type) * BULK_RETRY_INTERVAL_SECONDS), 1))
+                .all()
+            )
+            celery_ids = {task.id: str(uuid4()) for task in batch}
+            db.execute(
+                update(EnrichmentTask),
+                [{"id": task_id, "celery_task_id": celery_id} for task_id, celery_id in celery_ids.items()],
+            )
             db.commit()
-        return {"error": str(e)}
+
+            for task in batch:
+                dispatch_enrichment(
+                    task.lead_id, enrichment_type, task.id, priority=priority, celery_task_id=celery_ids[task.id]
+                )
+
+        raise self.retry(countdown=BULK_RETRY_INTERVAL_SECONDS)
     finally:
         db.close()
 
 
-def enrich_email(lead: Lead, db: Session) -> dict:
+@celery_app.task(name="rebuild_enrichment_results")
+def rebuild_enrichment_results_task(batch_size: int = 1000):
+    """Backfill enrichment_results from Lead.enriched_data for every enriched lead"""
+    db = SessionLocal()
+    rebuilt = 0
+    last_id = 0
+
+    try:
+        while True:
+            leads = (
+                db.query(Lead)
+                .filter(Lead.id > last_id, Lead.enriched_data.isnot(None))
+                .order_by(Lead.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not leads:
+                break
+
+            for lead in leads:
+                upsert_enrichment_result(db, lead)
+            db.commit()
+
+            rebuilt += len(leads)
+            last_id = leads[-1].id
+            db.expunge_all()
+
+        return {"rebuilt": rebuilt}
+    finally:
+        db.close()
+
+
+@celery_app.task(name="compact_task_history")
+def compact_task_history_task():
+    """Move superseded enrichment tasks past TASK_RETENTION_DAYS into per-lead summaries and the archive"""
+    db = SessionLocal()
+    try:
+        return compact_task_history(db)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="compact_provider_payloads")
+def compact_provider_payloads_task(batch_size: int = 500):
+    """Move raw provider responses saved before payload storage out of tasks, leads and enrichment_results"""
+    db = SessionLocal()
+    compacted = 0
+    last_id = 0
+
+    try:
+        while True:
+            tasks = (
+                db.query(EnrichmentTask)
+                .filter(
+                    EnrichmentTask.id > last_id,
+                    EnrichmentTask.task_type.in_(PAYLOAD_PROJECTIONS),
+                    EnrichmentTask.status == EnrichmentStatus.COMPLETED,
+                )
+                .order_by(EnrichmentTask.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not tasks:
+                break
+
+            for task in tasks:
+                stored = compact_result(db, task.task_type, task.result)
+                if stored is not task.result:
+                    task.result = stored
+                    compacted += 1
+
+            leads = db.query(Lead).filter(Lead.id.in_({task.lead_id for task in tasks})).with_for_update()
+            for lead in leads:
+                data = lead.enriched_data or {}
+                stored = {key: compact_result(db, key, data[key]) for key in PAYLOAD_PROJECTIONS if key in data}
+                if any(stored[key] is not data[key] for key in stored):
+                    lead.enriched_data = {**data, **stored}
+                    upsert_enrichment_result(db, lead)
+            db.commit()
+
+            last_id = tasks[-1].id
+            db.expunge_all()
+
+        return {"compacted": compacted}
+    finally:
+        db.close()
+
+
+# Concurrent LLM calls per generate_intros task
+INTRO_CONCURRENCY = int(os.getenv("INTRO_CONCURRENCY", "8"))
+INTRO_STREAM_TTL_SECONDS = 24 * 3600
+
+
+@celery_app.task(name="generate_intros")
+def generate_intros_task(batch_id: str, lead_tasks: list[list[int]]):
+    """
+    Generate personalized intros for a chunk of leads
+    Each intro is saved and published to the batch stream as soon as it is ready. Whatever happens, every lead
+    of the chunk gets an event: tasks left unfinished are failed and published as errors.
+    """
+    db = SessionLocal()
+    task_ids = dict(lead_tasks)
+    published = set()
+    error = "Intro generation did not finish"
+
+    try:
+        leads = db.query(Lead).options(joinedload(Lead.company_entity)).filter(Lead.id.in_(task_ids)).all()
+        tasks_by_lead = {
+            task.lead_id: task for task in db.query(EnrichmentTask).filter(EnrichmentTask.id.in_(task_ids.values()))
+        }
+        for task in tasks_by_lead.values():
+            task.status = EnrichmentStatus.PROCESSING
+        db.commit()
+
+        completed = asyncio.run(_generate_intros(db, batch_id, leads, tasks_by_lead, published))
+        return {"batch_id": batch_id, "completed": completed, "total": len(task_ids)}
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        try:
+            _fail_unpublished_intros(db, batch_id, task_ids, published, error)
+        finally:
+            db.close()
+
+
+def _fail_unpublished_intros(db: Session, batch_id: str, task_ids: dict[int, int], published: set[int], error: str):
+    """Fail the tasks of leads that got no event, and publish an error for each so the stream can finish"""
+    unpublished = [lead_id for lead_id in task_ids if lead_id not in published]
+    if not unpublished:
+        return
+
+    db.rollback()
+    db.execute(
+        update(EnrichmentTask)
+        .where(
+            EnrichmentTask.id.in_([task_ids[lead_id] for lead_id in unpublished]),
+            EnrichmentTask.status.notin_([EnrichmentStatus.COMPLETED, EnrichmentStatus.FAILED]),
+        )
+        .values(
+            status=EnrichmentStatus.FAILED,
+            error_message=error,
+            error_class="unknown",
+            completed_at=datetime.utcnow(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+    stream = intro_stream_key(batch_id)
+    pipe = get_redis().pipeline()
+    for lead_id in unpublished:
+        pipe.xadd(stream, {"data": json.dumps({"lead_id": lead_id, "intro": None, "error": error})})
+    pipe.expire(stream, INTRO_STREAM_TTL_SECONDS)
+    pipe.execute()
+
+
+async def _generate_intros(db: Session, batch_id: str, leads: list[Lead], tasks_by_lead: dict, published: set) -> int:
+    """
+    Run intros with bounded concurrency, fetching shared company context once per company
+    Adds each lead whose intro (or error) was saved and published to published
+    """
+    service = AIEnrichmentService()
+    semaphore = asyncio.Semaphore(INTRO_CONCURRENCY)
+    company_context = {}
+
+    async def fetch_company_context(lead: Lead) -> dict | None:
+        company_data = lead.company_entity.enriched_data if lead.company_entity else None
+        if company_data and company_data.get("company_info", {}).get("success"):
+            return company_data["company_info"]["company_info"]
+        scraped = (company_data or {}).get("scraper") or (lead.enriched_data or {}).get("scraper")
+        if scraped and scraped.get("success"):
+            return {"title": scraped.get("title"), "description": scraped.get("description")}
+        async with semaphore:
+            website = lead.website or (f"https://{lead.company_entity.domain}" if lead.company_entity else None)
+            result = await service.extract_company_info(lead.company, website)
+        return result.get("company_info") if result.get("success") else None
+
+    async def generate(lead: Lead):
+        # A failure, including one from the company context every lead of that company awaits, fails only this lead
+        try:
+            context = None
+            key = lead.company_id or (lead.company or "").strip().lower()
+            if key:
+                if key not in company_context:
+                    company_context[key] = asyncio.ensure_future(fetch_company_context(lead))
+                context = await company_context[key]
+
+            lead_data = {
+                "first_name": lead.first_name,
+                "last_name": lead.last_name,
+                "company": lead.company,
+                "title": lead.title,
+            }
+            async with semaphore:
+                result = await service.generate_personalized_intro(lead_data, context)
+        except Exception as e:
+            result = {"error": str(e), "error_class": "unknown", "success": False}
+        return lead, result
+
+    stream = intro_stream_key(batch_id)
+    completed = 0
+
+    for finished in asyncio.as_completed([generate(lead) for lead in leads]):
+        lead, result = await finished
+        task = tasks_by_lead.get(lead.id)
+
+        try:
+            if result.get("success"):
+                # Re-read enriched_data under a row lock: providers may have saved results since the batch loaded it
+                db.refresh(lead, ["enriched_data"], with_for_update=True)
+                lead.enriched_data = {**(lead.enriched_data or {}), "intro": result}
+                if task:
+                    task.status = EnrichmentStatus.COMPLETED
+                    task.result = result
+            elif task:
+                task.status = EnrichmentStatus.FAILED
+                task.error_message = result.get("error")
+                task.error_class = result.get("error_class")
+            if task:
+                task.completed_at = datetime.utcnow()
+            db.commit()
+        except Exception:
+            # Left unpublished: generate_intros_task fails its task and publishes the error
+            logger.exception("Saving the intro of lead %s failed", lead.id)
+            db.rollback()
+            continue
+
+        completed += bool(result.get("success"))
+        event = {"lead_id": lead.id, "intro": result.get("personalized_intro"), "error": result.get("error")}
+        get_redis().xadd(stream, {"data": json.dumps(event)})
+        published.add(lead.id)
+
+    get_redis().expire(stream, INTRO_STREAM_TTL_SECONDS)
+    return completed
+
+
+async def enrich_email(lead: Lead, db: Session, offload=run_inline) -> dict:
     """Enrich lead with email validation"""
     try:
         service = EmailValidationService()
 
         if lead.email:
             # Validate existing email
-            import asyncio
-
-            result = asyncio.run(service.validate_email_full(lead.email))
-            return result
-        elif lead.first_name and lead.last_name and lead.website:
+            return await service.validate_email_full(lead.email)
+        website = await _website(lead, db, offload)
+        if lead.first_name and lead.last_name and website:
             # Try to find email
-            domain = lead.website.replace("http://", "").replace("https://", "").split("/")[0]
-            result = asyncio.run(service.find_email_pattern(lead.first_name, lead.last_name, domain))
+            result = await service.find_email_pattern(lead.first_name, lead.last_name, _lead_domain(website))
 
+            # Saved with the task result
             if result.get("email"):
                 lead.email = result["email"]
-                db.commit()
 
             return result
         else:
@@ -122,7 +719,59 @@ def enrich_email(lead: Lead, db: Session) -> dict:
         return {"error": str(e), "success": False}
 
 
-def enrich_apollo(lead: Lead, db: Session) -> dict:
+async def enrich_email_waterfall(lead: Lead, db: Session, offload=run_inline) -> dict:
+    """Find a missing email by trying cache, Apollo and Hunter in order until one is verified"""
+    try:
+        if lead.email:
+            return await enrich_email(lead, db, offload)
+        website = await _website(lead, db, offload)
+        if not (lead.first_name and lead.last_name and website):
+            return {"error": "First name, last name and website required for email finding"}
+
+        async def cache_lookup(first_name: str, last_name: str, domain: str) -> dict:
+            return await offload(_read, db, _cached_verified_email, first_name, last_name, domain)
+
+        service = EmailWaterfallService(cache_lookup=cache_lookup)
+        result = await service.find_email(lead.first_name, lead.last_name, _lead_domain(website))
+        await offload(record_waterfall_stats, result)
+
+        if result.get("email"):
+            lead.email = result["email"]
+
+        return result
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+
+async def _website(lead: Lead, db: Session, offload=run_inline) -> str | None:
+    """The lead's own website, or for a lead linked to a company without one, the company's domain"""
+    if lead.website or not lead.company_id:
+        return lead.website
+    return await offload(_read, db, company_website, lead.company_id)
+
+
+def _lead_domain(website: str) -> str:
+    return website.replace("http://", "").replace("https://", "").split("/")[0]
+
+
+def _cached_verified_email(db: Session, first_name: str, last_name: str, domain: str) -> dict:
+    """An email already verified for the same person and domain on another lead"""
+    email = (
+        db.query(Lead.email)
+        .join(EnrichmentResult, EnrichmentResult.lead_id == Lead.id)
+        .filter(
+            func.lower(Lead.first_name) == first_name.lower(),
+            func.lower(Lead.last_name) == last_name.lower(),
+            func.lower(Lead.email).endswith(f"@{domain.lower()}", autoescape=True),
+            EnrichmentResult.email_status == "valid",
+        )
+        .limit(1)
+        .scalar()
+    )
+    return {"email": email, "verified": True} if email else {}
+
+
+async def enrich_apollo(lead: Lead, db: Session, offload=run_inline) -> dict:
     """Enrich lead using Apollo.io"""
     try:
         service = ApolloService()
@@ -130,18 +779,14 @@ def enrich_apollo(lead: Lead, db: Session) -> dict:
         if not lead.first_name or not lead.last_name:
             return {"error": "First name and last name required"}
 
-        import asyncio
-
-        result = asyncio.run(
-            service.enrich_person(
-                first_name=lead.first_name,
-                last_name=lead.last_name,
-                company=lead.company,
-                linkedin_url=lead.linkedin_url,
-            )
+        result = await service.enrich_person(
+            first_name=lead.first_name,
+            last_name=lead.last_name,
+            company=lead.company,
+            linkedin_url=lead.linkedin_url,
         )
 
-        # Update lead with enriched data
+        # Update lead with enriched data, saved with the task result
         if result.get("success") and result.get("person"):
             person = result["person"]
             if not lead.email and person.get("email"):
@@ -152,14 +797,13 @@ def enrich_apollo(lead: Lead, db: Session) -> dict:
                 lead.title = person["title"]
             if not lead.linkedin_url and person.get("linkedin_url"):
                 lead.linkedin_url = person["linkedin_url"]
-            db.commit()
 
         return result
     except Exception as e:
         return {"error": str(e), "success": False}
 
 
-def enrich_ai(lead: Lead, db: Session) -> dict:
+async def enrich_ai(lead: Lead, db: Session, offload=run_inline) -> dict:
     """Enrich lead using AI"""
     try:
         service = AIEnrichmentService()
@@ -172,27 +816,66 @@ def enrich_ai(lead: Lead, db: Session) -> dict:
             "linkedin_url": lead.linkedin_url,
         }
 
-        import asyncio
-
-        result = asyncio.run(service.enrich_lead_profile(lead_data))
+        result = await service.enrich_lead_profile(lead_data)
 
         return result
     except Exception as e:
         return {"error": str(e), "success": False}
 
 
-def enrich_scraper(lead: Lead, db: Session) -> dict:
+async def enrich_scraper(lead: Lead, db: Session, offload=run_inline) -> dict:
     """Enrich lead using web scraping"""
     try:
         service = ScraperService()
 
-        if not lead.website:
+        website = await _website(lead, db, offload)
+        if not website:
             return {"error": "Website URL required for scraping"}
 
-        import asyncio
-
-        result = asyncio.run(service.scrape_company_website(lead.website))
+        # Conditional re-scrape: an unchanged page comes back as the stored result, unparsed
+        previous = await offload(_read, db, get_scraped_page, website)
+        result, page = await service.scrape_company_website_if_changed(website, previous)
+        if page:
+            await offload(save_scraped_page, db, website, page)
 
         return result
     except Exception as e:
         return {"error": str(e), "success": False}
+
+
+async def enrich_contact_page(lead: Lead, db: Session, offload=run_inline) -> dict:
+    """Find and scrape the contact page of the lead's company website"""
+    try:
+        service = ScraperService()
+
+        website = await _website(lead, db, offload)
+        if not website:
+            return {"error": "Website URL required for contact page extraction"}
+
+        return await service.extract_contact_page(website)
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+
+async def enrich_company_info(lead: Lead, db: Session, offload=run_inline) -> dict:
+    """Summarize the lead's company using AI"""
+    try:
+        service = AIEnrichmentService()
+
+        if not lead.company:
+            return {"error": "Company name required for company info"}
+
+        return await service.extract_company_info(lead.company, await _website(lead, db, offload))
+    except Exception as e:
+        return {"error": str(e), "success": False}
+
+
+ENRICHMENT_HANDLERS = {
+    "email": enrich_email,
+    "email_waterfall": enrich_email_waterfall,
+    "apollo": enrich_apollo,
+    "ai": enrich_ai,
+    "scraper": enrich_scraper,
+    "contact_page": enrich_contact_page,
+    "company_info": enrich_company_info,
+}